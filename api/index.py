@@ -1,11 +1,74 @@
-from fastapi import FastAPI
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware  # <-- TAMBAH INI!
-from fastapi.responses import JSONResponse
-import requests
-from bs4 import BeautifulSoup
+from fastapi.responses import JSONResponse as BaseJSONResponse, PlainTextResponse, Response, StreamingResponse
+import httpx
+import asyncio
+import bisect
+import contextvars
+import gzip
+import hashlib
+import hmac
+import importlib.util
+import json
+import logging
+import os
+import random
 import re
+import sqlite3
+import sys
+import threading
+import time
+from urllib.parse import quote_plus
 
-app = FastAPI(title="Samehadaku API V30 - Python Perfect (Schedule Fixed Proper)")
+# hook yang dijalanin pas app start / stop (client upstream, task background, dll)
+STARTUP_HOOKS = []
+SHUTDOWN_HOOKS = []
+
+@asynccontextmanager
+async def lifespan(_app):
+    for hook in STARTUP_HOOKS:
+        await hook()
+    try:
+        yield
+    finally:
+        for hook in reversed(SHUTDOWN_HOOKS):
+            await hook()
+
+# ------------------------
+# JSON
+# ------------------------
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# auto = orjson kalau ke-install, json = stdlib (buat banding / debug)
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto").strip().lower()
+USE_ORJSON = orjson is not None and JSON_BACKEND != "json"
+
+def render_json(payload) -> bytes:
+    """Serialize payload ke bytes JSON compact (UTF-8 mentah, tanpa escape non-ASCII)."""
+    if USE_ORJSON:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def parse_json(body: bytes):
+    return orjson.loads(body) if USE_ORJSON else json.loads(body)
+
+class JSONResponse(BaseJSONResponse):
+    # semua route (termasuk yang return dict biasa) lewat render_json
+    def render(self, content) -> bytes:
+        return render_json(content)
+
+app = FastAPI(
+    title="Samehadaku API V30 - Python Perfect (Schedule Fixed Proper)",
+    lifespan=lifespan,
+    default_response_class=JSONResponse,
+)
 
 # ========== TAMBAHKAN INI ==========
 app.add_middleware(
@@ -25,21 +88,840 @@ HEADERS = {
 
 BASE_URL = "https://v1.samehadaku.how"
 
+# ------------------------
+# UPSTREAM CLIENT
+# ------------------------
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def env_bool(name: str, default: bool) -> bool:
+    val = os.getenv(name)
+    if val is None:
+        return default
+    return val.strip().lower() in ("1", "true", "yes", "on")
+
+UPSTREAM_POOL_SIZE = env_int("UPSTREAM_POOL_SIZE", 50)
+UPSTREAM_KEEPALIVE = env_int("UPSTREAM_KEEPALIVE", 20)
+UPSTREAM_KEEPALIVE_EXPIRY = env_float("UPSTREAM_KEEPALIVE_EXPIRY", 60.0)
+UPSTREAM_HTTP2 = env_bool("UPSTREAM_HTTP2", True)
+UPSTREAM_TIMEOUT = env_float("UPSTREAM_TIMEOUT", 15.0)
+
+_client = None
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Satu AsyncClient dipake bareng semua request, biar koneksi keep-alive
+    ke upstream kepake ulang (gak handshake TCP+TLS tiap hit).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        http2 = UPSTREAM_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                http2 = False
+        _client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=UPSTREAM_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=UPSTREAM_POOL_SIZE,
+                max_keepalive_connections=UPSTREAM_KEEPALIVE,
+                keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY,
+            ),
+            http2=http2,
+            follow_redirects=True,
+        )
+    return _client
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+SHUTDOWN_HOOKS.append(close_client)
+
+# ------------------------
+# METRICS
+# ------------------------
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+log = logging.getLogger("samehadaku")
+# httpx nge-log tiap request di INFO, kebanyakan buat scraper
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+METRICS_ENABLED = env_bool("METRICS_ENABLED", True)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels_text(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_label_value(v)}"' for n, v in zip(names, values)) + "}"
+
+class Counter:
+    def __init__(self, name: str, doc: str, labels=()):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self.values = {}
+        METRICS.append(self)
+
+    def inc(self, *values, amount=1):
+        if METRICS_ENABLED:
+            self.values[values] = self.values.get(values, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.doc}"
+        yield f"# TYPE {self.name} counter"
+        for values, v in sorted(self.values.items()):
+            yield f"{self.name}{_labels_text(self.labels, values)} {v}"
+
+class Gauge:
+    # nilainya diambil pas scrape dari fn() -> {label values: nilai}
+    def __init__(self, name: str, doc: str, fn, labels=()):
+        self.name = name
+        self.doc = doc
+        self.fn = fn
+        self.labels = tuple(labels)
+        METRICS.append(self)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.doc}"
+        yield f"# TYPE {self.name} gauge"
+        for values, v in sorted(self.fn().items()):
+            yield f"{self.name}{_labels_text(self.labels, values)} {v}"
+
+class Histogram:
+    def __init__(self, name: str, doc: str, buckets=LATENCY_BUCKETS, labels=()):
+        self.name = name
+        self.doc = doc
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        # label values -> [count per bucket (non-kumulatif) + +Inf, sum]
+        self.series = {}
+        METRICS.append(self)
+
+    def observe(self, value: float, *values):
+        if not METRICS_ENABLED:
+            return
+        series = self.series.get(values)
+        if series is None:
+            series = self.series[values] = [[0] * (len(self.buckets) + 1), 0.0]
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        series[0][i] += 1
+        series[1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.doc}"
+        yield f"# TYPE {self.name} histogram"
+        for values, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                cumulative += n
+                yield f"{self.name}_bucket{_labels_text(self.labels + ('le',), values + (bound,))} {cumulative}"
+            yield f"{self.name}_sum{_labels_text(self.labels, values)} {total}"
+            yield f"{self.name}_count{_labels_text(self.labels, values)} {cumulative}"
+
+METRICS = []
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "samehadaku_http_request_duration_seconds", "Latency request API per route.", labels=("route", "method", "status")
+)
+STAGE_SECONDS = Histogram(
+    "samehadaku_stage_duration_seconds",
+    "Latency per tahap: upstream connect/ttfb/download, parse, extract, serialize, compress.",
+    labels=("route", "stage"),
+)
+UPSTREAM_RESPONSES = Counter("samehadaku_upstream_responses_total", "Response upstream per status code.", labels=("route", "status"))
+UPSTREAM_ERRORS = Counter("samehadaku_upstream_errors_total", "Request upstream yang gagal (timeout, koneksi, dll).", labels=("route", "error"))
+UPSTREAM_BYTES = Histogram("samehadaku_upstream_response_bytes", "Ukuran body HTML dari upstream.", BYTES_BUCKETS, labels=("route",))
+CACHE_LOOKUPS = Counter("samehadaku_cache_lookups_total", "Lookup response cache per hasil (hit/stale/miss).", labels=("route", "result"))
+PARSER_FALLBACKS = Counter(
+    "samehadaku_parser_fallbacks_total",
+    "Parser/selector fallback: backend gagal, target gak match, atau selector utama kosong.",
+    labels=("where", "kind"),
+)
+
+def observe_stage(route, stage: str, started: float):
+    STAGE_SECONDS.observe(time.perf_counter() - started, route or "other", stage)
+
+class UpstreamTrace:
+    """
+    Callback trace httpx (extensions["trace"]): pecah waktu satu request
+    upstream jadi connect (TCP+TLS, kalau koneksi baru), TTFB (kirim
+    request sampe header response dateng) dan download body. Redirect
+    dijumlahin.
+    """
+
+    def __init__(self):
+        self.started = {}
+        self.stages = {"connect": 0.0, "ttfb": 0.0, "download": 0.0}
+
+    async def __call__(self, event: str, info: dict):
+        name, _, phase = event.rpartition(".")
+        # connection.connect_tcp, connection.start_tls, http11/http2.send_request_headers, ...
+        step = name.rsplit(".", 1)[-1]
+        if phase == "started":
+            self.started[step] = time.perf_counter()
+            return
+        if phase not in ("complete", "failed") or step not in self.started:
+            return
+        if step in ("connect_tcp", "start_tls"):
+            self.stages["connect"] += time.perf_counter() - self.started.pop(step)
+        elif step == "receive_response_headers" and "send_request_headers" in self.started:
+            self.stages["ttfb"] += time.perf_counter() - self.started.pop("send_request_headers")
+        elif step == "receive_response_body":
+            self.stages["download"] += time.perf_counter() - self.started.pop(step)
+
+    def record(self, route):
+        for stage, seconds in self.stages.items():
+            if seconds:
+                STAGE_SECONDS.observe(seconds, route or "other", f"upstream_{stage}")
+
+async def traced_get(url: str, route: str = None, **kwargs):
+    """GET ke upstream lewat client bareng, sambil nyatet tahap, status code dan ukuran body."""
+    trace = UpstreamTrace() if METRICS_ENABLED else None
+    try:
+        resp = await get_client().get(url, extensions={"trace": trace} if trace else None, **kwargs)
+    except Exception as e:
+        UPSTREAM_ERRORS.inc(route or "other", type(e).__name__)
+        raise
+    finally:
+        if trace:
+            trace.record(route)
+    UPSTREAM_RESPONSES.inc(route or "other", str(resp.status_code))
+    UPSTREAM_BYTES.observe(len(resp.content), route or "other")
+    return resp
+
+class MetricsMiddleware:
+    """ASGI middleware: latency + status per route template (bukan path mentah, biar label gak meledak)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                getattr(route, "path", "unmatched"),
+                scope.get("method", ""),
+                str(status["code"]),
+            )
+
+app.add_middleware(MetricsMiddleware)
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# ------------------------
+# UPSTREAM RESILIENCE
+# ------------------------
+
+UPSTREAM_RETRIES = env_int("UPSTREAM_RETRIES", 2)
+UPSTREAM_ATTEMPT_TIMEOUT = env_float("UPSTREAM_ATTEMPT_TIMEOUT", 6.0)
+# batas total semua attempt (+ hedge + backoff), di bawah timeout flat 15 s yang lama
+UPSTREAM_DEADLINE = env_float("UPSTREAM_DEADLINE", 12.0)
+UPSTREAM_BACKOFF_BASE = env_float("UPSTREAM_BACKOFF_BASE", 0.2)
+UPSTREAM_BACKOFF_MAX = env_float("UPSTREAM_BACKOFF_MAX", 2.0)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# hedge: kalau attempt pertama belum jawab lewat p95 latency host itu,
+# tembak attempt kedua, pake yang duluan selesai
+HEDGE_ENABLED = env_bool("HEDGE_ENABLED", True)
+HEDGE_MIN_DELAY = env_float("HEDGE_MIN_DELAY", 0.3)
+HEDGE_MAX_DELAY = env_float("HEDGE_MAX_DELAY", 3.0)
+HEDGE_MIN_SAMPLES = env_int("HEDGE_MIN_SAMPLES", 20)
+
+BREAKER_FAILURES = env_int("BREAKER_FAILURES", 5)
+BREAKER_COOLDOWN = env_float("BREAKER_COOLDOWN", 30.0)
+
+UPSTREAM_RETRY_COUNT = Counter("samehadaku_upstream_retries_total", "Retry ke upstream.", labels=("route",))
+UPSTREAM_HEDGES = Counter("samehadaku_upstream_hedges_total", "Hedged request per pemenang (primary/hedge).", labels=("route", "winner"))
+BREAKER_REJECTS = Counter("samehadaku_breaker_rejections_total", "Request yang langsung ditolak karena breaker open.", labels=("host",))
+
+class UpstreamUnavailable(Exception):
+    pass
+
+class HostHealth:
+    """
+    Per host upstream: latency terakhir (buat delay hedge = p95) plus
+    circuit breaker. BREAKER_FAILURES gagal berturut-turut -> open selama
+    BREAKER_COOLDOWN, abis itu half-open: satu request nyoba, sukses ->
+    closed, gagal -> open lagi.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.latencies = deque(maxlen=200)
+        self.failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.probing = False
+        self.last_failed = False
+
+    def hedge_delay(self) -> float:
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return HEDGE_MAX_DELAY
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return min(max(p95, HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= BREAKER_COOLDOWN:
+            self.state = "half_open"
+            self.probing = False
+        if self.state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def end_probe(self):
+        # probe half-open yang ke-cancel / error aneh jangan bikin host kekunci selamanya
+        self.probing = False
+
+    def success(self, latency: float):
+        self.latencies.append(latency)
+        self.failures = 0
+        self.state = "closed"
+        self.probing = False
+        self.last_failed = False
+
+    def failure(self):
+        self.failures += 1
+        self.last_failed = True
+        if self.state == "half_open" or self.failures >= BREAKER_FAILURES:
+            if self.state != "open":
+                log.warning("Circuit breaker %s open (%d gagal)", self.host, self.failures)
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.probing = False
+
+_hosts = {}
+
+def host_health(url: str) -> HostHealth:
+    host = httpx.URL(url).host
+    health = _hosts.get(host)
+    if health is None:
+        health = _hosts[host] = HostHealth(host)
+    return health
+
+def upstream_down(url: str) -> bool:
+    """Host-nya lagi open / barusan gagal: tanda boleh kirim cache basi."""
+    health = _hosts.get(httpx.URL(url).host)
+    return health is not None and (health.state != "closed" or health.last_failed)
+
+Gauge(
+    "samehadaku_breaker_open",
+    "1 kalau circuit breaker host lagi open / half-open.",
+    lambda: {(h.host,): int(h.state != "closed") for h in _hosts.values()},
+    labels=("host",),
+)
+
+def _backoff(attempt: int) -> float:
+    # full jitter
+    return random.uniform(0, min(UPSTREAM_BACKOFF_MAX, UPSTREAM_BACKOFF_BASE * 2 ** attempt))
+
+async def _hedged_get(url: str, route, health: HostHealth, timeout: float, **kwargs):
+    """
+    Satu attempt: primary + (kalau kelamaan) hedge. Dua-duanya di-cancel
+    pas deadline attempt (`timeout` dari mulai primary), hedge cuma dapet
+    sisa waktu primary, bukan timeout penuh sendiri.
+    """
+    deadline = time.monotonic() + timeout
+    primary = asyncio.create_task(traced_get(url, route, timeout=timeout, **kwargs))
+    pending = {primary}
+    hedged = False
+    error = None
+    try:
+        if HEDGE_ENABLED:
+            done, _ = await asyncio.wait(pending, timeout=min(health.hedge_delay(), timeout))
+            if done:
+                pending = set()
+                return primary.result()
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                pending.add(asyncio.create_task(traced_get(url, route, timeout=remaining, **kwargs)))
+                hedged = True
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if t.exception() is None:
+                    if hedged:
+                        UPSTREAM_HEDGES.inc(route or "other", "primary" if t is primary else "hedge")
+                    return t.result()
+                error = error or t.exception()
+        if error is not None and not pending:
+            raise error
+        raise httpx.TimeoutException(f"upstream attempt timeout ({timeout:.1f} s)")
+    finally:
+        for t in pending:
+            t.cancel()
+
+async def resilient_get(url: str, route: str = None, **kwargs):
+    """
+    GET ke upstream dengan retry (backoff + jitter) buat error jaringan /
+    RETRY_STATUSES, hedge per attempt, dan circuit breaker per host.
+    Breaker open -> UpstreamUnavailable langsung, gak nunggu timeout.
+
+    URL BASE_URL diarahin ke mirror tercepat (MIRRORS); retry pindah ke
+    mirror lain. Body-nya dibaca lewat upstream_text biar URL mirror
+    balik jadi BASE_URL.
+    """
+    attempt_timeout = kwargs.pop("timeout", UPSTREAM_ATTEMPT_TIMEOUT)
+    deadline = time.monotonic() + UPSTREAM_DEADLINE
+    tried = set()
+    for attempt in range(UPSTREAM_RETRIES + 1):
+        # attempt ini dipotong sama sisa deadline total; kalau abis ini sisanya
+        # gak cukup buat attempt yang masuk akal, ini attempt terakhir
+        remaining = deadline - time.monotonic()
+        timeout = max(min(attempt_timeout, remaining), 0.1)
+        last = attempt == UPSTREAM_RETRIES or remaining - timeout < attempt_timeout / 2
+        target, origin = MIRRORS.route(url, tried)
+        health = host_health(target)
+        if not health.allow():
+            BREAKER_REJECTS.inc(health.host)
+            raise UpstreamUnavailable(f"circuit breaker {health.host} open")
+        attempt_kwargs = kwargs
+        if origin is not None and origin != BASE_URL:
+            attempt_kwargs = {**kwargs, "headers": {**kwargs.get("headers", {}), "Referer": f"{origin}/"}}
+        started = time.perf_counter()
+        try:
+            resp = await _hedged_get(target, route, health, timeout, **attempt_kwargs)
+        except httpx.TransportError:
+            health.failure()
+            MIRRORS.mark_down(origin)
+            if last:
+                raise
+        except Exception:
+            # TooManyRedirects, DecodingError, dst: gak di-retry tapi tetep gagal
+            health.failure()
+            raise
+        else:
+            if resp.status_code not in RETRY_STATUSES:
+                health.success(time.perf_counter() - started)
+                MIRRORS.observe(origin, time.perf_counter() - started)
+                return resp
+            health.failure()
+            if last:
+                return resp
+        finally:
+            health.end_probe()
+        if origin is not None:
+            tried.add(origin)
+        UPSTREAM_RETRY_COUNT.inc(route or "other")
+        await asyncio.sleep(min(_backoff(attempt), max(deadline - time.monotonic() - attempt_timeout / 2, 0)))
+
+# ------------------------
+# MIRRORS
+# ------------------------
+
+# origin mirror lain selain BASE_URL, dipisah koma: https://v2.samehadaku.how,https://samehadaku.email
+UPSTREAM_MIRRORS = [m.strip().rstrip("/") for m in os.getenv("UPSTREAM_MIRRORS", "").split(",") if m.strip()]
+MIRROR_PROBE_INTERVAL = env_float("MIRROR_PROBE_INTERVAL", 60.0)
+MIRROR_PROBE_TIMEOUT = env_float("MIRROR_PROBE_TIMEOUT", 5.0)
+MIRROR_PROBE_PATH = os.getenv("MIRROR_PROBE_PATH", "/")
+
+def url_origin(url) -> str:
+    u = httpx.URL(str(url))
+    return f"{u.scheme}://{u.netloc.decode('ascii')}"
+
+class MirrorPool:
+    """
+    BASE_URL + UPSTREAM_MIRRORS. Latency tiap origin (EWMA dari probe
+    background + fetch beneran), fetch diarahin ke yang sehat dan paling
+    cepet. URL di cache / response tetep pake BASE_URL.
+    """
+
+    def __init__(self, mirrors):
+        self.mirrors = mirrors
+        self.latency = {}
+        self.healthy = {}
+        self.last_probe = None
+
+    @property
+    def origins(self):
+        return list(dict.fromkeys([BASE_URL, *self.mirrors]))
+
+    def _usable(self, origin: str) -> bool:
+        health = _hosts.get(httpx.URL(origin).host)
+        return self.healthy.get(origin, True) and (health is None or health.state != "open")
+
+    def pick(self, exclude=()) -> str:
+        origins = self.origins
+        candidates = [o for o in origins if o not in exclude and self._usable(o)]
+        if not candidates:
+            candidates = [o for o in origins if o not in exclude] or origins
+        # belum ada data latency: BASE_URL duluan
+        return min(candidates, key=lambda o: (self.latency.get(o, float("inf")), o != BASE_URL))
+
+    def route(self, url: str, exclude=()):
+        """url (pake BASE_URL) -> (url ke mirror kepilih, origin-nya); origin None kalau gak ada mirror."""
+        if not self.mirrors or not url.startswith(BASE_URL):
+            return url, None
+        origin = self.pick(exclude)
+        return origin + url[len(BASE_URL):], origin
+
+    def observe(self, origin, seconds: float):
+        if origin is None:
+            return
+        old = self.latency.get(origin)
+        self.latency[origin] = seconds if old is None else 0.7 * old + 0.3 * seconds
+
+    def mark_down(self, origin):
+        # error jaringan pas fetch: skip sampe probe berikutnya bilang sehat
+        if origin is not None and self.mirrors:
+            self.healthy[origin] = False
+
+    async def probe(self, origin: str):
+        started = time.perf_counter()
+        try:
+            resp = await get_client().get(
+                origin + MIRROR_PROBE_PATH, headers={"Referer": f"{origin}/"}, timeout=MIRROR_PROBE_TIMEOUT
+            )
+            ok = resp.status_code < 400
+        except Exception as e:
+            log.warning("Probe mirror %s gagal: %s", origin, e)
+            ok = False
+        if ok != self.healthy.get(origin, True):
+            log.info("Mirror %s %s", origin, "sehat lagi" if ok else "gak sehat")
+        self.healthy[origin] = ok
+        if ok:
+            self.observe(origin, time.perf_counter() - started)
+
+    async def probe_all(self):
+        await asyncio.gather(*(self.probe(o) for o in self.origins))
+        self.last_probe = time.time()
+
+    def stats(self):
+        if not self.mirrors:
+            return {}
+        origins = {
+            o: {"healthy": self.healthy.get(o), "latencyMs": round(self.latency[o] * 1000, 1) if o in self.latency else None}
+            for o in self.origins
+        }
+        return {"active": self.pick(), "lastProbe": self.last_probe, "origins": origins}
+
+MIRRORS = MirrorPool(UPSTREAM_MIRRORS)
+
+def upstream_text(resp) -> str:
+    """Body HTML dengan origin mirror / redirect diganti BASE_URL, biar samehadakuUrl konsisten."""
+    text = resp.text
+    for origin in {url_origin(r.url) for r in (*resp.history, resp)}:
+        if origin != BASE_URL:
+            text = text.replace(origin, BASE_URL)
+    return text
+
+Gauge(
+    "samehadaku_mirror_latency_seconds",
+    "EWMA latency per mirror (probe + fetch).",
+    lambda: {(o,): v for o, v in MIRRORS.latency.items()},
+    labels=("origin",),
+)
+Gauge(
+    "samehadaku_mirror_healthy",
+    "1 kalau probe terakhir mirror sukses.",
+    lambda: {(o,): int(MIRRORS._usable(o)) for o in MIRRORS.origins} if MIRRORS.mirrors else {},
+    labels=("origin",),
+)
+
+_mirror_probe_task = None
+
+async def _mirror_probe_loop():
+    while True:
+        try:
+            await MIRRORS.probe_all()
+        except Exception as e:
+            log.exception("Error probing mirrors: %s", e)
+        await asyncio.sleep(MIRROR_PROBE_INTERVAL)
+
+async def start_mirror_probe():
+    global _mirror_probe_task
+    if MIRRORS.mirrors and MIRROR_PROBE_INTERVAL > 0:
+        _mirror_probe_task = asyncio.create_task(_mirror_probe_loop())
+
+async def stop_mirror_probe():
+    if _mirror_probe_task is not None and not _mirror_probe_task.done():
+        _mirror_probe_task.cancel()
+
+STARTUP_HOOKS.append(start_mirror_probe)
+SHUTDOWN_HOOKS.append(stop_mirror_probe)
+
+# ------------------------
+# SINGLE FLIGHT
+# ------------------------
+
+class SingleFlight:
+    """
+    Gabungin call yang sama (key sama) yang lagi jalan barengan: cuma satu
+    yang beneran jalan, sisanya nunggu hasil yang sama.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.stats = {"leaders": 0, "deduplicated": 0}
+
+    async def do(self, key, fn):
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self.calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["deduplicated"] += 1
+        # shield: kalau client yang mulai duluan disconnect, yang lain tetep dapet hasil
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self.calls.get(key) is task:
+            del self.calls[key]
+
+# satu buat fetch HTML per URL, satu buat fetch+parse+extract per route
+FETCH_FLIGHTS = SingleFlight()
+PAGE_FLIGHTS = SingleFlight()
+
+# ------------------------
+# PARSER BACKEND
+# ------------------------
+
+# "auto" = lxml kalau ke-install, selain itu html.parser
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "auto").strip().lower()
+
+def _has_module(name: str) -> bool:
+    # cuma dicek ada/nggak, gak di-import (lxml dkk baru ke-load pas parse pertama)
+    return importlib.util.find_spec(name) is not None
+
+HAS_LXML = _has_module("lxml")
+
+class ParseTarget:
+    """
+    Target parse per route: cuma elemen yang cocok salah satu rule yang
+    dibikin Tag (plus semua isinya), menu/sidebar/footer dilewatin.
+    Rule = (tag, attr, op, value) dengan op ala CSS: "~=" token class,
+    "=" sama persis, "*=" substring; attr None = cocokin nama tag aja.
+    Semua selector yang dipake extractor route itu harus ketutup di sini.
+    """
+
+    def __init__(self, *rules):
+        self.rules = rules
+        self._strainer = None
+
+    @property
+    def strainer(self):
+        """SoupStrainer versi bs4, baru dibikin pas parse pertama (bs4 di-import lazy)."""
+        if self._strainer is None:
+            self._strainer = _strainer_class()(self)
+        return self._strainer
+
+    def allows(self, name, attrs):
+        attrs = attrs or {}
+        for tag, attr, op, value in self.rules:
+            if tag and tag != name:
+                continue
+            if attr is None:
+                return True
+            got = attrs.get(attr)
+            if got is None:
+                continue
+            if isinstance(got, list):
+                got = " ".join(got)
+            if op == "~=" and value in got.split():
+                return True
+            if op == "=" and got == value:
+                return True
+            if op == "*=" and value in got:
+                return True
+        return False
+
+_TargetStrainer = None
+
+def _strainer_class():
+    global _TargetStrainer
+    if _TargetStrainer is None:
+        from bs4 import SoupStrainer
+
+        class TargetStrainer(SoupStrainer):
+            def __init__(self, target):
+                super().__init__()
+                self.target = target
+
+            def allow_tag_creation(self, nsprefix, name, attrs):
+                return self.target.allows(name, attrs)
+
+            def allow_string_creation(self, string):
+                return False
+
+        _TargetStrainer = TargetStrainer
+    return _TargetStrainer
+
+LIBRARY_TARGET = ParseTarget(
+    (None, "class", "~=", "animepost"),
+    ("div", "class", "~=", "pagination"),
+)
+
+# episode sengaja gak ada: find_previous() dan find("iframe") di sana
+# bergantung sama urutan elemen satu halaman penuh
+PARSE_TARGETS = {
+    "home": ParseTarget(
+        (None, "class", "~=", "post-show"),
+        (None, "class", "~=", "animepost"),
+        (None, "class", "~=", "widget_senction"),
+        (None, "class", "~=", "serieslist"),
+    ),
+    "genres": ParseTarget(("a", "href", "*=", "/genre/")),
+    "latest": ParseTarget(
+        (None, "class", "~=", "post-show"),
+        (None, "class", "~=", "animepost"),
+        ("div", "class", "~=", "pagination"),
+    ),
+    "ongoing": LIBRARY_TARGET,
+    "completed": LIBRARY_TARGET,
+    "popular": LIBRARY_TARGET,
+    "movies": LIBRARY_TARGET,
+    "batch": LIBRARY_TARGET,
+    "genre": LIBRARY_TARGET,
+    "search": LIBRARY_TARGET,
+    "schedule": ParseTarget(
+        ("div", "class", "~=", "entry-content"),
+        ("main", None, None, None),
+    ),
+    "anime": ParseTarget(
+        ("div", "class", "~=", "thumb"),
+        (None, "class", "~=", "infox"),
+        ("span", "itemprop", "=", "ratingValue"),
+        ("span", "itemprop", "=", "ratingCount"),
+        ("div", "class", "~=", "desc"),
+        ("div", "class", "~=", "entry-content"),
+        ("div", "class", "~=", "genre-info"),
+        (None, "class", "~=", "lstepsiode"),
+        (None, "class", "~=", "trailer-anime"),
+    ),
+}
+PARSE_TARGETS_ENABLED = env_bool("PARSE_TARGETS_ENABLED", True)
+
+# bs4 (+ lxml) di-import di dalem parser: cold start gak bayar import-nya
+# kalau request pertama kelayanan dari cache / snapshot
+def _parse_html_parser(html: str, target=None):
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, "html.parser", parse_only=target.strainer if target else None)
+
+def _parse_lxml(html: str, target=None):
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, "lxml", parse_only=target.strainer if target else None)
+
+PARSER_BACKENDS = {
+    "html.parser": (_parse_html_parser, None),
+    "lxml": (_parse_lxml, "lxml"),
+}
+
+def resolve_parser_backend(name: str) -> str:
+    if name == "auto":
+        return "lxml" if HAS_LXML else "html.parser"
+    if name not in PARSER_BACKENDS:
+        # termasuk "selectolax" yang udah dibuang: lexbor cuma pre-pass, tree-nya
+        # tetep dibangun ulang sama bs4, jadi gak lebih cepet dari lxml dan alokasinya 2-3x
+        log.warning("Unknown PARSER_BACKEND %r, fallback ke auto", name)
+        return resolve_parser_backend("auto")
+    module = PARSER_BACKENDS[name][1]
+    if module and not _has_module(module):
+        log.warning("PARSER_BACKEND %r butuh %s, fallback ke html.parser", name, module)
+        return "html.parser"
+    return name
+
+ACTIVE_PARSER = resolve_parser_backend(PARSER_BACKEND)
+
+def make_soup(html: str, backend: str = None, route: str = None):
+    name = backend or ACTIVE_PARSER
+    parse = PARSER_BACKENDS[name][0]
+    target = PARSE_TARGETS.get(route) if PARSE_TARGETS_ENABLED else None
+    try:
+        soup = parse(html, target)
+    except Exception as e:
+        if name == "html.parser":
+            raise
+        log.warning("Parser %s gagal (%s), fallback ke html.parser", name, e)
+        PARSER_FALLBACKS.inc(route or "other", f"backend_{name}")
+        name = "html.parser"
+        soup = _parse_html_parser(html, target)
+    # layout gak sesuai target (halaman aneh / error page): parse full aja
+    if target is not None and soup.find(True) is None:
+        PARSER_FALLBACKS.inc(route or "other", "target_miss")
+        soup = PARSER_BACKENDS[name][0](html)
+    return soup
+
 # ------------------------
 # HELPERS
 # ------------------------
 
-def get_soup(url: str):
+async def fetch_html(url: str, route: str = None):
+    return await FETCH_FLIGHTS.do(url, lambda: _fetch_html(url, route))
+
+async def _fetch_html(url: str, route: str = None):
     try:
-        session = requests.Session()
-        req = session.get(url, headers=HEADERS, timeout=15)
+        req = await resilient_get(url, route)
         if req.status_code == 404:
             return None
         req.raise_for_status()
-        return BeautifulSoup(req.text, "html.parser")
+        return upstream_text(req)
+    except UpstreamUnavailable as e:
+        log.debug("Skip %s: %s", url, e)
+        return None
     except Exception as e:
-        print(f"Error scraping {url}: {e}")
+        log.warning("Error scraping %s: %s", url, e)
+        return None
+
+async def get_soup(url: str, route: str = None):
+    html = await fetch_html(url, route)
+    if html is None:
         return None
+    started = time.perf_counter()
+    soup = make_soup(html, route=route)
+    observe_stage(route, "parse", started)
+    return soup
 
 def extract_id(url: str):
     if not url:
@@ -108,104 +990,703 @@ def get_pagination(soup, current_page):
     }
 
 # ------------------------
-# PARSERS
+# RESPONSE CACHE
 # ------------------------
 
-def parse_latest_item(node):
-    try:
-        a_tag = node.find("a")
-        if not a_tag:
-            return None
+# route -> (ttl, stale window) dalam detik. Lewat ttl masih boleh dikirim
+# (stale) sambil di-refresh di background, lewat stale window baru fetch ulang.
+ROUTE_TTL = {
+    "home": (120, 900),
+    "latest": (60, 600),
+    "ongoing": (600, 3600),
+    "completed": (3600, 6 * 3600),
+    "popular": (1800, 6 * 3600),
+    "movies": (3600, 6 * 3600),
+    "batch": (3600, 6 * 3600),
+    "genres": (6 * 3600, 24 * 3600),
+    "genre": (1800, 6 * 3600),
+    "search": (300, 1800),
+    "schedule": (6 * 3600, 24 * 3600),
+    "anime": (3600, 6 * 3600),
+    "episode": (6 * 3600, 24 * 3600),
+}
+DEFAULT_TTL = (300, 1800)
 
-        real_url = a_tag.get("href", "")
-        if not real_url:
-            return None
+# lewat stale window entry masih disimpen segini lama, cuma dikirim kalau
+# upstream lagi down (breaker open / fetch gagal)
+STALE_IF_ERROR = env_int("STALE_IF_ERROR", 24 * 3600)
 
-        anime_id = extract_id(real_url)
+CACHE_ENABLED = env_bool("CACHE_ENABLED", True)
+CACHE_MAX_ENTRIES = env_int("CACHE_MAX_ENTRIES", 2000)
+CACHE_MAX_BYTES = env_int("CACHE_MAX_BYTES", 64 * 1024 * 1024)
 
-        title = "Unknown"
-        t_div = node.find("div", class_="title")
-        if t_div:
-            title = t_div.get_text(strip=True)
-        else:
-            title = a_tag.get("title") or a_tag.get_text(" ", strip=True) or "Unknown"
+COMPRESS_MIN_BYTES = env_int("COMPRESS_MIN_BYTES", 1024)
 
-        poster = extract_poster(node)
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
-        ep = "?"
-        released = "?"
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
 
-        dtla = node.find("div", class_="dtla") or node
-        full_text = dtla.get_text(" ", strip=True)
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6, mtime=0)
 
-        m_ep = re.search(r"(?:Episode\s*)?(\d+)", full_text, re.IGNORECASE)
-        if m_ep:
-            ep = m_ep.group(1)
+def payload_size(payload) -> int:
+    """
+    Perkiraan memori tree payload (dict/list/str/angka) pake sys.getsizeof.
+    Object yang sama cuma dihitung sekali.
+    """
+    seen = set()
+    total = 0
+    stack = [payload]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+    return total
 
-        date_span = node.find("span", class_="date") or node.find("span", class_="year")
-        if date_span:
-            released = date_span.get_text(strip=True)
-        else:
-            if "Released on" in full_text:
-                parts = full_text.split("Released on")
-                if len(parts) > 1:
-                    released = parts[1].replace(":", "").strip().split("Posted")[0].strip()
-            elif "yang lalu" in full_text:
-                m_date = re.search(r"([\d\w\s]+yang lalu)", full_text)
-                if m_date:
-                    released = m_date.group(1).strip()
+class CacheEntry:
+    """
+    Payload hasil parse + body JSON-nya (sekali serialize), ETag dari hash
+    body, dan versi gzip/br yang dikompres sekali pas pertama diminta.
+    `size` = body + versi terkompres; tree payload baru ditambahin pas masuk
+    ResponseCache.put, biar CACHE_MAX_BYTES beneran budget memori.
+    """
 
-        return {
-            "title": title,
-            "poster": poster,
-            "episodes": ep,
-            "releasedOn": released,
-            "animeId": anime_id,
-            "href": f"/samehadaku/anime/{anime_id}",
-            "samehadakuUrl": real_url,
-        }
-    except:
-        return None
+    __slots__ = ("key", "route", "payload", "body", "etag", "encoded", "size", "expires", "stale_until", "prefetched")
 
-def parse_library_item(node, status_force=None):
-    try:
-        a_tag = node.find("a")
-        if not a_tag:
+    def __init__(self, route, payload, ttl=0, stale=0):
+        self.key = None
+        self.route = route
+        self.payload = payload
+        started = time.perf_counter()
+        self.body = render_json(payload)
+        observe_stage(route, "serialize", started)
+        self.etag = make_etag(self.body)
+        self.encoded = {}
+        self.size = len(self.body)
+        now = time.monotonic()
+        self.expires = now + ttl
+        self.stale_until = now + ttl + stale
+        # diisi prefetcher; dinolin lagi pas pertama kepake request beneran
+        self.prefetched = False
+
+    @classmethod
+    def restore(cls, route, body: bytes, etag: str, expires_in: float, stale_in: float):
+        """Entry dari body yang udah di-serialize (L2), tanpa render ulang."""
+        entry = cls.__new__(cls)
+        entry.key = None
+        entry.route = route
+        entry.payload = parse_json(body)
+        entry.body = body
+        entry.etag = etag
+        entry.encoded = {}
+        entry.size = len(body)
+        now = time.monotonic()
+        entry.expires = now + expires_in
+        entry.stale_until = now + stale_in
+        entry.prefetched = False
+        return entry
+
+    def encoded_body(self, encoding: str) -> bytes:
+        if not encoding:
+            return self.body
+        data = self.encoded.get(encoding)
+        if data is None:
+            started = time.perf_counter()
+            data = compress_body(self.body, encoding)
+            observe_stage(self.route, "compress", started)
+            self.encoded[encoding] = data
+            RESPONSE_CACHE.account(self, len(data))
+        return data
+
+class ResponseCache:
+    """
+    LRU payload hasil parse, dibatesin jumlah entry dan total byte
+    (body JSON + versi terkompresnya).
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "stale": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
             return None
+        now = time.monotonic()
+        if now >= entry.stale_until:
+            if now >= entry.stale_until + STALE_IF_ERROR:
+                self.delete(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
 
-        real_url = a_tag.get("href", "")
-        if not real_url:
+    def get_if_error(self, key):
+        """Entry basi (lewat stale window) yang masih dalem STALE_IF_ERROR."""
+        entry = self.entries.get(key)
+        if entry is None or time.monotonic() >= entry.stale_until + STALE_IF_ERROR:
             return None
+        return entry
 
-        anime_id = extract_id(real_url)
+    def set(self, key, route, payload):
+        ttl, stale = ROUTE_TTL.get(route, DEFAULT_TTL)
+        return self.put(key, CacheEntry(route, payload, ttl, stale))
 
-        title_div = node.find("div", class_="title")
-        title = title_div.get_text(strip=True) if title_div else a_tag.get_text(" ", strip=True)
+    def put(self, key, entry):
+        # walk payload cuma buat entry yang beneran disimpen
+        entry.size = len(entry.body) + sum(len(v) for v in entry.encoded.values()) + payload_size(entry.payload)
+        if entry.size > self.max_bytes:
+            return entry
+        self.delete(key)
+        entry.key = key
+        self.entries[key] = entry
+        self.total_bytes += entry.size
+        self._evict()
+        return entry
 
-        poster = extract_poster(node)
+    def account(self, entry, extra: int):
+        entry.size += extra
+        if entry.key is not None and self.entries.get(entry.key) is entry:
+            self.total_bytes += extra
+            self._evict()
 
-        score = "?"
-        sc = node.find("div", class_="score")
-        if sc:
-            score = sc.get_text(strip=True).strip()
+    def _evict(self):
+        while self.entries and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            _, old = self.entries.popitem(last=False)
+            self.total_bytes -= old.size
+            self.stats["evictions"] += 1
 
-        atype = "TV"
-        tp = node.find("div", class_="type")
-        if tp:
-            atype = tp.get_text(strip=True)
+    def delete(self, key):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= old.size
 
-        status = status_force if status_force else "Ongoing"
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
 
-        return {
-            "title": title,
-            "poster": poster,
-            "type": atype,
-            "score": score,
+RESPONSE_CACHE = ResponseCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+
+def _cache_hit_ratio():
+    st = RESPONSE_CACHE.stats
+    total = st["hits"] + st["stale"] + st["misses"]
+    return {(): (st["hits"] + st["stale"]) / total if total else 0.0}
+
+Gauge("samehadaku_cache_entries", "Jumlah entry di response cache.", lambda: {(): len(RESPONSE_CACHE.entries)})
+Gauge("samehadaku_cache_bytes", "Total byte body (plus versi terkompres) di response cache.", lambda: {(): RESPONSE_CACHE.total_bytes})
+Gauge("samehadaku_cache_hit_ratio", "(hit + stale) / semua lookup sejak start.", _cache_hit_ratio)
+
+# ------------------------
+# SHARED CACHE (L2)
+# ------------------------
+
+# file SQLite yang dibagi semua worker di satu host; kosong = gak dipake
+SHARED_CACHE_DB = os.getenv("SHARED_CACHE_DB", "")
+SHARED_CACHE_WAIT = env_float("SHARED_CACHE_WAIT", 5.0)  # nunggu worker lain yang lagi scrape
+SHARED_CACHE_LEASE = env_float("SHARED_CACHE_LEASE", 30.0)
+# lock tulis lagi dipegang worker lain lebih lama dari ini = tulisan/lease-nya di-skip
+SHARED_CACHE_BUSY_TIMEOUT = env_float("SHARED_CACHE_BUSY_TIMEOUT", 0.2)
+
+SHARED_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key         TEXT PRIMARY KEY,
+    route       TEXT,
+    body        BLOB NOT NULL,
+    etag        TEXT NOT NULL,
+    expires     REAL NOT NULL,
+    stale_until REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    key   TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    until REAL NOT NULL
+);
+"""
+
+class SharedCache:
+    """
+    L2 di bawah RESPONSE_CACHE: body JSON yang udah di-serialize + ETag +
+    waktu expire (wall clock, biar sama antar proses) di SQLite WAL. Tulis
+    pake satu transaksi (atomic), baca gak ngeblok penulis. Lease per key
+    biar cuma satu worker yang scrape halaman yang sama.
+
+    Semua akses SQLite jalan di satu thread sendiri: nunggu lock tulis
+    (busy timeout) gak boleh nahan event loop, dan connection-nya cuma
+    dipake satu thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.owner = f"{os.getpid()}"
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared-cache")
+        self._conn = None
+        self._writes = 0
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "waits": 0, "busy": 0, "errors": 0}
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                self.path, timeout=SHARED_CACHE_BUSY_TIMEOUT, check_same_thread=False, isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SHARED_CACHE_SCHEMA)
+        return self._conn
+
+    def _failed(self, what: str, key: str, e: sqlite3.Error):
+        if isinstance(e, sqlite3.OperationalError) and "locked" in str(e):
+            # rebutan lock sama worker lain: wajar, skip aja
+            self.stats["busy"] += 1
+            log.debug("Shared cache %s %s di-skip: %s", what, key, e)
+        else:
+            self.stats["errors"] += 1
+            log.warning("Shared cache %s %s gagal: %s", what, key, e)
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def close(self):
+        await self._run(self._close)
+        self.executor.shutdown(wait=False)
+
+    async def load(self, key: str, route: str, min_ttl=None, count: bool = True):
+        entry = await self._run(self._load, key, route, min_ttl, count)
+        if entry is not None:
+            CACHE_LOOKUPS.inc(route, "shared_hit")
+        return entry
+
+    def store(self, key: str, entry: CacheEntry):
+        """Fire-and-forget: response gak nunggu tulisan ke L2."""
+        self.executor.submit(self._store, key, entry)
+
+    async def claim(self, key: str) -> bool:
+        return await self._run(self._claim, key)
+
+    async def release(self, key: str):
+        await self._run(self._release, key)
+
+    def _load(self, key: str, route: str, min_ttl=None, count: bool = True):
+        try:
+            row = self.conn.execute(
+                "SELECT body, etag, expires, stale_until FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._failed("read", key, e)
+            return None
+        now = time.time()
+        if row is None or now >= row[3] or (min_ttl is not None and row[2] - now <= min_ttl):
+            if count:
+                self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return CacheEntry.restore(route, bytes(row[0]), row[1], row[2] - now, row[3] - now)
+
+    def _store(self, key: str, entry: CacheEntry):
+        now = time.time()
+        mono = time.monotonic()
+        try:
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, route, body, etag, expires, stale_until) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, entry.route, entry.body, entry.etag, now + entry.expires - mono, now + entry.stale_until - mono),
+                )
+            self.stats["writes"] += 1
+            self._writes += 1
+            if self._writes % 200 == 0:
+                self.purge()
+        except sqlite3.Error as e:
+            self._failed("write", key, e)
+
+    def purge(self):
+        # yang udah lewat stale window dibuang (gak dipake buat stale-if-error lintas worker)
+        with self.conn:
+            self.conn.execute("DELETE FROM entries WHERE stale_until < ?", (time.time(),))
+            self.conn.execute("DELETE FROM leases WHERE until < ?", (time.time(),))
+
+    def _claim(self, key: str) -> bool:
+        now = time.time()
+        try:
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                self.conn.execute("DELETE FROM leases WHERE key = ? AND until < ?", (key, now))
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO leases (key, owner, until) VALUES (?, ?, ?)",
+                    (key, self.owner, now + SHARED_CACHE_LEASE),
+                )
+            return cur.rowcount == 1
+        except sqlite3.Error as e:
+            self._failed("lease", key, e)
+            return True
+
+    def _release(self, key: str):
+        try:
+            with self.conn:
+                self.conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+        except sqlite3.Error as e:
+            self._failed("release", key, e)
+
+    def _poll(self, key: str, route: str, min_ttl):
+        entry = self._load(key, route, min_ttl, count=False)
+        if entry is not None:
+            return entry, False
+        try:
+            row = self.conn.execute("SELECT until FROM leases WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None, False
+        return None, row is not None and row[0] >= time.time()
+
+    async def wait(self, key: str, route: str, min_ttl=None):
+        """Poll sampe worker yang pegang lease selesai (atau SHARED_CACHE_WAIT abis)."""
+        self.stats["waits"] += 1
+        deadline = time.monotonic() + SHARED_CACHE_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry, leased = await self._run(self._poll, key, route, min_ttl)
+            if entry is not None:
+                CACHE_LOOKUPS.inc(route, "shared_hit")
+            if entry is not None or not leased:
+                return entry
+        return None
+
+SHARED_CACHE = SharedCache(SHARED_CACHE_DB) if SHARED_CACHE_DB else None
+
+async def close_shared_cache():
+    if SHARED_CACHE is not None:
+        await SHARED_CACHE.close()
+
+SHUTDOWN_HOOKS.append(close_shared_cache)
+
+# task refresh background, disimpen biar gak ke-GC di tengah jalan
+_refresh_tasks = {}
+
+# True = lewatin lookup cache (request profiling "cold"), hasilnya tetep disimpen
+BYPASS_CACHE = contextvars.ContextVar("bypass_cache", default=False)
+# True di task prefetcher: lookup-nya gak diitung prefetch hit / gak mancing prefetch lagi
+PREFETCHING = contextvars.ContextVar("prefetching", default=False)
+
+PREFETCH_HITS = Counter("samehadaku_prefetch_hits_total", "Entry hasil prefetch yang kepake request.", labels=("route",))
+
+def _mark_prefetch_used(entry):
+    if entry.prefetched and not PREFETCHING.get():
+        entry.prefetched = False
+        PREFETCH_HITS.inc(entry.route)
+
+async def build_page(key: str, route: str, url: str, extract):
+    soup = await get_soup(url, route)
+    if soup is None:
+        return None
+    started = time.perf_counter()
+    payload = extract(soup)
+    observe_stage(route, "extract", started)
+    if payload is None:
+        return None
+    if CACHE_ENABLED:
+        entry = RESPONSE_CACHE.set(key, route, payload)
+        if SHARED_CACHE is not None:
+            SHARED_CACHE.store(key, entry)
+        return entry
+    return CacheEntry(route, payload)
+
+async def fill_page(key: str, route: str, url: str, extract, min_ttl=None):
+    """
+    Isi L1 yang kosong / mau di-refresh: ambil dari SHARED_CACHE (hasil
+    worker lain) kalau ada, selain itu scrape sendiri. Kalau worker lain
+    lagi nge-scrape key yang sama, tunggu hasilnya dulu.
+    min_ttl: None = entry L2 yang udah stale juga boleh; angka = sisa
+    umurnya minimal segini.
+    """
+    if SHARED_CACHE is None or not CACHE_ENABLED:
+        return await build_page(key, route, url, extract)
+
+    entry = await SHARED_CACHE.load(key, route, min_ttl)
+    if entry is not None:
+        return RESPONSE_CACHE.put(key, entry)
+    claimed = await SHARED_CACHE.claim(key)
+    if not claimed:
+        entry = await SHARED_CACHE.wait(key, route, min_ttl)
+        if entry is not None:
+            return RESPONSE_CACHE.put(key, entry)
+    try:
+        return await build_page(key, route, url, extract)
+    finally:
+        if claimed:
+            await SHARED_CACHE.release(key)
+
+async def _refresh_page(key, route, url, extract):
+    try:
+        await PAGE_FLIGHTS.do(key, lambda: fill_page(key, route, url, extract, min_ttl=0))
+    except Exception as e:
+        log.warning("Error refreshing %s: %s", url, e)
+    finally:
+        _refresh_tasks.pop(key, None)
+
+async def load_entry(route: str, url: str, extract, fields=None, list_key=None):
+    """
+    Ambil entry route dari cache; kalau gak ada, scrape + parse upstream.
+    extract(soup) -> payload (dict) atau None kalau gagal.
+
+    Kalau `fields` diisi (hasil parse_fields), payload dipangkas pake
+    select_fields dan disimpen di key sendiri. Versi full yang masih fresh
+    di cache langsung dipangkas aja, gak usah fetch/parse ulang.
+    """
+    use_cache = CACHE_ENABLED and not BYPASS_CACHE.get()
+    key = f"{route}:{url}"
+    if fields is not None:
+        full = RESPONSE_CACHE.get(key) if use_cache else None
+        key = f"{key}#fields={','.join(sorted(fields))}"
+        narrow = extract
+        extract = lambda soup: select_fields(narrow(soup), fields, list_key)
+        if full is not None and time.monotonic() < full.expires and RESPONSE_CACHE.get(key) is None:
+            RESPONSE_CACHE.stats["hits"] += 1
+            CACHE_LOOKUPS.inc(route, "hit")
+            _mark_prefetch_used(full)
+            return RESPONSE_CACHE.set(key, route, select_fields(full.payload, fields, list_key))
+    if not use_cache:
+        return await PAGE_FLIGHTS.do(key, lambda: build_page(key, route, url, extract))
+
+    entry = RESPONSE_CACHE.get(key)
+    if entry is not None:
+        if time.monotonic() < entry.expires:
+            RESPONSE_CACHE.stats["hits"] += 1
+            CACHE_LOOKUPS.inc(route, "hit")
+        else:
+            # stale-while-revalidate: kirim yang lama, refresh di belakang
+            RESPONSE_CACHE.stats["stale"] += 1
+            CACHE_LOOKUPS.inc(route, "stale")
+            if key not in _refresh_tasks:
+                _refresh_tasks[key] = asyncio.create_task(_refresh_page(key, route, url, extract))
+        _mark_prefetch_used(entry)
+        return entry
+
+    RESPONSE_CACHE.stats["misses"] += 1
+    CACHE_LOOKUPS.inc(route, "miss")
+    entry = await PAGE_FLIGHTS.do(key, lambda: fill_page(key, route, url, extract))
+    if entry is None and upstream_down(url):
+        # upstream down: mending kirim data basi daripada 500
+        entry = RESPONSE_CACHE.get_if_error(key)
+        if entry is not None:
+            CACHE_LOOKUPS.inc(route, "stale_if_error")
+    return entry
+
+async def load_page(route: str, url: str, extract):
+    entry = await load_entry(route, url, extract)
+    return entry.payload if entry else None
+
+def _etag_matches(header: str, etag: str) -> bool:
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def _accepted_encodings(accept: str) -> dict:
+    """Accept-Encoding -> {coding: q}; "gzip, br;q=0" -> {"gzip": 1.0, "br": 0.0}."""
+    codings = {}
+    for part in accept.lower().split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+def _pick_encoding(accept: str):
+    codings = _accepted_encodings(accept)
+    wildcard = codings.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    # q tertinggi menang, kalau sama br duluan; q=0 berarti ditolak
+    best = max(candidates, key=lambda c: codings.get(c, wildcard))
+    return best if codings.get(best, wildcard) > 0 else None
+
+def body_response(request: Request, body: bytes, etag: str, encode, status_code: int = 200):
+    """304 kalau ETag cocok, body terkompres kalau client mau. encode(encoding) -> bytes."""
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    inm = request.headers.get("if-none-match")
+    if inm and _etag_matches(inm, etag):
+        return Response(status_code=304, headers=headers)
+    encoding = None
+    if len(body) >= COMPRESS_MIN_BYTES:
+        encoding = _pick_encoding(request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(encode(encoding), status_code=status_code, media_type="application/json", headers=headers)
+
+def entry_response(request: Request, entry: CacheEntry, status_code: int = 200):
+    """Response dari entry cache; versi terkompresnya disimpen di entry."""
+    return body_response(request, entry.body, entry.etag, entry.encoded_body, status_code)
+
+def payload_response(request: Request, payload, status_code: int = 200):
+    """Buat payload yang gak lewat cache (katalog, batch): cuma serialize + ETag, gak bikin CacheEntry."""
+    started = time.perf_counter()
+    body = render_json(payload)
+    observe_stage(None, "serialize", started)
+    return body_response(request, body, make_etag(body), lambda encoding: compress_body(body, encoding) if encoding else body, status_code)
+
+def success(data, **extra):
+    return {"status": "success", "creator": "Sanka Vollerei", "message": "", "data": data, **extra}
+
+# ------------------------
+# FIELD SELECTION
+# ------------------------
+
+def parse_fields(raw: str):
+    """?fields=title,poster,animeId -> frozenset; None kalau kosong (= semua field)."""
+    if not raw:
+        return None
+    return frozenset(f.strip() for f in raw.split(",") if f.strip()) or None
+
+def wants(fields, *names) -> bool:
+    # extractor pake ini buat skip bagian yang gak diminta
+    return fields is None or any(n in fields for n in names)
+
+def select_fields(payload, fields, list_key=None):
+    """
+    Pangkas payload ke field yang diminta: tiap item di data[list_key]
+    (listing), atau key di data langsung (detail/episode). Envelope
+    (status, pagination, dll) gak disentuh.
+    """
+    if not payload or fields is None:
+        return payload
+    data = payload.get("data")
+    if not isinstance(data, dict):
+        return payload
+    if list_key:
+        data = {**data, list_key: [{k: v for k, v in item.items() if k in fields} for item in data.get(list_key) or []]}
+    else:
+        data = {k: v for k, v in data.items() if k in fields}
+    return {**payload, "data": data}
+
+# ------------------------
+# PARSERS
+# ------------------------
+
+def parse_latest_item(node, fields=None):
+    try:
+        a_tag = node.find("a")
+        if not a_tag:
+            return None
+
+        real_url = a_tag.get("href", "")
+        if not real_url:
+            return None
+
+        anime_id = extract_id(real_url)
+
+        title = "Unknown"
+        t_div = node.find("div", class_="title")
+        if t_div:
+            title = t_div.get_text(strip=True)
+        else:
+            title = a_tag.get("title") or a_tag.get_text(" ", strip=True) or "Unknown"
+
+        poster = extract_poster(node) if wants(fields, "poster") else None
+
+        ep = "?"
+        released = "?"
+
+        dtla = node.find("div", class_="dtla") or node
+        full_text = dtla.get_text(" ", strip=True) if wants(fields, "episodes", "releasedOn") else ""
+
+        m_ep = re.search(r"(?:Episode\s*)?(\d+)", full_text, re.IGNORECASE)
+        if m_ep:
+            ep = m_ep.group(1)
+
+        date_span = None
+        if wants(fields, "releasedOn"):
+            date_span = node.find("span", class_="date") or node.find("span", class_="year")
+        if date_span:
+            released = date_span.get_text(strip=True)
+        elif full_text:
+            if "Released on" in full_text:
+                parts = full_text.split("Released on")
+                if len(parts) > 1:
+                    released = parts[1].replace(":", "").strip().split("Posted")[0].strip()
+            elif "yang lalu" in full_text:
+                m_date = re.search(r"([\d\w\s]+yang lalu)", full_text)
+                if m_date:
+                    released = m_date.group(1).strip()
+
+        return {
+            "title": title,
+            "poster": poster,
+            "episodes": ep,
+            "releasedOn": released,
+            "animeId": anime_id,
+            "href": f"/samehadaku/anime/{anime_id}",
+            "samehadakuUrl": real_url,
+        }
+    except:
+        return None
+
+def parse_library_item(node, status_force=None, fields=None):
+    try:
+        a_tag = node.find("a")
+        if not a_tag:
+            return None
+
+        real_url = a_tag.get("href", "")
+        if not real_url:
+            return None
+
+        anime_id = extract_id(real_url)
+
+        title_div = node.find("div", class_="title")
+        title = title_div.get_text(strip=True) if title_div else a_tag.get_text(" ", strip=True)
+
+        poster = extract_poster(node) if wants(fields, "poster") else None
+
+        score = "?"
+        sc = node.find("div", class_="score") if wants(fields, "score") else None
+        if sc:
+            score = sc.get_text(strip=True).strip()
+
+        atype = "TV"
+        tp = node.find("div", class_="type") if wants(fields, "type") else None
+        if tp:
+            atype = tp.get_text(strip=True)
+
+        status = status_force if status_force else "Ongoing"
+
+        return {
+            "title": title,
+            "poster": poster,
+            "type": atype,
+            "score": score,
             "status": status,
             "animeId": anime_id,
             "href": f"/samehadaku/anime/{anime_id}",
             "samehadakuUrl": real_url,
-            "genreList": parse_genre_list(node),
+            "genreList": parse_genre_list(node) if wants(fields, "genreList") else [],
         }
     except:
         return None
@@ -225,11 +1706,116 @@ DAY_LABELS = {
 }
 
 TIME_RE = re.compile(r"\b(\d{1,2}:\d{2})\b")
+SCHEDULE_TITLE_RE = re.compile(r"^(?P<type>[A-Za-z]+)\s+(?P<score>\d+(?:\.\d+)?)\s+(?P<title>.+)$")
+NORM_RE = re.compile(r"[^a-z0-9]")
 
 def _norm(s: str) -> str:
-    return re.sub(r"[^a-z0-9]", "", (s or "").lower())
+    return NORM_RE.sub("", (s or "").lower())
+
+ALL_DAY_LABELS = set(_norm(lab) for labs in DAY_LABELS.values() for lab in labs)
+DAY_BUTTON_TAGS = {"a", "button", "div", "span", "li"}
+DAY_BUTTON_LIMIT = 4000
+DAY_TARGET_KEYS = ["data-tab", "data-target", "data-id", "data-day", "aria-controls"]
+CONTAINER_DATA_KEYS = ["data-tab-content", "data-content", "data-id", "data-day"]
+
+def _attr_matches(value, regex) -> bool:
+    # sama kayak cara bs4 nyocokin regex ke atribut (class itu list)
+    if value is None:
+        return False
+    if isinstance(value, list):
+        if any(regex.search(v) for v in value):
+            return True
+        return len(value) != 1 and bool(regex.search(" ".join(value)))
+    return bool(regex.search(value))
+
+class ScheduleIndex:
+    """
+    Index satu kali jalan di tree jadwal: id, class, data-*, tombol hari,
+    plus elemen mana aja yang di dalamnya ada <img> / link /anime/.
+    Gantiin puluhan content.find(...) full-tree per hari.
+    """
+
+    def __init__(self, content):
+        from bs4 import CData, NavigableString, Tag
+
+        self.content = content
+        self.inside = {id(content)}
+        self.ids = []        # (tag, id) urut dokumen
+        self.classed = []    # (tag, class)
+        self.data = {k: [] for k in CONTAINER_DATA_KEYS}  # attr -> [(tag, value)]
+        self.has_img = set()
+        self.anime_links = {}  # id(tag) -> [link /anime/ di dalamnya]
+        self.day_buttons = []  # (tag, norm text) kandidat tombol hari, urut dokumen
+
+        label_strings = []
+        button_rank = {}
+        for node in content.descendants:
+            if isinstance(node, Tag):
+                self.inside.add(id(node))
+                attrs = node.attrs
+                if node.name in DAY_BUTTON_TAGS and len(button_rank) < DAY_BUTTON_LIMIT:
+                    button_rank[id(node)] = len(button_rank)
+                if "id" in attrs:
+                    self.ids.append((node, attrs["id"]))
+                if "class" in attrs:
+                    self.classed.append((node, attrs["class"]))
+                for k in CONTAINER_DATA_KEYS:
+                    if k in attrs:
+                        self.data[k].append((node, attrs[k]))
+                if node.name == "img":
+                    self._mark_img(node)
+                elif node.name == "a":
+                    href = attrs.get("href")
+                    if href and "/anime/" in href:
+                        for parent in node.parents:
+                            self.anime_links.setdefault(id(parent), []).append(node)
+                            if parent is content:
+                                break
+            elif type(node) in (NavigableString, CData):
+                txt = _norm(node)
+                if txt and any(txt in lab for lab in ALL_DAY_LABELS):
+                    label_strings.append(node)
+
+        # tombol hari: naik dari string "Senin" dst selama text elemennya masih
+        # potongan label hari ("Se" + "nin" di dua span); yang dicatet cuma yang
+        # persis label. Begitu bukan potongan lagi, parent-nya pasti juga bukan.
+        seen = set()
+        for s in label_strings:
+            for el in s.parents:
+                if el is content or id(el) in seen:
+                    break
+                txt = _norm(el.get_text(" ", strip=True))
+                if not any(txt in lab for lab in ALL_DAY_LABELS):
+                    break
+                seen.add(id(el))
+                if txt in ALL_DAY_LABELS and id(el) in button_rank:
+                    self.day_buttons.append((button_rank[id(el)], el, txt))
+        self.day_buttons.sort(key=lambda x: x[0])
+
+    def _mark_img(self, node):
+        for parent in node.parents:
+            if id(parent) in self.has_img:
+                break
+            self.has_img.add(id(parent))
+            if parent is self.content:
+                break
 
-def parse_schedule_card(a_tag):
+    def contains_img(self, tag) -> bool:
+        if id(tag) in self.inside:
+            return id(tag) in self.has_img
+        return bool(tag.find("img"))
+
+    def contains_anime_link(self, tag) -> bool:
+        if id(tag) in self.inside:
+            return id(tag) in self.anime_links
+        return bool(tag.find("a", href=ANIME_HREF_RE))
+
+    def links_under(self, tag):
+        return self.anime_links.get(id(tag), [])
+
+ANIME_HREF_RE = re.compile(r"/anime/")
+
+def parse_schedule_card(a_tag, index=None):
     """
     a_tag: link /anime/ yang berada di card schedule.
     Card biasanya punya poster + rating + genre + jam.
@@ -247,10 +1833,15 @@ def parse_schedule_card(a_tag):
             if not card or not getattr(card, "parent", None):
                 break
             # kalau parent punya img dan juga punya link anime, itu biasanya card
-            if card.parent.find("img") and card.parent.find("a", href=re.compile(r"/anime/")):
-                card = card.parent
+            parent = card.parent
+            if index is not None:
+                is_card = index.contains_img(parent) and index.contains_anime_link(parent)
+            else:
+                is_card = parent.find("img") and parent.find("a", href=ANIME_HREF_RE)
+            if is_card:
+                card = parent
                 break
-            card = card.parent
+            card = parent
 
         # title dari text link (sering format: TV 6.41 Judul Genre)
         raw = a_tag.get_text(" ", strip=True)
@@ -259,7 +1850,7 @@ def parse_schedule_card(a_tag):
         score = "?"
         title = raw
 
-        m = re.match(r"^(?P<type>[A-Za-z]+)\s+(?P<score>\d+(?:\.\d+)?)\s+(?P<title>.+)$", raw)
+        m = SCHEDULE_TITLE_RE.match(raw)
         if m:
             atype = m.group("type").strip()
             score = m.group("score").strip()
@@ -287,33 +1878,24 @@ def parse_schedule_card(a_tag):
     except:
         return None
 
-def build_day_target_map(content):
+def build_day_target_map(content, index=None):
     """
     Ambil mapping tombol hari -> target tab.
     Kita cari elemen yang text-nya "Senin/Selasa/..." dan punya:
     - href="#senin" / "#selasa"
     - data-tab / data-target / data-id
     """
-    all_labels = []
-    for labs in DAY_LABELS.values():
-        all_labels.extend(labs)
-    all_labels_norm = set(_norm(x) for x in all_labels)
+    index = index or ScheduleIndex(content)
 
     mapping = {}  # norm_day -> target_id
-    candidates = content.find_all(["a", "button", "div", "span", "li"], limit=4000)
-
-    for el in candidates:
-        txt = _norm(el.get_text(" ", strip=True))
-        if not txt or txt not in all_labels_norm:
-            continue
-
+    for _, el, txt in index.day_buttons:
         # baca target dari atribut yang umum dipakai tab
         target = None
         href = el.get("href", "")
         if href and href.startswith("#") and len(href) > 1:
             target = href[1:].strip()
 
-        for key in ["data-tab", "data-target", "data-id", "data-day", "aria-controls"]:
+        for key in DAY_TARGET_KEYS:
             if not target and el.get(key):
                 target = el.get(key)
 
@@ -322,7 +1904,7 @@ def build_day_target_map(content):
 
     return mapping
 
-def find_container_by_target(content, target):
+def find_container_by_target(content, target, index=None):
     """
     Cari container tab berdasarkan target.
     Banyak theme WP pake:
@@ -330,47 +1912,56 @@ def find_container_by_target(content, target):
     - id="tab-senin"
     - class="senin"
     - data-tab-content="senin"
+    Urutan prioritasnya sama kayak dulu, cuma sekarang nyarinya di index.
     """
     if not target:
         return None
+    index = index or ScheduleIndex(content)
+
+    def first(pairs, regex):
+        # kayak content.find(): ambil match pertama aja, baru dicek ada link anime-nya
+        for el, value in pairs:
+            if _attr_matches(value, regex):
+                return el if index.contains_anime_link(el) else None
+        return None
+
+    t = re.escape(target)
 
     # id exact / contains
-    c = content.find(id=re.compile(rf"^{re.escape(target)}$", re.I))
-    if c and c.find("a", href=re.compile(r"/anime/")):
+    c = first(index.ids, re.compile(rf"^{t}$", re.I))
+    if c:
         return c
 
-    c = content.find(id=re.compile(re.escape(target), re.I))
-    if c and c.find("a", href=re.compile(r"/anime/")):
+    c = first(index.ids, re.compile(t, re.I))
+    if c:
         return c
 
     # data attr content
-    for k in ["data-tab-content", "data-content", "data-id", "data-day"]:
-        c = content.find(attrs={k: re.compile(re.escape(target), re.I)})
-        if c and c.find("a", href=re.compile(r"/anime/")):
+    for k in CONTAINER_DATA_KEYS:
+        c = first(index.data[k], re.compile(t, re.I))
+        if c:
             return c
 
     # class match
-    c = content.find(class_=re.compile(rf"\b{re.escape(target)}\b", re.I))
-    if c and c.find("a", href=re.compile(r"/anime/")):
+    c = first(index.classed, re.compile(rf"\b{t}\b", re.I))
+    if c:
         return c
 
     # last resort: id="tab-senin" etc
-    c = content.find(id=re.compile(rf"(tab|pane|content)[-_]*{re.escape(target)}", re.I))
-    if c and c.find("a", href=re.compile(r"/anime/")):
+    c = first(index.ids, re.compile(rf"(tab|pane|content)[-_]*{t}", re.I))
+    if c:
         return c
 
     return None
 
-@app.get("/anime/samehadaku/schedule")
-def get_schedule():
-    soup = get_soup(f"{BASE_URL}/jadwal-rilis/")
-    if not soup:
-        return JSONResponse({"status": "failed"}, 500)
-
+def extract_schedule(soup):
     content = soup.find("div", class_="entry-content") or soup.find("main") or soup
 
+    # sekali jalan di tree, semua lookup per hari lewat index ini
+    index = ScheduleIndex(content)
+
     # mapping tombol hari -> target
-    day_target = build_day_target_map(content)
+    day_target = build_day_target_map(content, index)
 
     days_res = []
 
@@ -390,13 +1981,12 @@ def get_schedule():
 
         # cari container dan parse
         for t in targets:
-            container = find_container_by_target(content, t)
+            container = find_container_by_target(content, t, index)
             if container:
-                for a in container.find_all("a", href=True):
-                    if "/anime/" in a["href"]:
-                        it = parse_schedule_card(a)
-                        if it:
-                            anime_list.append(it)
+                for a in index.links_under(container):
+                    it = parse_schedule_card(a, index)
+                    if it:
+                        anime_list.append(it)
 
         # kalau masih kosong, jangan sok pintar ngisi dari menu (itu yang bikin error lu kemarin)
         # mending kosong daripada salah hari.
@@ -411,26 +2001,27 @@ def get_schedule():
 
         days_res.append({"day": eng_day, "animeList": final})
 
-    return JSONResponse({"status": "success", "creator": "Sanka Vollerei", "message": "", "data": {"days": days_res}})
+    return success({"days": days_res})
+
+@app.get("/anime/samehadaku/schedule")
+async def get_schedule(request: Request):
+    entry = await load_entry("schedule", f"{BASE_URL}/jadwal-rilis/", extract_schedule)
+    if not entry:
+        return JSONResponse({"status": "failed"}, 500)
+    return entry_response(request, entry)
 
 # ------------------------
-# ENDPOINTS LAIN
+# EXTRACTORS
 # ------------------------
 
-@app.get("/")
-def home():
-    return {"message": "Samehadaku API V30 - Python Works Best (Schedule Fixed Proper)"}
-
-@app.get("/anime/samehadaku/home")
-def get_home_data():
-    soup = get_soup(BASE_URL)
-    if not soup:
-        return JSONResponse({"status": "failed"}, 500)
-
+def extract_home(soup):
     data = {}
 
     recent = []
-    nodes = soup.select(".post-show li") or soup.select(".animepost")[:10]
+    nodes = soup.select(".post-show li")
+    if not nodes:
+        PARSER_FALLBACKS.inc("home_recent", "selector")
+        nodes = soup.select(".animepost")[:10]
     for n in nodes:
         item = parse_latest_item(n)
         if item:
@@ -438,7 +2029,10 @@ def get_home_data():
     data["recent"] = {"href": "/samehadaku/recent", "samehadakuUrl": f"{BASE_URL}/anime-terbaru/", "animeList": recent}
 
     top10 = []
-    top_nodes = soup.select(".widget_senction.popular .serieslist li") or soup.select(".serieslist.pop li")
+    top_nodes = soup.select(".widget_senction.popular .serieslist li")
+    if not top_nodes:
+        PARSER_FALLBACKS.inc("home_top10", "selector")
+        top_nodes = soup.select(".serieslist.pop li")
     for idx, n in enumerate(top_nodes, 1):
         item = parse_library_item(n)
         if item:
@@ -449,273 +2043,2170 @@ def get_home_data():
     data["batch"] = {"href": "/samehadaku/batch", "samehadakuUrl": f"{BASE_URL}/daftar-batch/", "batchList": []}
     data["movie"] = {"href": "/samehadaku/movies", "samehadakuUrl": f"{BASE_URL}/anime-movie/", "animeList": []}
 
-    return JSONResponse({"status": "success", "creator": "Sanka Vollerei", "message": "", "data": data})
-
-@app.get("/anime/samehadaku/latest")
-def get_latest(page: int = 1):
-    url = f"{BASE_URL}/anime-terbaru/page/{page}/" if page > 1 else f"{BASE_URL}/anime-terbaru/"
-    soup = get_soup(url)
-    if not soup:
-        return JSONResponse({"status": "failed"}, 500)
+    return success(data)
 
+def extract_latest(soup, page, fields=None):
     results = []
-    nodes = soup.select(".post-show li") or soup.select(".animepost")
+    nodes = soup.select(".post-show li")
+    if not nodes:
+        PARSER_FALLBACKS.inc("latest", "selector")
+        nodes = soup.select(".animepost")
     for n in nodes:
-        p = parse_latest_item(n)
+        p = parse_latest_item(n, fields)
         if p:
             results.append(p)
+    return success({"animeList": results}, pagination=get_pagination(soup, page))
 
-    return JSONResponse({"status": "success", "creator": "Sanka Vollerei", "message": "",
-                         "data": {"animeList": results}, "pagination": get_pagination(soup, page)})
-
-@app.get("/anime/samehadaku/ongoing")
-def get_ongoing(page: int = 1):
-    url = f"{BASE_URL}/daftar-anime-2/page/{page}/?status=Currently+Airing&order=update" if page > 1 else \
-          f"{BASE_URL}/daftar-anime-2/?status=Currently+Airing&order=update"
-    soup = get_soup(url)
-    if not soup:
-        return JSONResponse({"status": "failed"}, 500)
-
-    nodes = soup.select(".animepost")
+def extract_library(soup, page, status_force=None, atype=None, fields=None):
     results = []
-    for n in nodes:
-        p = parse_library_item(n, "Ongoing")
+    for x in soup.select(".animepost"):
+        p = parse_library_item(x, status_force, fields)
         if p:
+            if atype:
+                p["type"] = atype
             results.append(p)
+    return success({"animeList": results}, pagination=get_pagination(soup, page))
 
-    return JSONResponse({"status": "success", "creator": "Sanka Vollerei", "message": "",
-                         "data": {"animeList": results}, "pagination": get_pagination(soup, page)})
+def extract_batch_list(soup, page, fields=None):
+    results = []
+    for x in soup.select(".animepost"):
+        item = parse_library_item(x, "Completed", fields)
+        if item:
+            item["batchId"] = item.pop("animeId")
+            item["href"] = f"/samehadaku/batch/{item['batchId']}"
+            results.append(item)
+    return success({"batchList": results}, pagination=get_pagination(soup, page))
 
-@app.get("/anime/samehadaku/completed")
-def get_completed(page: int = 1):
-    url = f"{BASE_URL}/daftar-anime-2/page/{page}/?status=Finished+Airing&order=latest" if page > 1 else \
-          f"{BASE_URL}/daftar-anime-2/?status=Finished+Airing&order=latest"
-    soup = get_soup(url)
-    if not soup:
-        return JSONResponse({"status": "failed"}, 500)
+def extract_genres(soup):
+    genre_list = parse_genre_list(soup)
+    unique = {g["genreId"]: g for g in genre_list}.values()
+    final_list = sorted(list(unique), key=lambda x: x["title"])
+    return success({"genreList": final_list})
 
-    nodes = soup.select(".animepost")
-    results = []
-    for n in nodes:
-        p = parse_library_item(n, "Completed")
-        if p:
-            results.append(p)
+EPISODE_NUM_RE = re.compile(r"\d+")
 
-    return JSONResponse({"status": "success", "creator": "Sanka Vollerei", "message": "",
-                         "data": {"animeList": results}, "pagination": get_pagination(soup, page)})
+def parse_episode_list(soup):
+    # urutannya ngikut halaman: episode terbaru di atas
+    episodes = []
+    for li in soup.select(".lstepsiode li"):
+        a = li.find("a")
+        if not a:
+            continue
+        ep_id = extract_id(a["href"])
+        title_span = li.find("span", class_="epl-title")
+        raw_ep_title = (title_span or a).get_text(strip=True)
+        num = EPISODE_NUM_RE.search(raw_ep_title)
+        episodes.append({
+            "title": int(num.group()) if num else raw_ep_title,
+            "episodeId": ep_id,
+            "href": f"/samehadaku/episode/{ep_id}",
+            "samehadakuUrl": a["href"],
+        })
+    return episodes
 
-@app.get("/anime/samehadaku/anime/{anime_id}")
-def get_anime_detail(anime_id: str):
-    soup = get_soup(f"{BASE_URL}/anime/{anime_id}/")
-    if not soup:
-        return JSONResponse({"status": "failed"}, 404)
+def extract_anime_detail(soup, fields=None):
+    poster = extract_poster(soup.find("div", class_="thumb")) if wants(fields, "poster") else None
 
-    try:
-        poster = extract_poster(soup.find("div", class_="thumb"))
-
-        infos = {}
-        for spe in soup.select(".infox .spe span"):
-            txt = spe.get_text(":", strip=True)
-            if ":" in txt:
-                k, v = txt.split(":", 1)
-                infos[k.strip().lower()] = v.strip()
-
-        score_val = infos.get("score", "?")
-        if score_val == "?":
-            sc = soup.find("span", itemprop="ratingValue")
-            if sc:
-                score_val = sc.get_text(strip=True)
-
-        rating_count = soup.find("span", itemprop="ratingCount")
-        users = f"{rating_count.get_text(strip=True)} users" if rating_count else "N/A"
-
-        ep_val = infos.get("total episode", "0")
-        episodes_int = int(ep_val) if ep_val.isdigit() else None
-
-        synopsis_div = soup.find("div", class_="desc") or soup.find("div", class_="entry-content")
-        paragraphs = []
-        if synopsis_div:
-            ps = synopsis_div.find_all("p")
-            if ps:
-                paragraphs = [p.get_text(strip=True) for p in ps if p.get_text(strip=True)]
-            else:
-                paragraphs = [synopsis_div.get_text(strip=True)]
-
-        episodes = []
-        for li in soup.select(".lstepsiode li"):
-            a = li.find("a")
-            if a:
-                ep_id = extract_id(a["href"])
-                raw_ep_title = li.find("span", class_="epl-title").get_text(strip=True) if li.find("span", class_="epl-title") else a.get_text(strip=True)
-                try:
-                    t_num = int(re.search(r"\d+", raw_ep_title).group())
-                except:
-                    t_num = raw_ep_title
-                episodes.append({"title": t_num, "episodeId": ep_id, "href": f"/samehadaku/episode/{ep_id}", "samehadakuUrl": a["href"]})
+    infos = {}
+    for spe in soup.select(".infox .spe span"):
+        txt = spe.get_text(":", strip=True)
+        if ":" in txt:
+            k, v = txt.split(":", 1)
+            infos[k.strip().lower()] = v.strip()
 
-        trailer_iframe = soup.select_one(".trailer-anime iframe")
-        trailer_url = trailer_iframe.get("src", "") if trailer_iframe else ""
+    score_val = infos.get("score", "?")
+    if score_val == "?":
+        sc = soup.find("span", itemprop="ratingValue")
+        if sc:
+            score_val = sc.get_text(strip=True)
 
-        data = {
-            "title": "",
-            "poster": poster,
-            "score": {"value": score_val, "users": users},
-            "japanese": infos.get("japanese", "-"),
-            "synonyms": infos.get("synonyms", "-"),
-            "english": infos.get("english", "-"),
-            "status": infos.get("status", "Unknown"),
-            "type": infos.get("type", "TV"),
-            "source": infos.get("source", "-"),
-            "duration": infos.get("duration", "-"),
-            "episodes": episodes_int,
-            "season": infos.get("season", "-"),
-            "studios": infos.get("studio", "-"),
-            "producers": infos.get("producers", "-"),
-            "aired": infos.get("released", "-"),
-            "trailer": trailer_url,
-            "synopsis": {"paragraphs": paragraphs, "connections": []},
-            "genreList": parse_genre_list(soup.find("div", class_="genre-info")),
-            "batchList": [],
-            "episodeList": episodes,
-        }
+    rating_count = soup.find("span", itemprop="ratingCount")
+    users = f"{rating_count.get_text(strip=True)} users" if rating_count else "N/A"
 
-        return JSONResponse({"status": "success", "creator": "Sanka Vollerei", "message": "", "data": data, "pagination": None})
-    except Exception as e:
-        return JSONResponse({"status": "failed", "error": str(e)}, 500)
+    ep_val = infos.get("total episode", "0")
+    episodes_int = int(ep_val) if ep_val.isdigit() else None
 
-@app.get("/anime/samehadaku/genres")
-def get_all_genres():
-    soup = get_soup(BASE_URL)
-    if not soup:
-        return JSONResponse({"status": "failed"}, 500)
-    genre_list = parse_genre_list(soup)
-    unique = {g["genreId"]: g for g in genre_list}.values()
-    final_list = sorted(list(unique), key=lambda x: x["title"])
-    return JSONResponse({"status": "success", "creator": "Sanka Vollerei", "message": "", "data": {"genreList": final_list}})
+    synopsis_div = None
+    if wants(fields, "synopsis"):
+        synopsis_div = soup.find("div", class_="desc")
+        if synopsis_div is None:
+            PARSER_FALLBACKS.inc("anime_synopsis", "selector")
+            synopsis_div = soup.find("div", class_="entry-content")
+    paragraphs = []
+    if synopsis_div:
+        ps = synopsis_div.find_all("p")
+        if ps:
+            paragraphs = [p.get_text(strip=True) for p in ps if p.get_text(strip=True)]
+        else:
+            paragraphs = [synopsis_div.get_text(strip=True)]
 
-@app.get("/anime/samehadaku/genres/{genre_id}")
-def get_anime_by_genre(genre_id: str, page: int = 1):
-    url = f"{BASE_URL}/genre/{genre_id}/page/{page}/" if page > 1 else f"{BASE_URL}/genre/{genre_id}/"
-    soup = get_soup(url)
-    if not soup:
-        return JSONResponse({"status": "failed"}, 500)
-    nodes = soup.select(".animepost")
-    results = []
-    for x in nodes:
-        p = parse_library_item(x)
-        if p:
-            results.append(p)
-    return JSONResponse({"status": "success", "creator": "Sanka Vollerei", "message": "",
-                         "data": {"animeList": results}, "pagination": get_pagination(soup, page)})
+    episodes = parse_episode_list(soup) if wants(fields, "episodeList") else []
+
+    trailer_iframe = soup.select_one(".trailer-anime iframe") if wants(fields, "trailer") else None
+    trailer_url = trailer_iframe.get("src", "") if trailer_iframe else ""
+
+    data = {
+        "title": "",
+        "poster": poster,
+        "score": {"value": score_val, "users": users},
+        "japanese": infos.get("japanese", "-"),
+        "synonyms": infos.get("synonyms", "-"),
+        "english": infos.get("english", "-"),
+        "status": infos.get("status", "Unknown"),
+        "type": infos.get("type", "TV"),
+        "source": infos.get("source", "-"),
+        "duration": infos.get("duration", "-"),
+        "episodes": episodes_int,
+        "season": infos.get("season", "-"),
+        "studios": infos.get("studio", "-"),
+        "producers": infos.get("producers", "-"),
+        "aired": infos.get("released", "-"),
+        "trailer": trailer_url,
+        "synopsis": {"paragraphs": paragraphs, "connections": []},
+        "genreList": parse_genre_list(soup.find("div", class_="genre-info")) if wants(fields, "genreList") else [],
+        "batchList": [],
+        "episodeList": episodes,
+    }
+
+    return success(data, pagination=None)
+
+def extract_episode_detail(soup, fields=None):
+    title = soup.find("h1", class_="entry-title").get_text(strip=True)
+
+    nav = {"prev": None, "next": None}
+    if wants(fields, "navigation"):
+        pa = soup.find("a", class_="prev")
+        na = soup.find("a", class_="next")
+        if pa and pa.get("href") and "/anime/" not in pa["href"]:
+            nav["prev"] = f"/samehadaku/episode/{extract_id(pa['href'])}"
+        if na and na.get("href") and "/anime/" not in na["href"]:
+            nav["next"] = f"/samehadaku/episode/{extract_id(na['href'])}"
+
+    downloads = []
+    box = None
+    if wants(fields, "downloads"):
+        box = soup.find("div", class_="download-eps")
+        if box is None:
+            PARSER_FALLBACKS.inc("episode_downloads", "selector")
+            box = soup.find("div", id="server")
+    if box:
+        for ul in box.find_all("ul"):
+            prev_tag = ul.find_previous(["p", "h4", "div", "span"])
+            ft = prev_tag.get_text(strip=True) if prev_tag else "Unknown"
+
+            if "MKV" in ft:
+                ft = "MKV"
+            elif "MP4" in ft:
+                ft = "MP4"
+            elif "x265" in ft:
+                ft = "x265"
+
+            quals = []
+            for li in ul.find_all("li"):
+                qn = li.find("strong") or li.find("b")
+                qn_txt = qn.get_text(strip=True) if qn else "Unknown"
+                urls = [{"title": a.get_text(strip=True), "url": a["href"]} for a in li.find_all("a", href=True)]
+                quals.append({"title": qn_txt, "urls": urls})
+
+            if quals:
+                downloads.append({"title": ft, "qualities": quals})
+
+    iframe = soup.find("iframe") if wants(fields, "streamUrl") else None
+    stream = iframe.get("src", "") if iframe else ""
+
+    return success({"title": title, "streamUrl": stream, "navigation": nav, "downloads": downloads})
+
+# ------------------------
+# LISTINGS
+# ------------------------
+
+def _paged_url(path: str, page: int, query: str = "") -> str:
+    if page > 1:
+        return f"{BASE_URL}{path}page/{page}/{query}"
+    return f"{BASE_URL}{path}{query}"
+
+# nama listing (sekalian nama route buat cache) -> url(page, ...) + extract(soup, page, fields)
+# + "list" (key list item di data, buat ?fields=) kalau bukan animeList
+LISTINGS = {
+    "latest": {
+        "url": lambda page: _paged_url("/anime-terbaru/", page),
+        "extract": extract_latest,
+        "index": False,  # animeId di sini id episode
+    },
+    "ongoing": {
+        "url": lambda page: _paged_url("/daftar-anime-2/", page, "?status=Currently+Airing&order=update"),
+        "extract": lambda soup, page, fields=None: extract_library(soup, page, "Ongoing", fields=fields),
+    },
+    "completed": {
+        "url": lambda page: _paged_url("/daftar-anime-2/", page, "?status=Finished+Airing&order=latest"),
+        "extract": lambda soup, page, fields=None: extract_library(soup, page, "Completed", fields=fields),
+    },
+    "popular": {
+        "url": lambda page: _paged_url("/daftar-anime-2/", page, "?order=popular"),
+        "extract": extract_library,
+    },
+    "movies": {
+        "url": lambda page: _paged_url("/anime-movie/", page),
+        "extract": lambda soup, page, fields=None: extract_library(soup, page, atype="Movie", fields=fields),
+    },
+    "batch": {
+        "url": lambda page: _paged_url("/daftar-batch/", page),
+        "extract": extract_batch_list,
+        "list": "batchList",
+        "index": False,
+    },
+    "genre": {
+        "url": lambda page, genre_id: _paged_url(f"/genre/{genre_id}/", page),
+        "extract": extract_library,
+    },
+}
+
+def listing_extractor(name: str, page: int, fields=None, **params):
+    """extract(soup) buat listing `name`; item-nya sekalian masuk SEARCH_INDEX/GENRE_INDEX."""
+    spec = LISTINGS[name]
+
+    def extract(soup):
+        payload = spec["extract"](soup, page, fields=fields)
+        if spec.get("index", True):
+            index_listing(payload, fields, name in ("ongoing", "completed"), params.get("genre_id"))
+        return payload
+
+    return extract
+
+async def load_listing_entry(name: str, page: int, fields=None, **params):
+    spec = LISTINGS[name]
+    entry = await load_entry(
+        name,
+        spec["url"](page, **params),
+        listing_extractor(name, page, fields, **params),
+        fields=fields,
+        list_key=spec.get("list", "animeList"),
+    )
+    if entry is not None and (entry.payload.get("pagination") or {}).get("hasNextPage"):
+        PREFETCHER.submit_listing(name, page + 1, **params)
+    return entry
+
+async def load_listing(name: str, page: int, **params):
+    entry = await load_listing_entry(name, page, **params)
+    return entry.payload if entry else None
+
+# ------------------------
+# ENDPOINTS LAIN
+# ------------------------
+
+@app.get("/")
+async def home():
+    return {"message": "Samehadaku API V30 - Python Works Best (Schedule Fixed Proper)"}
+
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/stats")
+async def get_stats():
+    return {
+        "cache": {**RESPONSE_CACHE.stats, "entries": len(RESPONSE_CACHE.entries), "bytes": RESPONSE_CACHE.total_bytes},
+        "sharedCache": {"path": SHARED_CACHE.path, **SHARED_CACHE.stats} if SHARED_CACHE is not None else None,
+        "search": SEARCH_INDEX.summary(),
+        "genreIndex": GENRE_INDEX.summary(),
+        "feed": EPISODE_FEED.summary(),
+        "singleFlight": {"fetch": FETCH_FLIGHTS.stats, "page": PAGE_FLIGHTS.stats},
+        "upstream": {
+            h.host: {"breaker": h.state, "failures": h.failures, "hedgeDelay": round(h.hedge_delay(), 3)}
+            for h in _hosts.values()
+        },
+        "mirrors": MIRRORS.stats(),
+        "prefetch": PREFETCHER.summary(),
+    }
+
+@app.get("/anime/samehadaku/home")
+async def get_home_data(request: Request):
+    entry = await load_entry("home", BASE_URL, extract_home)
+    if not entry:
+        return JSONResponse({"status": "failed"}, 500)
+    # abis home biasanya lanjut ke latest?page=2
+    PREFETCHER.submit_listing("latest", 2)
+    return entry_response(request, entry)
+
+@app.get("/anime/samehadaku/latest")
+async def get_latest(request: Request, page: int = Query(1, ge=1), fields: str = None):
+    entry = await load_listing_entry("latest", page, parse_fields(fields))
+    if not entry:
+        return JSONResponse({"status": "failed"}, 500)
+    return entry_response(request, entry)
+
+@app.get("/anime/samehadaku/ongoing")
+async def get_ongoing(request: Request, page: int = Query(1, ge=1), source: str = "upstream", fields: str = None):
+    if source == "catalog":
+        payload = await catalog_listing(page, status="Ongoing")
+        if payload:
+            return payload_response(request, select_fields(payload, parse_fields(fields), "animeList"))
+    entry = await load_listing_entry("ongoing", page, parse_fields(fields))
+    if not entry:
+        return JSONResponse({"status": "failed"}, 500)
+    return entry_response(request, entry)
+
+@app.get("/anime/samehadaku/completed")
+async def get_completed(request: Request, page: int = Query(1, ge=1), source: str = "upstream", fields: str = None):
+    if source == "catalog":
+        payload = await catalog_listing(page, status="Completed")
+        if payload:
+            return payload_response(request, select_fields(payload, parse_fields(fields), "animeList"))
+    entry = await load_listing_entry("completed", page, parse_fields(fields))
+    if not entry:
+        return JSONResponse({"status": "failed"}, 500)
+    return entry_response(request, entry)
+
+def anime_detail_url(anime_id: str) -> str:
+    return f"{BASE_URL}/anime/{anime_id}/"
+
+async def load_anime_detail_entry(anime_id: str, fields=None):
+    return await load_entry(
+        "anime", anime_detail_url(anime_id), lambda soup: index_anime_detail(anime_id, extract_anime_detail(soup, fields), fields), fields
+    )
+
+async def load_anime_detail(anime_id: str, fields=None):
+    entry = await load_anime_detail_entry(anime_id, fields)
+    return entry.payload if entry else None
+
+EPISODE_PAGE_SIZE = env_int("EPISODE_PAGE_SIZE", 50)
+EPISODE_PAGE_MAX = env_int("EPISODE_PAGE_MAX", 500)
+EPISODE_INDEX_MAX = env_int("EPISODE_INDEX_MAX", 256)
+
+class EpisodeIndex:
+    """
+    episodeList satu anime versi ringkas: tuple (title, episodeId, url)
+    urut terbaru dulu. Dict per episode baru dibikin buat potongan yang
+    diminta, jadi range request gak nyentuh list 1000+ item.
+    """
+
+    __slots__ = ("etag", "items")
+
+    def __init__(self, etag, episodes):
+        self.etag = etag
+        self.items = tuple((ep["title"], ep["episodeId"], ep["samehadakuUrl"]) for ep in episodes)
+
+    def __len__(self):
+        return len(self.items)
+
+    def slice(self, start: int, end: int, oldest_first: bool = False):
+        items = self.items[::-1] if oldest_first else self.items
+        return [
+            {"title": title, "episodeId": ep_id, "href": f"/samehadaku/episode/{ep_id}", "samehadakuUrl": url}
+            for title, ep_id, url in items[start:end]
+        ]
+
+# anime_id -> EpisodeIndex, dibangun ulang cuma kalau ETag detail-nya berubah
+_episode_indexes = OrderedDict()
+
+async def load_episode_index(anime_id: str):
+    entry = await load_anime_detail_entry(anime_id)
+    if not entry:
+        return None, None
+    index = _episode_indexes.get(anime_id)
+    if index is None or index.etag != entry.etag:
+        index = EpisodeIndex(entry.etag, entry.payload["data"]["episodeList"])
+        _episode_indexes[anime_id] = index
+        while len(_episode_indexes) > EPISODE_INDEX_MAX:
+            _episode_indexes.popitem(last=False)
+    _episode_indexes.move_to_end(anime_id)
+    return entry, index
+
+def episode_window(total: int, page: int, limit: int, start=None, end=None):
+    """
+    Potongan episode yang diminta: from/to (0-based, `to` eksklusif, dari
+    episode terbaru) kalau ada, selain itu page/limit. Maks EPISODE_PAGE_MAX.
+    """
+    limit = min(max(limit, 1), EPISODE_PAGE_MAX)
+    if start is None and end is None:
+        page = max(page, 1)
+        start = min((page - 1) * limit, total)
+        end = min(start + limit, total)
+        total_pages = max(1, -(-total // limit))
+        return start, end, {
+            "currentPage": page,
+            "hasPrevPage": page > 1,
+            "prevPage": page - 1 if page > 1 else None,
+            "hasNextPage": page < total_pages,
+            "nextPage": page + 1 if page < total_pages else None,
+            "totalPages": total_pages,
+            "from": start,
+            "to": end,
+            "totalEpisodes": total,
+        }
+
+    start = min(max(start or 0, 0), total)
+    end = total if end is None else min(max(end, start), total)
+    end = min(end, start + EPISODE_PAGE_MAX)
+    return start, end, {
+        "currentPage": None,
+        "hasPrevPage": start > 0,
+        "prevPage": None,
+        "hasNextPage": end < total,
+        "nextPage": None,
+        "totalPages": None,
+        "from": start,
+        "to": end,
+        "totalEpisodes": total,
+    }
+
+@app.get("/anime/samehadaku/anime/{anime_id}")
+async def get_anime_detail(
+    request: Request,
+    anime_id: str,
+    page: int = None,
+    limit: int = None,
+    start: int = Query(None, alias="from"),
+    end: int = Query(None, alias="to"),
+    order: str = "newest",
+    fields: str = None,
+):
+    """
+    Detail anime. Tanpa parameter episodeList-nya full; pake ?page=&limit=
+    atau ?from=&to= (terbaru dulu, order=oldest buat kebalikannya) buat
+    motong episodeList dan dapet data.episodePagination.
+    """
+    wanted = parse_fields(fields)
+    ranged = any(x is not None for x in (page, limit, start, end))
+    try:
+        if ranged:
+            entry, index = await load_episode_index(anime_id)
+        else:
+            entry = await load_anime_detail_entry(anime_id, wanted)
+    except Exception as e:
+        return JSONResponse({"status": "failed", "error": str(e)}, 500)
+    if not entry:
+        return JSONResponse({"status": "failed"}, 404)
+    if not ranged:
+        return entry_response(request, entry)
+
+    lo, hi, ep_pagination = episode_window(len(index), page or 1, limit or EPISODE_PAGE_SIZE, start, end)
+    data = dict(entry.payload["data"])
+    data["episodeList"] = index.slice(lo, hi, order == "oldest")
+    data["episodePagination"] = ep_pagination
+    if wanted is not None:
+        wanted = wanted | {"episodePagination"}
+    return payload_response(request, select_fields({**entry.payload, "data": data}, wanted))
+
+@app.get("/anime/samehadaku/anime/{anime_id}/episodes")
+async def get_anime_episodes(
+    request: Request,
+    anime_id: str,
+    page: int = 1,
+    limit: int = EPISODE_PAGE_SIZE,
+    start: int = Query(None, alias="from"),
+    end: int = Query(None, alias="to"),
+    order: str = "newest",
+):
+    """Episode list doang, dipaging dari EpisodeIndex (gak parse ulang halaman detail)."""
+    try:
+        entry, index = await load_episode_index(anime_id)
+    except Exception as e:
+        return JSONResponse({"status": "failed", "error": str(e)}, 500)
+    if not entry:
+        return JSONResponse({"status": "failed"}, 404)
+    lo, hi, ep_pagination = episode_window(len(index), page, limit, start, end)
+    return payload_response(
+        request,
+        success({"animeId": anime_id, "episodeList": index.slice(lo, hi, order == "oldest")}, pagination=ep_pagination),
+    )
+
+BATCH_DETAIL_CONCURRENCY = env_int("BATCH_DETAIL_CONCURRENCY", 6)
+BATCH_DETAIL_MAX_IDS = env_int("BATCH_DETAIL_MAX_IDS", 60)
+BATCH_DETAIL_DEADLINE = env_float("BATCH_DETAIL_DEADLINE", 10.0)
+
+@app.get("/anime/samehadaku/animes")
+async def get_anime_details(request: Request, ids: str, deadline: float = BATCH_DETAIL_DEADLINE, fields: str = None):
+    """
+    Detail banyak anime sekaligus: ?ids=a,b,c. Fetch ke upstream dibatesin
+    BATCH_DETAIL_CONCURRENCY, dan semuanya harus kelar dalam `deadline`
+    detik; yang belum kelar / gagal dapet error per item.
+    """
+    anime_ids = list(dict.fromkeys(x.strip() for x in ids.split(",") if x.strip()))
+    if not anime_ids:
+        return JSONResponse({"status": "failed", "error": "ids kosong"}, 400)
+    if len(anime_ids) > BATCH_DETAIL_MAX_IDS:
+        return JSONResponse({"status": "failed", "error": f"maksimal {BATCH_DETAIL_MAX_IDS} ids"}, 400)
+    deadline = min(max(deadline, 0.1), BATCH_DETAIL_DEADLINE)
+
+    wanted = parse_fields(fields)
+    sem = asyncio.Semaphore(BATCH_DETAIL_CONCURRENCY)
+
+    async def one(anime_id):
+        async with sem:
+            return await load_anime_detail(anime_id, wanted)
+
+    tasks = {anime_id: asyncio.create_task(one(anime_id)) for anime_id in anime_ids}
+    _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    # fetch yang kepotong tetep jalan di single-flight & masuk cache buat request berikutnya
+    for t in pending:
+        t.cancel()
 
-@app.get("/anime/samehadaku/search")
-def search_anime(query: str, page: int = 1):
-    url = f"{BASE_URL}/page/{page}/?s={query}" if page > 1 else f"{BASE_URL}/?s={query}"
-    soup = get_soup(url)
-    if not soup:
-        return JSONResponse({"status": "failed"}, 500)
-    nodes = soup.select(".animepost")
     results = []
-    for x in nodes:
-        p = parse_library_item(x)
-        if p:
-            results.append(p)
-    return JSONResponse({"status": "success", "creator": "Sanka Vollerei", "message": "",
-                         "data": {"animeList": results}, "pagination": get_pagination(soup, page)})
+    for anime_id, t in tasks.items():
+        item = {"animeId": anime_id}
+        if t in pending:
+            item.update({"status": "failed", "error": "timeout"})
+        elif t.exception() is not None:
+            item.update({"status": "failed", "error": str(t.exception())})
+        elif not t.result():
+            item.update({"status": "failed", "error": "not found"})
+        else:
+            item.update({"status": "success", "data": t.result()["data"]})
+        results.append(item)
+
+    ok = sum(1 for x in results if x["status"] == "success")
+    return payload_response(request, success({"animeList": results, "succeeded": ok, "failed": len(results) - ok}))
+
+@app.get("/anime/samehadaku/genres")
+async def get_all_genres(request: Request, source: str = "upstream"):
+    if source == "index" and GENRE_INDEX.taxonomy:
+        return payload_response(request, success({"genreList": GENRE_INDEX.genre_list()}))
+    entry = await load_entry("genres", BASE_URL, lambda soup: index_genres(extract_genres(soup)))
+    if not entry:
+        return JSONResponse({"status": "failed"}, 500)
+    return entry_response(request, entry)
+
+@app.get("/anime/samehadaku/genres/{genre_id}")
+async def get_anime_by_genre(request: Request, genre_id: str, page: int = Query(1, ge=1), source: str = "upstream", fields: str = None):
+    if source == "index" and genre_id in GENRE_INDEX.by_genre:
+        payload = GENRE_INDEX.listing(GENRE_INDEX.query([genre_id]), page)
+        return payload_response(request, select_fields(payload, parse_fields(fields), "animeList"))
+    if source == "catalog":
+        payload = await catalog_listing(page, genre_id=genre_id)
+        if payload:
+            return payload_response(request, select_fields(payload, parse_fields(fields), "animeList"))
+    entry = await load_listing_entry("genre", page, parse_fields(fields), genre_id=genre_id)
+    if not entry:
+        return JSONResponse({"status": "failed"}, 500)
+    return entry_response(request, entry)
+
+def search_url(query: str, page: int) -> str:
+    q = quote_plus(query)
+    return f"{BASE_URL}/page/{page}/?s={q}" if page > 1 else f"{BASE_URL}/?s={q}"
+
+@app.get("/anime/samehadaku/search")
+async def search_anime(request: Request, query: str, page: int = Query(1, ge=1), source: str = "upstream", fields: str = None):
+    if source == "catalog":
+        payload = await catalog_listing(page, title=query)
+        if payload:
+            return payload_response(request, select_fields(payload, parse_fields(fields), "animeList"))
+    wanted = parse_fields(fields)
+    entry = await load_entry(
+        "search", search_url(query, page), lambda soup: index_listing(extract_library(soup, page, fields=wanted), wanted), wanted, "animeList"
+    )
+    if not entry:
+        return JSONResponse({"status": "failed"}, 500)
+    return entry_response(request, entry)
 
 @app.get("/anime/samehadaku/batch")
-def get_batch_list(page: int = 1):
-    url = f"{BASE_URL}/daftar-batch/page/{page}/" if page > 1 else f"{BASE_URL}/daftar-batch/"
-    soup = get_soup(url)
-    if not soup:
+async def get_batch_list(request: Request, page: int = Query(1, ge=1), fields: str = None):
+    entry = await load_listing_entry("batch", page, parse_fields(fields))
+    if not entry:
         return JSONResponse({"status": "failed"}, 500)
-    nodes = soup.select(".animepost")
-    results = []
-    for x in nodes:
-        item = parse_library_item(x, "Completed")
-        if item:
-            item["batchId"] = item.pop("animeId")
-            item["href"] = f"/samehadaku/batch/{item['batchId']}"
-            results.append(item)
-    return JSONResponse({"status": "success", "creator": "Sanka Vollerei", "message": "",
-                         "data": {"batchList": results}, "pagination": get_pagination(soup, page)})
+    return entry_response(request, entry)
 
 @app.get("/anime/samehadaku/movies")
-def get_movies(page: int = 1):
-    url = f"{BASE_URL}/anime-movie/page/{page}/" if page > 1 else f"{BASE_URL}/anime-movie/"
-    soup = get_soup(url)
-    if not soup:
+async def get_movies(request: Request, page: int = Query(1, ge=1), source: str = "upstream", fields: str = None):
+    if source == "catalog":
+        payload = await catalog_listing(page, atype="Movie")
+        if payload:
+            return payload_response(request, select_fields(payload, parse_fields(fields), "animeList"))
+    entry = await load_listing_entry("movies", page, parse_fields(fields))
+    if not entry:
         return JSONResponse({"status": "failed"}, 500)
-    nodes = soup.select(".animepost")
-    results = []
-    for x in nodes:
-        p = parse_library_item(x)
-        if p:
-            p["type"] = "Movie"
-            results.append(p)
-    return JSONResponse({"status": "success", "creator": "Sanka Vollerei", "message": "",
-                         "data": {"animeList": results}, "pagination": get_pagination(soup, page)})
+    return entry_response(request, entry)
 
 @app.get("/anime/samehadaku/popular")
-def get_popular(page: int = 1):
-    url = f"{BASE_URL}/daftar-anime-2/page/{page}/?order=popular" if page > 1 else f"{BASE_URL}/daftar-anime-2/?order=popular"
-    soup = get_soup(url)
-    if not soup:
+async def get_popular(request: Request, page: int = Query(1, ge=1), fields: str = None):
+    entry = await load_listing_entry("popular", page, parse_fields(fields))
+    if not entry:
         return JSONResponse({"status": "failed"}, 500)
-    nodes = soup.select(".animepost")
-    results = []
-    for x in nodes:
-        p = parse_library_item(x)
-        if p:
-            results.append(p)
-    return JSONResponse({"status": "success", "creator": "Sanka Vollerei", "message": "",
-                         "data": {"animeList": results}, "pagination": get_pagination(soup, page)})
+    return entry_response(request, entry)
+
+def episode_url(episode_id: str) -> str:
+    return f"{BASE_URL}/{episode_id}/"
 
 @app.get("/anime/samehadaku/episode/{episode_id}")
-def get_episode_detail(episode_id: str):
-    soup = get_soup(f"{BASE_URL}/{episode_id}/")
-    if not soup:
+async def get_episode_detail(request: Request, episode_id: str, fields: str = None):
+    try:
+        wanted = parse_fields(fields)
+        entry = await load_entry(
+            "episode", episode_url(episode_id), lambda soup: extract_episode_detail(soup, wanted), wanted
+        )
+    except Exception as e:
+        return JSONResponse({"status": "failed", "error": str(e)}, 500)
+    if not entry:
         return JSONResponse({"status": "failed"}, 404)
+    next_href = (entry.payload["data"].get("navigation") or {}).get("next")
+    if next_href:
+        PREFETCHER.submit("episode", episode_url(extract_id(next_href)), extract_episode_detail)
+    return entry_response(request, entry)
+
+# ------------------------
+# LISTING STREAM (NDJSON)
+# ------------------------
 
+LISTING_STREAM_WINDOW = env_int("LISTING_STREAM_WINDOW", 4)
+LISTING_STREAM_MAX_WINDOW = env_int("LISTING_STREAM_MAX_WINDOW", 10)
+LISTING_STREAM_MAX_PAGES = env_int("LISTING_STREAM_MAX_PAGES", 500)
+
+def parse_page_range(pages: str):
+    """
+    "3" -> (3, 3), "2-7" -> (2, 7), "all" -> (1, None), "5-all" -> (5, None).
+    None = sampai totalPages dari pagination.
+    """
+    pages = (pages or "1").strip().lower()
+    if pages == "all":
+        return 1, None
+    start, _, end = pages.partition("-")
+    start = int(start)
+    if not end:
+        return start, start
+    if end == "all":
+        return start, None
+    return start, int(end)
+
+def _stream_line(page: int, payload) -> bytes:
+    if payload:
+        line = {"page": page, "status": "success", "data": payload["data"], "pagination": payload.get("pagination")}
+    else:
+        line = {"page": page, "status": "failed"}
+    return render_json(line) + b"\n"
+
+async def stream_listing(name: str, start: int, end, window: int, **params):
+    """
+    Fetch beberapa halaman listing barengan (maks `window` yang jalan),
+    tapi hasilnya di-yield urut halaman begitu halaman itu kelar.
+    """
+    first = start
+    if end is None:
+        # range "all": halaman pertama dulu buat tau totalPages
+        payload = await load_listing(name, start, **params)
+        yield _stream_line(start, payload)
+        pagination = (payload or {}).get("pagination") or {}
+        end = pagination.get("totalPages") or start
+        first = start + 1
+    end = min(end, start + LISTING_STREAM_MAX_PAGES - 1)
+
+    pending = deque()
+    next_page = first
     try:
-        title = soup.find("h1", class_="entry-title").get_text(strip=True)
+        while next_page <= end and len(pending) < window:
+            pending.append((next_page, asyncio.create_task(load_listing(name, next_page, **params))))
+            next_page += 1
+        while pending:
+            page, task = pending.popleft()
+            try:
+                payload = await task
+            except Exception as e:
+                log.warning("Error streaming %s page %s: %s", name, page, e)
+                payload = None
+            yield _stream_line(page, payload)
+            if next_page <= end:
+                pending.append((next_page, asyncio.create_task(load_listing(name, next_page, **params))))
+                next_page += 1
+    finally:
+        # client putus di tengah jalan: jangan terusin fetch sisa window
+        for _, task in pending:
+            task.cancel()
 
-        nav = {"prev": None, "next": None}
-        pa = soup.find("a", class_="prev")
-        na = soup.find("a", class_="next")
-        if pa and pa.get("href") and "/anime/" not in pa["href"]:
-            nav["prev"] = f"/samehadaku/episode/{extract_id(pa['href'])}"
-        if na and na.get("href") and "/anime/" not in na["href"]:
-            nav["next"] = f"/samehadaku/episode/{extract_id(na['href'])}"
+def listing_stream_response(name: str, pages: str, window, **params):
+    try:
+        start, end = parse_page_range(pages)
+    except ValueError:
+        return JSONResponse({"status": "failed", "error": "pages harus kayak 3, 1-5, all, atau 2-all"}, 400)
+    if start < 1 or (end is not None and end < start):
+        return JSONResponse({"status": "failed", "error": "range halaman gak valid"}, 400)
+    window = min(max(window or LISTING_STREAM_WINDOW, 1), LISTING_STREAM_MAX_WINDOW)
+    return StreamingResponse(stream_listing(name, start, end, window, **params), media_type="application/x-ndjson")
+
+@app.get("/anime/samehadaku/genres/{genre_id}/stream")
+async def stream_anime_by_genre(genre_id: str, pages: str = "1", window: int = None):
+    return listing_stream_response("genre", pages, window, genre_id=genre_id)
+
+@app.get("/anime/samehadaku/{listing}/stream")
+async def stream_listing_pages(listing: str, pages: str = "1", window: int = None):
+    """
+    Banyak halaman listing sekaligus sebagai NDJSON, satu baris per halaman:
+    /anime/samehadaku/latest/stream?pages=1-10 atau ?pages=all.
+    """
+    if listing not in LISTINGS or listing == "genre":
+        return JSONResponse({"status": "failed", "error": "listing gak dikenal"}, 404)
+    return listing_stream_response(listing, pages, window)
+
+# ------------------------
+# CATALOG (SQLITE)
+# ------------------------
+
+CATALOG_DB = os.getenv("CATALOG_DB", "/tmp/samehadaku-catalog.sqlite3")
+CATALOG_CRAWL_INTERVAL = env_float("CATALOG_CRAWL_INTERVAL", 0)  # detik, 0 = gak jalan otomatis
+CATALOG_CRAWL_MAX_PAGES = env_int("CATALOG_CRAWL_MAX_PAGES", 300)
+CATALOG_CRAWL_DELAY = env_float("CATALOG_CRAWL_DELAY", 0.5)  # jeda antar halaman biar sopan ke upstream
+CATALOG_CRAWL_GENRES = env_bool("CATALOG_CRAWL_GENRES", True)
+CATALOG_PAGE_SIZE = env_int("CATALOG_PAGE_SIZE", 20)
+CATALOG_BUSY_TIMEOUT = env_float("CATALOG_BUSY_TIMEOUT", 5.0)  # detik nunggu lock tulis SQLite
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+def is_admin(request: Request) -> bool:
+    token = request.headers.get("x-admin-token", "")
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS anime (
+    anime_id   TEXT PRIMARY KEY,
+    title      TEXT NOT NULL,
+    title_norm TEXT NOT NULL,
+    type       TEXT,
+    score      TEXT,
+    status     TEXT,
+    poster     TEXT,
+    url        TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS anime_title ON anime(title_norm);
+CREATE INDEX IF NOT EXISTS anime_status ON anime(status, title_norm);
+CREATE INDEX IF NOT EXISTS anime_type ON anime(type, title_norm);
+CREATE TABLE IF NOT EXISTS genre (
+    genre_id TEXT PRIMARY KEY,
+    title    TEXT NOT NULL,
+    url      TEXT
+);
+CREATE TABLE IF NOT EXISTS anime_genre (
+    genre_id TEXT NOT NULL,
+    anime_id TEXT NOT NULL,
+    PRIMARY KEY (genre_id, anime_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS anime_genre_anime ON anime_genre(anime_id);
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+class Catalog:
+    """
+    Katalog lokal (SQLite) hasil crawl daftar-anime-2 + halaman genre, biar
+    listing/genre bisa dilayani tanpa nembak upstream.
+
+    Method-nya sync (dipake langsung sama script di bench/); dari event loop
+    semua lewat `call`, yang jalan di satu thread sendiri kayak SharedCache,
+    biar nunggu lock tulis (crawler / worker lain) gak nahan request lain.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalog")
+        self._conn = None
+
+    async def call(self, fn, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, lambda: fn(*args, **kwargs))
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=CATALOG_BUSY_TIMEOUT, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(CATALOG_SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def upsert_items(self, items, status_known: bool = True):
+        """
+        items: hasil parse_library_item. status_known=False buat halaman yang
+        status-nya cuma default (genre, search), biar gak nimpa status asli.
+        """
+        now = time.time()
+        with self.conn as c:
+            for it in items:
+                c.execute(
+                    """
+                    INSERT INTO anime (anime_id, title, title_norm, type, score, status, poster, url, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(anime_id) DO UPDATE SET
+                        title = excluded.title,
+                        title_norm = excluded.title_norm,
+                        type = excluded.type,
+                        score = excluded.score,
+                        status = COALESCE(excluded.status, anime.status),
+                        poster = excluded.poster,
+                        url = excluded.url,
+                        updated_at = excluded.updated_at
+                    """,
+                    (
+                        it["animeId"], it["title"], _norm(it["title"]), it.get("type"), it.get("score"),
+                        it.get("status") if status_known else None, it.get("poster"), it.get("samehadakuUrl"), now,
+                    ),
+                )
+                for g in it.get("genreList") or []:
+                    self._upsert_genre(c, g)
+                    c.execute(
+                        "INSERT OR IGNORE INTO anime_genre (genre_id, anime_id) VALUES (?, ?)",
+                        (g["genreId"], it["animeId"]),
+                    )
+
+    def upsert_genres(self, genres):
+        with self.conn as c:
+            for g in genres:
+                self._upsert_genre(c, g)
+
+    def link_genre(self, genre_id: str, anime_ids):
+        with self.conn as c:
+            c.executemany(
+                "INSERT OR IGNORE INTO anime_genre (genre_id, anime_id) VALUES (?, ?)",
+                [(genre_id, a) for a in anime_ids],
+            )
+
+    @staticmethod
+    def _upsert_genre(c, g):
+        c.execute(
+            "INSERT INTO genre (genre_id, title, url) VALUES (?, ?, ?) "
+            "ON CONFLICT(genre_id) DO UPDATE SET title = excluded.title, url = excluded.url",
+            (g["genreId"], g["title"], g.get("samehadakuUrl")),
+        )
+
+    def set_meta(self, key: str, value):
+        with self.conn as c:
+            c.execute("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def get_meta(self, key: str, default=None):
+        row = self.conn.execute("SELECT value FROM catalog_meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["value"]) if row else default
+
+    def genres(self):
+        return [
+            {"title": r["title"], "genreId": r["genre_id"], "href": f"/samehadaku/genres/{r['genre_id']}", "samehadakuUrl": r["url"]}
+            for r in self.conn.execute("SELECT genre_id, title, url FROM genre ORDER BY title")
+        ]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM anime").fetchone()[0]
 
-        downloads = []
-        box = soup.find("div", class_="download-eps") or soup.find("div", id="server")
-        if box:
-            for ul in box.find_all("ul"):
-                prev_tag = ul.find_previous(["p", "h4", "div", "span"])
-                ft = prev_tag.get_text(strip=True) if prev_tag else "Unknown"
-
-                if "MKV" in ft:
-                    ft = "MKV"
-                elif "MP4" in ft:
-                    ft = "MP4"
-                elif "x265" in ft:
-                    ft = "x265"
-
-                quals = []
-                for li in ul.find_all("li"):
-                    qn = li.find("strong") or li.find("b")
-                    qn_txt = qn.get_text(strip=True) if qn else "Unknown"
-                    urls = [{"title": a.get_text(strip=True), "url": a["href"]} for a in li.find_all("a", href=True)]
-                    quals.append({"title": qn_txt, "urls": urls})
-
-                if quals:
-                    downloads.append({"title": ft, "qualities": quals})
-
-        iframe = soup.find("iframe")
-        stream = iframe.get("src", "") if iframe else ""
-
-        return JSONResponse({"status": "success", "creator": "Sanka Vollerei", "message": "",
-                             "data": {"title": title, "streamUrl": stream, "navigation": nav, "downloads": downloads}})
+    def query(self, page: int = 1, status=None, atype=None, genre_id=None, title=None, per_page: int = CATALOG_PAGE_SIZE):
+        """Listing dari katalog, format item sama kayak parse_library_item."""
+        where, args = [], []
+        join = ""
+        if genre_id:
+            join = "JOIN anime_genre ag ON ag.anime_id = a.anime_id AND ag.genre_id = ?"
+            args.append(genre_id)
+        if status:
+            where.append("a.status = ?")
+            args.append(status)
+        if atype:
+            where.append("a.type = ?")
+            args.append(atype)
+        if title:
+            where.append("a.title_norm LIKE ?")
+            args.append(f"%{_norm(title)}%")
+        sql_where = f"WHERE {' AND '.join(where)}" if where else ""
+
+        total = self.conn.execute(f"SELECT COUNT(*) FROM anime a {join} {sql_where}", args).fetchone()[0]
+        rows = self.conn.execute(
+            f"SELECT a.* FROM anime a {join} {sql_where} ORDER BY a.title_norm LIMIT ? OFFSET ?",
+            args + [per_page, (page - 1) * per_page],
+        ).fetchall()
+
+        genres = {}
+        ids = [r["anime_id"] for r in rows]
+        if ids:
+            marks = ",".join("?" * len(ids))
+            for g in self.conn.execute(
+                f"SELECT ag.anime_id, g.genre_id, g.title, g.url FROM anime_genre ag "
+                f"JOIN genre g ON g.genre_id = ag.genre_id WHERE ag.anime_id IN ({marks}) ORDER BY g.title",
+                ids,
+            ):
+                genres.setdefault(g["anime_id"], []).append(
+                    {"title": g["title"], "genreId": g["genre_id"], "href": f"/samehadaku/genres/{g['genre_id']}", "samehadakuUrl": g["url"]}
+                )
+
+        items = [
+            {
+                "title": r["title"],
+                "poster": r["poster"],
+                "type": r["type"],
+                "score": r["score"],
+                "status": r["status"] or "Unknown",
+                "animeId": r["anime_id"],
+                "href": f"/samehadaku/anime/{r['anime_id']}",
+                "samehadakuUrl": r["url"],
+                "genreList": genres.get(r["anime_id"], []),
+            }
+            for r in rows
+        ]
+        total_pages = max(1, -(-total // per_page))
+        pagination = {
+            "currentPage": page,
+            "hasPrevPage": page > 1,
+            "prevPage": page - 1 if page > 1 else None,
+            "hasNextPage": page < total_pages,
+            "nextPage": page + 1 if page < total_pages else None,
+            "totalPages": total_pages,
+        }
+        return items, pagination
+
+    def ingest_listing_html(self, html: str, name: str = "ongoing", genre_id: str = None):
+        """Masukin satu halaman listing (HTML mentah) ke katalog; dipake crawler dan rebuild dari fixture."""
+        soup = make_soup(html, route=name)
+        payload = LISTINGS[name]["extract"](soup, 1)
+        items = payload["data"]["animeList"]
+        self.upsert_items(items, status_known=name in ("ongoing", "completed"))
+        if genre_id:
+            self.link_genre(genre_id, [it["animeId"] for it in items])
+        return payload
+
+CATALOG = Catalog(CATALOG_DB)
+
+async def close_catalog():
+    await CATALOG.call(CATALOG.close)
+
+SHUTDOWN_HOOKS.append(close_catalog)
+
+# ------------------------
+# CATALOG CRAWLER
+# ------------------------
+
+_crawl_state = {"running": False, "startedAt": None, "finishedAt": None, "pages": 0, "items": 0, "errors": 0}
+_crawl_task = None
+
+async def _crawl_listing(name: str, **params):
+    page = 1
+    total = 1
+    while page <= min(total, CATALOG_CRAWL_MAX_PAGES):
+        url = LISTINGS[name]["url"](page, **params)
+        html = await fetch_html(url, "catalog_crawl")
+        if html is None:
+            _crawl_state["errors"] += 1
+            break
+        payload = await CATALOG.call(CATALOG.ingest_listing_html, html, name, params.get("genre_id"))
+        index_listing(payload, status_known=name in ("ongoing", "completed"), genre_id=params.get("genre_id"))
+        _crawl_state["pages"] += 1
+        _crawl_state["items"] += len(payload["data"]["animeList"])
+        total = (payload.get("pagination") or {}).get("totalPages") or page
+        page += 1
+        await asyncio.sleep(CATALOG_CRAWL_DELAY)
+
+async def crawl_catalog():
+    """Crawl ulang katalog: daftar-anime-2 (ongoing + completed) lalu semua genre."""
+    _crawl_state.update(running=True, startedAt=time.time(), pages=0, items=0, errors=0)
+    try:
+        await _crawl_listing("ongoing")
+        await _crawl_listing("completed")
+        if CATALOG_CRAWL_GENRES:
+            genres_payload = await load_page("genres", BASE_URL, extract_genres)
+            genres = genres_payload["data"]["genreList"] if genres_payload else []
+            await CATALOG.call(CATALOG.upsert_genres, genres)
+            GENRE_INDEX.add_genres(genres)
+            for g in genres:
+                await _crawl_listing("genre", genre_id=g["genreId"])
+        last = {"finishedAt": time.time(), "pages": _crawl_state["pages"], "items": _crawl_state["items"]}
+        await CATALOG.call(CATALOG.set_meta, "lastCrawl", last)
     except Exception as e:
-        return JSONResponse({"status": "failed", "error": str(e)}, 500)
+        _crawl_state["errors"] += 1
+        log.exception("Error crawling catalog: %s", e)
+    finally:
+        _crawl_state.update(running=False, finishedAt=time.time())
+
+def start_catalog_crawl():
+    global _crawl_task
+    if _crawl_task is None or _crawl_task.done():
+        _crawl_task = asyncio.create_task(crawl_catalog())
+    return _crawl_task
+
+async def _catalog_crawl_loop():
+    while True:
+        await start_catalog_crawl()
+        await asyncio.sleep(CATALOG_CRAWL_INTERVAL)
+
+_crawl_loop_task = None
+
+async def start_catalog_crawler():
+    global _crawl_loop_task
+    if CATALOG_CRAWL_INTERVAL > 0:
+        _crawl_loop_task = asyncio.create_task(_catalog_crawl_loop())
+
+async def stop_catalog_crawler():
+    for t in (_crawl_loop_task, _crawl_task):
+        if t is not None and not t.done():
+            t.cancel()
+
+STARTUP_HOOKS.append(start_catalog_crawler)
+SHUTDOWN_HOOKS.append(stop_catalog_crawler)
+
+async def catalog_listing(page: int, **filters):
+    """Payload listing dari katalog, atau None kalau katalog masih kosong."""
+    if await CATALOG.call(CATALOG.count) == 0:
+        return None
+    items, pagination = await CATALOG.call(CATALOG.query, page, **filters)
+    return success({"animeList": items}, pagination=pagination)
+
+@app.get("/anime/samehadaku/catalog")
+async def get_catalog_status():
+    count = await CATALOG.call(CATALOG.count)
+    last = await CATALOG.call(CATALOG.get_meta, "lastCrawl")
+    return success({"animeCount": count, "lastCrawl": last, "crawler": _crawl_state})
+
+@app.post("/anime/samehadaku/catalog/refresh")
+async def refresh_catalog(request: Request):
+    if not is_admin(request):
+        return JSONResponse({"status": "failed", "error": "forbidden"}, 403)
+    start_catalog_crawl()
+    return JSONResponse(success({"crawler": _crawl_state}), 202)
+
+# ------------------------
+# CATALOG INCREMENTAL REFRESH
+# ------------------------
+
+CATALOG_REFRESH_INTERVAL = env_float("CATALOG_REFRESH_INTERVAL", 0)  # detik, 0 = gak jalan otomatis
+CATALOG_REFRESH_PAGES = env_int("CATALOG_REFRESH_PAGES", 1)  # berapa halaman anime-terbaru yang dibaca
+
+REFRESH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_validators (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    size          INTEGER,
+    checked_at    REAL
+);
+CREATE TABLE IF NOT EXISTS latest_seen (
+    anime_id TEXT PRIMARY KEY,
+    episode  TEXT,
+    seen_at  REAL
+);
+CREATE TABLE IF NOT EXISTS change_log (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    anime_id TEXT NOT NULL,
+    episode  TEXT,
+    action   TEXT NOT NULL,
+    bytes    INTEGER,
+    at       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS change_log_anime ON change_log(anime_id, id);
+"""
+
+EPISODE_SLUG_RE = re.compile(r"^(?P<anime>.+?)-episode-\d+.*$")
+DETAIL_STATUS = {"currently airing": "Ongoing", "finished airing": "Completed"}
+
+EPISODE_TITLE_RE = re.compile(r"\s+Episode\s+\d+\b.*$", re.IGNORECASE)
+
+def anime_id_from_episode(slug: str) -> str:
+    # "battle-through-the-heavens-episode-83" -> "battle-through-the-heavens"
+    m = EPISODE_SLUG_RE.match(slug or "")
+    return m.group("anime") if m else slug
+
+def anime_title_from_episode(title: str) -> str:
+    # "Throne of Seal Episode 132" -> "Throne of Seal"
+    return EPISODE_TITLE_RE.sub("", title or "").strip() or title
+
+async def fetch_conditional(url: str, etag: str = None, last_modified: str = None):
+    """GET pake If-None-Match / If-Modified-Since. Balikin response (bisa 304) atau None kalau error."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        resp = await resilient_get(url, "catalog_refresh", headers=headers)
+        if resp.status_code not in (200, 304):
+            resp.raise_for_status()
+            return None
+        return resp
+    except Exception as e:
+        log.warning("Error scraping %s: %s", url, e)
+        return None
+
+class CatalogRefresher:
+    """
+    Refresh katalog secara incremental: baca anime-terbaru, cari anime yang
+    berubah sejak run terakhir, terus ambil ulang detail-nya aja pake
+    conditional GET (304 = gak di-parse sama sekali).
+    """
+
+    def __init__(self, catalog: Catalog):
+        self.catalog = catalog
+        self._ready = False
+
+    @property
+    def conn(self):
+        if not self._ready:
+            self.catalog.conn.executescript(REFRESH_SCHEMA)
+            self._ready = True
+        return self.catalog.conn
+
+    def stats(self):
+        return self.catalog.get_meta("refreshStats", {
+            "runs": 0, "pagesSkipped": 0, "pagesReparsed": 0, "pagesFailed": 0,
+            "bytesDownloaded": 0, "bytesSaved": 0, "lastRun": None,
+        })
+
+    def validators(self, url: str):
+        return self.conn.execute("SELECT * FROM page_validators WHERE url = ?", (url,)).fetchone()
+
+    def save_validators(self, url: str, resp):
+        with self.conn as c:
+            c.execute(
+                "INSERT OR REPLACE INTO page_validators (url, etag, last_modified, size, checked_at) VALUES (?, ?, ?, ?, ?)",
+                (url, resp.headers.get("etag"), resp.headers.get("last-modified"), len(resp.content), time.time()),
+            )
+
+    def log(self, anime_id: str, episode, action: str, size: int = 0):
+        with self.conn as c:
+            c.execute(
+                "INSERT INTO change_log (anime_id, episode, action, bytes, at) VALUES (?, ?, ?, ?, ?)",
+                (anime_id, episode, action, size, time.time()),
+            )
+
+    def changes(self, limit: int = 50, anime_id: str = None):
+        sql = "SELECT * FROM change_log"
+        args = []
+        if anime_id:
+            sql += " WHERE anime_id = ?"
+            args.append(anime_id)
+        sql += " ORDER BY id DESC LIMIT ?"
+        args.append(limit)
+        return [dict(r) for r in self.conn.execute(sql, args)]
+
+    def changed_since_last_run(self, items):
+        """items dari parse_latest_item -> [(anime_id, episode, item)] yang episodenya baru."""
+        changed = {}
+        for it in items:
+            anime_id = anime_id_from_episode(it["animeId"])
+            if anime_id in changed:
+                continue
+            row = self.conn.execute("SELECT episode FROM latest_seen WHERE anime_id = ?", (anime_id,)).fetchone()
+            if row is None or row["episode"] != it["episodes"]:
+                changed[anime_id] = (anime_id, it["episodes"], it)
+        return list(changed.values())
+
+    def mark_seen(self, anime_id: str, episode):
+        with self.conn as c:
+            c.execute("INSERT OR REPLACE INTO latest_seen (anime_id, episode, seen_at) VALUES (?, ?, ?)", (anime_id, episode, time.time()))
+
+    def apply_detail(self, anime_id: str, data: dict, fallback_title: str):
+        """fallback_title dipake kalau anime-nya belum ada di katalog; baris lama judulnya gak ditimpa."""
+        title = data.get("title") or anime_title_from_episode(fallback_title)
+        status = DETAIL_STATUS.get((data.get("status") or "").lower(), data.get("status"))
+        score = (data.get("score") or {}).get("value")
+        with self.catalog.conn as c:
+            c.execute(
+                """
+                INSERT INTO anime (anime_id, title, title_norm, type, score, status, poster, url, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(anime_id) DO UPDATE SET
+                    type = excluded.type, score = excluded.score, status = excluded.status,
+                    poster = excluded.poster, updated_at = excluded.updated_at
+                """,
+                (
+                    anime_id, title, _norm(title), data.get("type"), score, status,
+                    data.get("poster"), f"{BASE_URL}/anime/{anime_id}/", time.time(),
+                ),
+            )
+        if data.get("genreList"):
+            self.catalog.upsert_genres(data["genreList"])
+            for g in data["genreList"]:
+                self.catalog.link_genre(g["genreId"], [anime_id])
+
+    async def refresh_detail(self, anime_id: str, episode, title: str, stats: dict):
+        url = f"{BASE_URL}/anime/{anime_id}/"
+        old = await self.catalog.call(self.validators, url)
+        resp = await fetch_conditional(url, old["etag"] if old else None, old["last_modified"] if old else None)
+        if resp is None:
+            stats["pagesFailed"] += 1
+            await self.catalog.call(self.log, anime_id, episode, "error")
+            return False
+        if resp.status_code == 304:
+            saved = old["size"] or 0
+            stats["pagesSkipped"] += 1
+            stats["bytesSaved"] += saved
+            await self.catalog.call(self.log, anime_id, episode, "not-modified", saved)
+            await self.catalog.call(self.mark_seen, anime_id, episode)
+            return True
+
+        stats["pagesReparsed"] += 1
+        stats["bytesDownloaded"] += len(resp.content)
+        payload = index_anime_detail(anime_id, extract_anime_detail(make_soup(upstream_text(resp), route="anime")))
+        await self.catalog.call(self.apply_detail, anime_id, payload["data"], title)
+        if CACHE_ENABLED:
+            RESPONSE_CACHE.set(f"anime:{url}", "anime", payload)
+        await self.catalog.call(self.save_validators, url, resp)
+        await self.catalog.call(self.log, anime_id, episode, "reparsed", len(resp.content))
+        await self.catalog.call(self.mark_seen, anime_id, episode)
+        return True
+
+    async def run(self):
+        stats = await self.catalog.call(self.stats)
+        for page in range(1, CATALOG_REFRESH_PAGES + 1):
+            url = LISTINGS["latest"]["url"](page)
+            old = await self.catalog.call(self.validators, url)
+            resp = await fetch_conditional(url, old["etag"] if old else None, old["last_modified"] if old else None)
+            if resp is None:
+                stats["pagesFailed"] += 1
+                continue
+            if resp.status_code == 304:
+                # feed-nya sendiri gak berubah, berarti gak ada episode baru di halaman ini
+                stats["pagesSkipped"] += 1
+                stats["bytesSaved"] += old["size"] or 0
+                continue
+            stats["bytesDownloaded"] += len(resp.content)
+            items = extract_latest(make_soup(upstream_text(resp), route="latest"), page)["data"]["animeList"]
+            refreshed = True
+            for anime_id, episode, item in await self.catalog.call(self.changed_since_last_run, items):
+                refreshed &= await self.refresh_detail(anime_id, episode, item["title"], stats)
+            # validator feed baru disimpen kalau semua anime yang berubah udah ke-refresh,
+            # kalau nggak run berikutnya dapet 304 dan yang gagal gak pernah dicek ulang
+            if refreshed:
+                await self.catalog.call(self.save_validators, url, resp)
+
+        stats["runs"] += 1
+        stats["lastRun"] = time.time()
+        await self.catalog.call(self.catalog.set_meta, "refreshStats", stats)
+        return stats
+
+CATALOG_REFRESHER = CatalogRefresher(CATALOG)
+_refresh_run_task = None
+_refresh_loop_task = None
+
+def start_catalog_refresh():
+    global _refresh_run_task
+    if _refresh_run_task is None or _refresh_run_task.done():
+        _refresh_run_task = asyncio.create_task(CATALOG_REFRESHER.run())
+    return _refresh_run_task
+
+async def _catalog_refresh_loop():
+    while True:
+        try:
+            await start_catalog_refresh()
+        except Exception as e:
+            log.exception("Error refreshing catalog: %s", e)
+        await asyncio.sleep(CATALOG_REFRESH_INTERVAL)
+
+async def start_catalog_refresher():
+    global _refresh_loop_task
+    if CATALOG_REFRESH_INTERVAL > 0:
+        _refresh_loop_task = asyncio.create_task(_catalog_refresh_loop())
+
+async def stop_catalog_refresher():
+    for t in (_refresh_loop_task, _refresh_run_task):
+        if t is not None and not t.done():
+            t.cancel()
+
+STARTUP_HOOKS.append(start_catalog_refresher)
+SHUTDOWN_HOOKS.append(stop_catalog_refresher)
+
+@app.post("/anime/samehadaku/catalog/refresh-latest")
+async def refresh_catalog_latest(request: Request):
+    if not is_admin(request):
+        return JSONResponse({"status": "failed", "error": "forbidden"}, 403)
+    # sama kayak /catalog/refresh: jalan di background, hasilnya di /catalog/changes
+    task = start_catalog_refresh()
+    stats = await CATALOG.call(CATALOG_REFRESHER.stats)
+    return JSONResponse(success({"running": not task.done(), "refresh": stats}), 202)
+
+@app.get("/anime/samehadaku/catalog/changes")
+async def get_catalog_changes(limit: int = 50, anime_id: str = None):
+    limit = min(max(limit, 1), 500)
+    stats = await CATALOG.call(CATALOG_REFRESHER.stats)
+    changes = await CATALOG.call(CATALOG_REFRESHER.changes, limit, anime_id)
+    return success({"refresh": stats, "changes": changes})
+
+# ------------------------
+# SEARCH INDEX
+# ------------------------
+
+SEARCH_LIMIT = env_int("SEARCH_LIMIT", 10)
+SEARCH_MIN_SCORE = env_float("SEARCH_MIN_SCORE", 0.35)  # dice trigram minimal buat fuzzy match
+SEARCH_WORD_RE = re.compile(r"[^a-z0-9]+")
+SEARCH_DOC_KEYS = ("title", "poster", "type", "score", "status", "animeId", "href", "samehadakuUrl")
+
+def search_norm(s: str) -> str:
+    return SEARCH_WORD_RE.sub(" ", (s or "").lower()).strip()
+
+def trigrams(name: str):
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SearchIndex:
+    """
+    Index judul di memori buat autocomplete: judul, synonyms, english,
+    japanese (dari halaman detail) -> animeId. Prefix per kata pake list
+    token yang di-sort (bisect), fuzzy/typo pake trigram + skor dice.
+    Diisi dari hasil scrape listing/search/detail dan katalog.
+    """
+
+    def __init__(self):
+        self.docs = {}  # animeId -> item ringkas (format parse_library_item)
+        self.names = {}  # animeId -> set nama yang udah di-normalize
+        self.grams = {}  # nama -> set trigram
+        self.postings = {}  # trigram -> set nama
+        self.owners = {}  # nama -> set animeId
+        self._tokens = []  # (token, nama) urut, dibangun ulang kalau dirty
+        self._dirty = False
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "fallbacks": 0}
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add_items(self, items):
+        for it in items or []:
+            if not it or not it.get("animeId") or not it.get("title"):
+                continue
+            doc = self.docs.setdefault(it["animeId"], {})
+            for k in SEARCH_DOC_KEYS:
+                # item yang di-trim (fields=) jangan nimpa nilai lama pake None
+                if it.get(k) is not None:
+                    doc[k] = it[k]
+            self._add_name(it["animeId"], it["title"])
+
+    def add_names(self, anime_id: str, names, item=None):
+        names = [n.strip() for raw in names if raw and raw != "-" for n in raw.split(",") if n.strip()]
+        if not names:
+            return
+        doc = self.docs.setdefault(anime_id, {})
+        if not doc.get("title"):
+            doc.update({k: v for k, v in (item or {}).items() if k in SEARCH_DOC_KEYS and v is not None})
+            doc.update(
+                title=doc.get("title") or names[0],
+                animeId=anime_id,
+                href=f"/samehadaku/anime/{anime_id}",
+                samehadakuUrl=doc.get("samehadakuUrl") or anime_detail_url(anime_id),
+            )
+        for n in names:
+            self._add_name(anime_id, n)
+
+    def _add_name(self, anime_id: str, raw: str):
+        name = search_norm(raw)
+        if not name or name in self.names.setdefault(anime_id, set()):
+            return
+        self.names[anime_id].add(name)
+        self.owners.setdefault(name, set()).add(anime_id)
+        if name not in self.grams:
+            grams = trigrams(name)
+            self.grams[name] = grams
+            for g in grams:
+                self.postings.setdefault(g, set()).add(name)
+            self._dirty = True
+
+    def _token_list(self):
+        if self._dirty:
+            self._tokens = sorted({(tok, name) for name in self.grams for tok in name.split()})
+            self._dirty = False
+        return self._tokens
+
+    def _prefix_names(self, token: str):
+        tokens = self._token_list()
+        i = bisect.bisect_left(tokens, (token,))
+        found = set()
+        while i < len(tokens) and tokens[i][0].startswith(token):
+            found.add(tokens[i][1])
+            i += 1
+        return found
+
+    def prefix(self, query: str):
+        """Nama yang tiap kata query-nya prefix dari salah satu kata di nama itu."""
+        words = query.split()
+        if not words:
+            return {}
+        names = None
+        for w in words:
+            hit = self._prefix_names(w)
+            names = hit if names is None else names & hit
+            if not names:
+                return {}
+        # exact > awal nama > awal kata; nama pendek menang
+        return {n: (3.0 if n == query else 2.0 if n.startswith(query) else 1.0) - len(n) / 1000 for n in names}
+
+    def fuzzy(self, query: str):
+        grams = trigrams(query)
+        overlap = {}
+        for g in grams:
+            for name in self.postings.get(g, ()):
+                overlap[name] = overlap.get(name, 0) + 1
+        scored = {}
+        for name, n in overlap.items():
+            dice = 2 * n / (len(grams) + len(self.grams[name]))
+            if dice >= SEARCH_MIN_SCORE:
+                scored[name] = dice
+        return scored
+
+    def lookup(self, query: str, limit: int = SEARCH_LIMIT):
+        self.stats["lookups"] += 1
+        q = search_norm(query)
+        if not q:
+            return []
+        ranked = self.prefix(q)
+        if len(ranked) < limit and len(q) >= 3:
+            for name, score in self.fuzzy(q).items():
+                ranked.setdefault(name, score)
+        best = {}
+        for name, score in ranked.items():
+            for anime_id in self.owners[name]:
+                if score > best.get(anime_id, -1):
+                    best[anime_id] = score
+        top = sorted(best, key=lambda a: (-best[a], self.docs[a].get("title", "")))[:limit]
+        self.stats["hits" if top else "misses"] += 1
+        return [{**self.docs[a], "matchScore": round(best[a], 3)} for a in top]
+
+    def summary(self):
+        return {**self.stats, "anime": len(self.docs), "names": len(self.grams), "trigrams": len(self.postings)}
+
+SEARCH_INDEX = SearchIndex()
+
+# key yang selalu ada di item listing; sisanya cuma bener kalau gak di-trim pake fields=
+INDEX_ALWAYS_KEYS = ("title", "animeId", "href", "samehadakuUrl")
+
+def index_items(items, fields=None, status_known=False, genre_id=None):
+    """Masukin item listing ke SEARCH_INDEX + GENRE_INDEX, buang field yang cuma nilai default."""
+    trimmed = []
+    for it in items or []:
+        item = {k: v for k, v in it.items() if k in INDEX_ALWAYS_KEYS or (k != "status" and wants(fields, k))}
+        if status_known and it.get("status") not in (None, "Unknown"):
+            item["status"] = it["status"]
+        trimmed.append(item)
+    SEARCH_INDEX.add_items(trimmed)
+    GENRE_INDEX.add_items(trimmed, genre_id)
+
+def index_listing(payload, fields=None, status_known=False, genre_id=None):
+    """Bungkus extractor listing/search: item hasil scrape sekalian masuk index."""
+    if payload:
+        index_items((payload.get("data") or {}).get("animeList"), fields, status_known, genre_id)
+    return payload
+
+def index_anime_detail(anime_id: str, payload, fields=None):
+    if payload:
+        data = payload.get("data") or {}
+        item = {
+            "animeId": anime_id,
+            "poster": data.get("poster"),
+            "type": data.get("type"),
+            "score": (data.get("score") or {}).get("value"),
+            "status": DETAIL_STATUS.get((data.get("status") or "").lower(), data.get("status")),
+        }
+        if wants(fields, "genreList"):
+            item["genreList"] = data.get("genreList")
+        SEARCH_INDEX.add_names(anime_id, [data.get("title"), data.get("english"), data.get("synonyms"), data.get("japanese")], item)
+        GENRE_INDEX.add_items([item])
+    return payload
+
+async def seed_search_index():
+    # belum pernah ada katalog: jangan bikin file + schema cuma buat ngecek kosong
+    if not os.path.exists(CATALOG.path) or await CATALOG.call(CATALOG.count) == 0:
+        return
+    GENRE_INDEX.add_genres(await CATALOG.call(CATALOG.genres))
+    page, total = 1, 1
+    while page <= total:
+        items, pagination = await CATALOG.call(CATALOG.query, page, per_page=500)
+        index_items(items, status_known=True)
+        total = pagination["totalPages"]
+        page += 1
+    log.info("Search index: %d anime dari katalog", len(SEARCH_INDEX))
+
+STARTUP_HOOKS.append(seed_search_index)
+
+@app.get("/anime/samehadaku/autocomplete")
+async def autocomplete(request: Request, q: str = Query(..., min_length=1), limit: int = Query(SEARCH_LIMIT, ge=1, le=50)):
+    results = SEARCH_INDEX.lookup(q, limit)
+    source = "index"
+    if not results:
+        # belum pernah ke-index: tanya upstream sekali, hasilnya ikut masuk index
+        SEARCH_INDEX.stats["fallbacks"] += 1
+        source = "upstream"
+        entry = await load_entry("search", search_url(q, 1), lambda soup: index_listing(extract_library(soup, 1)))
+        if entry is None:
+            return JSONResponse({"status": "failed"}, 500)
+        results = entry.payload["data"]["animeList"][:limit]
+    return payload_response(request, success({"query": q, "source": source, "animeList": results}))
+
+# ------------------------
+# GENRE INDEX
+# ------------------------
+
+GENRE_PAGE_SIZE = env_int("GENRE_PAGE_SIZE", 20)
+
+class GenreIndex:
+    """
+    Taksonomi genre (genreId -> info) + inverted index genre/status/type ->
+    set animeId, dari genreList yang udah keparse di listing, detail, dan
+    katalog. Query multi-genre tinggal operasi set, gak nembak upstream.
+    """
+
+    def __init__(self):
+        self.taxonomy = {}  # genreId -> {title, genreId, href, samehadakuUrl}
+        self.by_genre = {}  # genreId -> set animeId
+        self.by_status = {}  # status (ter-normalize) -> set animeId
+        self.by_type = {}
+        self.facets = {}  # animeId -> {"status": .., "type": ..}, buat mindahin kalau berubah
+
+    def add_genres(self, genres):
+        for g in genres or []:
+            if g.get("genreId"):
+                self.taxonomy[g["genreId"]] = {k: g.get(k) for k in ("title", "genreId", "href", "samehadakuUrl")}
+
+    def add_items(self, items, genre_id=None):
+        for it in items or []:
+            anime_id = it.get("animeId")
+            if not anime_id:
+                continue
+            genres = it.get("genreList") or []
+            self.add_genres(genres)
+            for gid in [g["genreId"] for g in genres if g.get("genreId")] + ([genre_id] if genre_id else []):
+                self.by_genre.setdefault(gid, set()).add(anime_id)
+            if it.get("status"):
+                self._facet(self.by_status, "status", anime_id, _norm(it["status"]))
+            if it.get("type"):
+                self._facet(self.by_type, "type", anime_id, _norm(it["type"]))
+
+    def _facet(self, index, name, anime_id, value):
+        facets = self.facets.setdefault(anime_id, {})
+        old = facets.get(name)
+        if old == value:
+            return
+        if old is not None:
+            index[old].discard(anime_id)
+        facets[name] = value
+        index.setdefault(value, set()).add(anime_id)
+
+    def query(self, include, exclude=(), status=None, atype=None, match="all"):
+        sets = [self.by_genre.get(g, set()) for g in include]
+        if not sets:
+            found = set(self.facets) | set().union(*self.by_genre.values())
+        elif match == "any":
+            found = set().union(*sets)
+        else:
+            found = set.intersection(*sets)
+        for g in exclude:
+            found = found - self.by_genre.get(g, set())
+        if status:
+            found = found & self.by_status.get(_norm(status), set())
+        if atype:
+            found = found & self.by_type.get(_norm(atype), set())
+        return found
+
+    def genres_of(self, anime_id: str):
+        return [g for gid, g in self.taxonomy.items() if anime_id in self.by_genre.get(gid, ())]
+
+    def genre_list(self):
+        return sorted(self.taxonomy.values(), key=lambda g: g["title"] or "")
+
+    def listing(self, anime_ids, page: int = 1, per_page: int = GENRE_PAGE_SIZE):
+        """Payload listing (format parse_library_item) dari set animeId, urut judul."""
+        docs = SEARCH_INDEX.docs
+        ordered = sorted(anime_ids, key=lambda a: (docs.get(a, {}).get("title") or a).lower())
+        total_pages = max(1, -(-len(ordered) // per_page))
+        items = []
+        for anime_id in ordered[(page - 1) * per_page:page * per_page]:
+            doc = docs.get(anime_id, {})
+            items.append({
+                "title": doc.get("title", anime_id),
+                "poster": doc.get("poster"),
+                "type": doc.get("type", "TV"),
+                "score": doc.get("score", "?"),
+                "status": doc.get("status", "Unknown"),
+                "animeId": anime_id,
+                "href": f"/samehadaku/anime/{anime_id}",
+                "samehadakuUrl": doc.get("samehadakuUrl") or anime_detail_url(anime_id),
+                "genreList": self.genres_of(anime_id),
+            })
+        pagination = {
+            "currentPage": page,
+            "hasPrevPage": page > 1,
+            "prevPage": page - 1 if page > 1 else None,
+            "hasNextPage": page < total_pages,
+            "nextPage": page + 1 if page < total_pages else None,
+            "totalPages": total_pages,
+        }
+        return success({"animeList": items, "total": len(ordered)}, pagination=pagination)
+
+    def summary(self):
+        return {
+            "genres": len(self.taxonomy),
+            "anime": len(set(self.facets) | set().union(*self.by_genre.values())),
+            "postings": sum(len(v) for v in self.by_genre.values()),
+        }
+
+GENRE_INDEX = GenreIndex()
+
+def index_genres(payload):
+    if payload:
+        GENRE_INDEX.add_genres(payload["data"]["genreList"])
+    return payload
+
+def split_ids(value: str):
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+@app.get("/anime/samehadaku/genre-index")
+async def query_genre_index(
+    request: Request,
+    include: str = "",
+    exclude: str = "",
+    status: str = None,
+    atype: str = Query(None, alias="type"),
+    match: str = "all",
+    page: int = Query(1, ge=1),
+    fields: str = None,
+):
+    """
+    Query genre yang gak bisa di upstream: ?include=action,fantasy&status=ongoing
+    (semua genre, AND), match=any buat OR, exclude=... buat buang genre.
+    Cuma dari anime yang udah pernah ke-index (listing/detail/katalog).
+    """
+    unknown = [g for g in split_ids(include) + split_ids(exclude) if g not in GENRE_INDEX.taxonomy and g not in GENRE_INDEX.by_genre]
+    found = GENRE_INDEX.query(split_ids(include), split_ids(exclude), status, atype, match)
+    payload = GENRE_INDEX.listing(found, page)
+    payload["data"]["unknownGenres"] = unknown
+    return payload_response(request, select_fields(payload, parse_fields(fields), "animeList"))
+
+# ------------------------
+# PROFILING
+# ------------------------
+
+# mati = middleware-nya gak dipasang sama sekali
+PROFILING_ENABLED = env_bool("PROFILING_ENABLED", False)
+PROFILE_INTERVAL = env_float("PROFILE_INTERVAL", 0.002)
+PROFILE_KEEP = env_int("PROFILE_KEEP", 20)
+PROFILE_TOP_N = env_int("PROFILE_TOP_N", 30)
+
+class StackSampler:
+    """
+    Sampling profiler: thread terpisah ngambil stack thread event loop tiap
+    `interval` detik (sys._current_frames). Hasilnya collapsed stack
+    ("a;b;c count", format flamegraph.pl / speedscope). Semua yang jalan
+    di loop ikut ke-sample, termasuk request lain yang barengan.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in sorted(self.stacks.items(), key=lambda x: -x[1]))
+
+    def top(self, n: int):
+        """Fungsi paling panas: self = lagi di fungsi itu, total = ada di stack."""
+        own, total = {}, {}
+        for stack, count in self.stacks.items():
+            funcs = stack.split(";")
+            own[funcs[-1]] = own.get(funcs[-1], 0) + count
+            for func in set(funcs):
+                total[func] = total.get(func, 0) + count
+        samples = self.samples or 1
+        rows = sorted(total, key=lambda f: (-own.get(f, 0), -total[f]))[:n]
+        return [
+            {
+                "function": f,
+                "self": own.get(f, 0),
+                "total": total[f],
+                "selfPct": round(100 * own.get(f, 0) / samples, 1),
+                "totalPct": round(100 * total[f] / samples, 1),
+            }
+            for f in rows
+        ]
+
+_profiles = OrderedDict()
+_profile_seq = 0
+_profiling_busy = False
+
+def _send_with_header(send, name: bytes, value: bytes, status: dict):
+    async def wrapper(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+            message["headers"] = [*message.get("headers", []), (name, value)]
+        await send(message)
+    return wrapper
+
+class ProfileMiddleware:
+    """
+    Request dengan header X-Profile (1 = apa adanya, cold = lewatin cache)
+    dan X-Admin-Token yang valid dijalanin di bawah StackSampler. Hasilnya
+    disimpen, id-nya dibalikin di header X-Profile-Id.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request = Request(scope)
+        mode = request.headers.get("x-profile")
+        if not mode or not is_admin(request):
+            return await self.app(scope, receive, send)
+
+        global _profile_seq, _profiling_busy
+        status = {"code": 500}
+        if _profiling_busy:
+            # sampler nyampur kalau dua jalan barengan
+            return await self.app(scope, receive, _send_with_header(send, b"x-profile-skipped", b"busy", status))
+
+        _profiling_busy = True
+        _profile_seq += 1
+        profile_id = f"{int(time.time())}-{_profile_seq}"
+        send_wrapper = _send_with_header(send, b"x-profile-id", profile_id.encode(), status)
+
+        sampler = StackSampler(threading.get_ident(), PROFILE_INTERVAL)
+        token = BYPASS_CACHE.set(mode.strip().lower() == "cold")
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            BYPASS_CACHE.reset(token)
+            _profiling_busy = False
+            _profiles[profile_id] = {
+                "id": profile_id,
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "mode": mode,
+                "status": status["code"],
+                "durationMs": round((time.perf_counter() - started) * 1000, 2),
+                "intervalMs": PROFILE_INTERVAL * 1000,
+                "samples": sampler.samples,
+                "top": sampler.top(PROFILE_TOP_N),
+                "collapsed": sampler.collapsed(),
+            }
+            while len(_profiles) > PROFILE_KEEP:
+                _profiles.popitem(last=False)
+
+if PROFILING_ENABLED:
+    app.add_middleware(ProfileMiddleware)
+
+@app.get("/debug/profiles")
+async def list_profiles(request: Request):
+    if not is_admin(request):
+        return JSONResponse({"status": "failed", "error": "forbidden"}, 403)
+    items = [{k: p[k] for k in ("id", "method", "path", "query", "mode", "status", "durationMs", "samples")} for p in _profiles.values()]
+    return success({"enabled": PROFILING_ENABLED, "profiles": items[::-1]})
+
+@app.get("/debug/profiles/{profile_id}")
+async def get_profile(request: Request, profile_id: str, format: str = "json"):
+    """format=collapsed -> text collapsed stack, langsung bisa dikasih ke flamegraph.pl / speedscope."""
+    if not is_admin(request):
+        return JSONResponse({"status": "failed", "error": "forbidden"}, 403)
+    profile = _profiles.get(profile_id)
+    if profile is None:
+        return JSONResponse({"status": "failed", "error": "profile gak ada"}, 404)
+    if format == "collapsed":
+        return PlainTextResponse(profile["collapsed"])
+    return success(profile)
+
+# ------------------------
+# PREFETCH
+# ------------------------
+
+PREFETCH_ENABLED = env_bool("PREFETCH_ENABLED", False)
+PREFETCH_WARM_INTERVAL = env_float("PREFETCH_WARM_INTERVAL", 60.0)  # detik, 0 = gak ada warm loop
+PREFETCH_CONCURRENCY = env_int("PREFETCH_CONCURRENCY", 2)
+PREFETCH_RATE = env_float("PREFETCH_RATE", 1.0)  # fetch upstream per detik, <= 0 = prefetch mati
+PREFETCH_BURST = env_int("PREFETCH_BURST", 3)
+PREFETCH_QUEUE = env_int("PREFETCH_QUEUE", 100)
+
+PREFETCH_JOBS = Counter(
+    "samehadaku_prefetch_jobs_total",
+    "Job prefetch per jenis (warm/next) dan hasil (fetched/skipped/failed/dropped).",
+    labels=("kind", "result"),
+)
+
+class Prefetcher:
+    """
+    Prefetch di background: halaman panas (home, schedule, page 1
+    latest/ongoing/popular) dijaga tetep fresh tiap PREFETCH_WARM_INTERVAL,
+    dan pas page N / episode N kelayanan, page N+1 / episode next diambil
+    duluan. Semua lewat antrian yang dibatesin PREFETCH_CONCURRENCY worker
+    plus token bucket PREFETCH_RATE.
+    """
+
+    def __init__(self):
+        self.queue = None
+        self.queued = set()
+        self.tasks = []
+        self.tokens = float(PREFETCH_BURST)
+        self.refilled = time.monotonic()
+        self.stats = {"fetched": 0, "skipped": 0, "failed": 0, "dropped": 0}
+
+    def submit(self, route: str, url: str, extract, kind: str = "next", margin: float = 0.0):
+        """
+        Masukin job kalau entry-nya belum ada / sisa umurnya < `margin`
+        detik. Gak pernah nunggu: antrian penuh = job dibuang.
+        """
+        if self.queue is None or PREFETCHING.get():
+            return
+        key = f"{route}:{url}"
+        if key in self.queued or self._fresh(key, margin):
+            return
+        try:
+            self.queue.put_nowait((kind, key, route, url, extract, margin))
+        except asyncio.QueueFull:
+            self._count(kind, "dropped")
+            return
+        self.queued.add(key)
+
+    def submit_listing(self, name: str, page: int, kind: str = "next", margin: float = 0.0, **params):
+        url = LISTINGS[name]["url"](page, **params)
+        self.submit(name, url, listing_extractor(name, page, **params), kind, margin)
+
+    @staticmethod
+    def _fresh(key: str, margin: float) -> bool:
+        entry = RESPONSE_CACHE.get(key)
+        return entry is not None and entry.expires - time.monotonic() > margin
+
+    def _count(self, kind: str, result: str):
+        self.stats[result] += 1
+        PREFETCH_JOBS.inc(kind, result)
+
+    async def _take_token(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(PREFETCH_BURST, self.tokens + (now - self.refilled) * PREFETCH_RATE)
+            self.refilled = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / PREFETCH_RATE)
+
+    async def _worker(self):
+        PREFETCHING.set(True)
+        while True:
+            kind, key, route, url, extract, margin = await self.queue.get()
+            try:
+                if self._fresh(key, margin) or upstream_down(url):
+                    self._count(kind, "skipped")
+                    continue
+                await self._take_token()
+                entry = await PAGE_FLIGHTS.do(key, lambda: fill_page(key, route, url, extract, min_ttl=margin))
+                if entry is None:
+                    self._count(kind, "failed")
+                else:
+                    entry.prefetched = True
+                    self._count(kind, "fetched")
+            except Exception as e:
+                self._count(kind, "failed")
+                log.warning("Error prefetching %s: %s", url, e)
+            finally:
+                self.queued.discard(key)
+                self.queue.task_done()
+
+    def warm(self):
+        # refresh sebelum expired: sisa umur < satu putaran = ambil ulang
+        margin = PREFETCH_WARM_INTERVAL
+        self.submit("home", BASE_URL, extract_home, "warm", margin)
+        self.submit("schedule", f"{BASE_URL}/jadwal-rilis/", extract_schedule, "warm", margin)
+        for name in ("latest", "ongoing", "popular"):
+            self.submit_listing(name, 1, "warm", margin)
+
+    async def _warm_loop(self):
+        while True:
+            self.warm()
+            await asyncio.sleep(PREFETCH_WARM_INTERVAL)
+
+    def hit_rate(self):
+        hits = sum(PREFETCH_HITS.values.values())
+        return hits / self.stats["fetched"] if self.stats["fetched"] else 0.0
+
+    def summary(self):
+        return {
+            "enabled": self.queue is not None,
+            **self.stats,
+            "hits": sum(PREFETCH_HITS.values.values()),
+            "hitRate": round(self.hit_rate(), 3),
+            "queued": len(self.queued),
+        }
+
+    async def start(self):
+        if not PREFETCH_ENABLED:
+            return
+        if PREFETCH_RATE <= 0:
+            log.warning("PREFETCH_RATE=%s, prefetch dimatiin", PREFETCH_RATE)
+            return
+        self.queue = asyncio.Queue(PREFETCH_QUEUE)
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(max(PREFETCH_CONCURRENCY, 1))]
+        if PREFETCH_WARM_INTERVAL > 0:
+            self.tasks.append(asyncio.create_task(self._warm_loop()))
+
+    async def stop(self):
+        for t in self.tasks:
+            t.cancel()
+        self.tasks = []
+        self.queue = None
+        self.queued.clear()
+
+PREFETCHER = Prefetcher()
+
+Gauge("samehadaku_prefetch_hit_ratio", "Prefetch hit / entry yang di-prefetch.", lambda: {(): PREFETCHER.hit_rate()})
+
+STARTUP_HOOKS.append(PREFETCHER.start)
+SHUTDOWN_HOOKS.append(PREFETCHER.stop)
+
+# ------------------------
+# EPISODE FEED (SSE)
+# ------------------------
+
+FEED_POLL_INTERVAL = env_float("FEED_POLL_INTERVAL", 30.0)  # detik antar poll anime-terbaru
+FEED_BACKLOG = env_int("FEED_BACKLOG", 500)  # event yang disimpen buat resume (Last-Event-ID)
+FEED_HEARTBEAT = env_float("FEED_HEARTBEAT", 15.0)
+FEED_QUEUE = env_int("FEED_QUEUE", 100)  # antrian per subscriber; penuh = subscriber-nya diputus
+FEED_MAX_SUBSCRIBERS = env_int("FEED_MAX_SUBSCRIBERS", 1000)
+
+FEED_EVENTS = Counter("samehadaku_feed_events_total", "Event episode baru yang di-broadcast.")
+
+class FeedSubscriber:
+    __slots__ = ("queue", "anime_ids", "dropped")
+
+    def __init__(self, anime_ids):
+        self.queue = asyncio.Queue(FEED_QUEUE)
+        self.anime_ids = anime_ids  # set kosong = semua anime
+        self.dropped = False
+
+    def wants(self, event) -> bool:
+        return not self.anime_ids or event["animeId"] in self.anime_ids
+
+class EpisodeFeed:
+    """
+    Satu poller anime-terbaru buat semua client: tiap FEED_POLL_INTERVAL
+    halaman 1 di-scrape (sekalian nyegerin cache /latest), episode yang
+    belum pernah keliatan jadi event dan di-broadcast ke subscriber SSE.
+    Event disimpen di backlog biar client yang reconnect bisa lanjut
+    dari Last-Event-ID. Poller cuma jalan selama ada subscriber.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.backlog = deque(maxlen=FEED_BACKLOG)
+        self.seen = OrderedDict()  # episodeId yang udah pernah keliatan
+        self.last_id = 0
+        self.task = None
+        self.stats = {"polls": 0, "pollErrors": 0, "events": 0, "dropped": 0, "lastPoll": None}
+
+    def _next_id(self) -> int:
+        # berbasis waktu (ms) biar Last-Event-ID tetep masuk akal setelah restart
+        self.last_id = max(self.last_id + 1, int(time.time() * 1000))
+        return self.last_id
+
+    def diff(self, items):
+        """items dari parse_latest_item (terbaru di atas) -> event buat episode yang baru."""
+        first = not self.seen
+        fresh = []
+        for it in items:
+            slug = it["animeId"]
+            if slug not in self.seen:
+                fresh.append(it)
+            self.seen[slug] = True
+            self.seen.move_to_end(slug)
+        while len(self.seen) > max(FEED_BACKLOG, len(items) * 4):
+            self.seen.popitem(last=False)
+        if first:
+            # poll pertama cuma baseline, jangan nge-blast satu halaman penuh
+            return []
+        events = []
+        for it in reversed(fresh):
+            slug = it["animeId"]
+            events.append({
+                "id": self._next_id(),
+                "animeId": anime_id_from_episode(slug),
+                "episodeId": slug,
+                "episode": it.get("episodes"),
+                "title": it.get("title"),
+                "poster": it.get("poster"),
+                "releasedOn": it.get("releasedOn"),
+                "href": f"/samehadaku/episode/{slug}",
+                "samehadakuUrl": it.get("samehadakuUrl"),
+            })
+        return events
+
+    def publish(self, events):
+        for event in events:
+            self.backlog.append(event)
+            self.stats["events"] += 1
+            FEED_EVENTS.inc()
+            for sub in list(self.subscribers):
+                if not sub.wants(event):
+                    continue
+                try:
+                    sub.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # client kelambatan: putus aja, nanti reconnect pake Last-Event-ID
+                    sub.dropped = True
+                    self.stats["dropped"] += 1
+                    self.subscribers.discard(sub)
+
+    async def poll(self):
+        token = BYPASS_CACHE.set(True)
+        try:
+            entry = await load_listing_entry("latest", 1)
+        finally:
+            BYPASS_CACHE.reset(token)
+        self.stats["polls"] += 1
+        self.stats["lastPoll"] = time.time()
+        if entry is None:
+            self.stats["pollErrors"] += 1
+            return
+        self.publish(self.diff(entry.payload["data"]["animeList"]))
+
+    async def _loop(self):
+        while self.subscribers:
+            try:
+                await self.poll()
+            except Exception as e:
+                self.stats["pollErrors"] += 1
+                log.warning("Error polling episode feed: %s", e)
+            await asyncio.sleep(FEED_POLL_INTERVAL)
+
+    def replay(self, last_id: int, sub: FeedSubscriber):
+        return [e for e in self.backlog if e["id"] > last_id and sub.wants(e)]
+
+    def subscribe(self, anime_ids) -> FeedSubscriber:
+        sub = FeedSubscriber(anime_ids)
+        self.subscribers.add(sub)
+        if FEED_POLL_INTERVAL > 0 and (self.task is None or self.task.done()):
+            self.task = asyncio.create_task(self._loop())
+        return sub
+
+    def unsubscribe(self, sub: FeedSubscriber):
+        self.subscribers.discard(sub)
+
+    def summary(self):
+        return {
+            **self.stats,
+            "subscribers": len(self.subscribers),
+            "backlog": len(self.backlog),
+            "polling": self.task is not None and not self.task.done(),
+        }
+
+    async def stop(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+        self.subscribers.clear()
+
+EPISODE_FEED = EpisodeFeed()
+
+Gauge("samehadaku_feed_subscribers", "Client SSE yang lagi nyambung.", lambda: {(): len(EPISODE_FEED.subscribers)})
+
+SHUTDOWN_HOOKS.append(EPISODE_FEED.stop)
+
+def sse_event(event) -> bytes:
+    return b"id: %d\nevent: episode\ndata: %s\n\n" % (event["id"], render_json(event))
+
+async def stream_feed(request: Request, sub: FeedSubscriber, backlog):
+    try:
+        yield b"retry: 5000\n\n"
+        for event in backlog:
+            yield sse_event(event)
+        while not sub.dropped:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), FEED_HEARTBEAT)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": ping\n\n"
+                continue
+            yield sse_event(event)
+    finally:
+        EPISODE_FEED.unsubscribe(sub)
+
+@app.get("/anime/samehadaku/feed")
+async def episode_feed(request: Request, anime: str = "", last_event_id: int = Query(None, alias="lastEventId")):
+    """
+    Server-Sent Events episode baru: ?anime=id1,id2 buat filter per anime.
+    Reconnect bawa header Last-Event-ID (atau ?lastEventId=) biar event
+    yang kelewat dikirim ulang dari backlog.
+    """
+    if len(EPISODE_FEED.subscribers) >= FEED_MAX_SUBSCRIBERS:
+        return JSONResponse({"status": "failed", "error": "too many subscribers"}, 503)
+    header = request.headers.get("last-event-id", "")
+    if last_event_id is None and header.isdigit():
+        last_event_id = int(header)
+    sub = EPISODE_FEED.subscribe(set(split_ids(anime)))
+    backlog = EPISODE_FEED.replay(last_event_id, sub) if last_event_id is not None else []
+    return StreamingResponse(
+        stream_feed(request, sub, backlog),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# ------------------------
+# WARM SNAPSHOT
+# ------------------------
+
+# file JSON (dibundel pas deploy) isinya body home/schedule yang udah jadi;
+# kosong / file gak ada = gak dipake
+WARM_SNAPSHOT = os.getenv("WARM_SNAPSHOT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "warm-snapshot.json"))
+WARM_SNAPSHOT_ROUTES = ("home", "schedule")
+WARM_SNAPSHOT_MAX_AGE = env_float("WARM_SNAPSHOT_MAX_AGE", 6 * 3600)  # lebih tua dari ini gak dipake
+
+def save_warm_snapshot(path: str = WARM_SNAPSHOT) -> int:
+    """Tulis entry home/schedule yang ada di cache ke `path` (atomic)."""
+    entries = [
+        {"key": key, "route": e.route, "etag": e.etag, "body": e.body.decode("utf-8")}
+        for key, e in RESPONSE_CACHE.entries.items()
+        if e.route in WARM_SNAPSHOT_ROUTES and "#fields=" not in key
+    ]
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"savedAt": time.time(), "baseUrl": BASE_URL, "entries": entries}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return len(entries)
+
+def load_warm_snapshot(path: str = WARM_SNAPSHOT) -> int:
+    """
+    Isi RESPONSE_CACHE dari snapshot. Entry-nya langsung dianggap stale:
+    request pertama dapet body snapshot tanpa nunggu scrape (dan tanpa
+    import bs4), refresh-nya jalan di background lewat stale-while-revalidate.
+    """
+    if not path or not CACHE_ENABLED or not os.path.exists(path):
+        return 0
+    try:
+        with open(path, encoding="utf-8") as f:
+            snap = json.load(f)
+    except (OSError, ValueError) as e:
+        log.warning("Warm snapshot %s gak kebaca: %s", path, e)
+        return 0
+    age = time.time() - snap.get("savedAt", 0)
+    if age > WARM_SNAPSHOT_MAX_AGE or snap.get("baseUrl") != BASE_URL:
+        log.info("Warm snapshot %s dilewatin (umur %.0f s, baseUrl %s)", path, age, snap.get("baseUrl"))
+        return 0
+    loaded = 0
+    for item in snap.get("entries", []):
+        if item["key"] in RESPONSE_CACHE.entries:
+            continue
+        entry = CacheEntry.restore(item["route"], item["body"].encode("utf-8"), item["etag"], 0, WARM_SNAPSHOT_MAX_AGE - age)
+        RESPONSE_CACHE.put(item["key"], entry)
+        loaded += 1
+    log.info("Warm snapshot: %d entry dari %s (umur %.0f s)", loaded, path, age)
+    return loaded
+
+async def load_warm_snapshot_hook():
+    load_warm_snapshot()
+
+# paling depan: snapshot udah masuk sebelum hook lain (prefetch, feed) jalan
+STARTUP_HOOKS.insert(0, load_warm_snapshot_hook)
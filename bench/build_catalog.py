@@ -0,0 +1,23 @@
+"""
+Bangun ulang katalog SQLite dari fixture, tanpa network.
+
+    python bench/build_catalog.py /tmp/catalog.sqlite3
+"""
+import os
+import sys
+
+from fixtures import api, load_html
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "catalog.sqlite3"
+    if os.path.exists(path):
+        os.remove(path)
+    catalog = api.Catalog(path)
+    catalog.ingest_listing_html(load_html("daftar-anime-2.html"), "ongoing")
+    catalog.upsert_genres(api.extract_genres(api.make_soup(load_html("home.html"), route="genres"))["data"]["genreList"])
+    catalog.ingest_listing_html(load_html("genre.html"), "genre", "action")
+    print(f"{catalog.count()} anime -> {path}")
+    catalog.close()
+
+if __name__ == "__main__":
+    main()
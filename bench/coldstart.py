@@ -0,0 +1,144 @@
+"""
+Cold start: tiap skenario jalan di proses baru (kayak instance serverless
+yang baru bangun), diukur import api.index, startup (lifespan), dan request
+pertama /home + /schedule. Upstream-nya server lokal yang ngelayanin fixture.
+
+    python bench/coldstart.py [--runs 5] [--latency 150] [--top 12]
+    python bench/coldstart.py --save-snapshot api/warm-snapshot.json
+
+Skenario:
+  scrape    tanpa snapshot, request pertama nunggu fetch + parse
+  snapshot  WARM_SNAPSHOT dari fixture, request pertama dari cache
+
+Plus breakdown `python -X importtime` (cumulative) buat modul paling berat.
+--save-snapshot: ambil home/schedule dari upstream beneran terus tulis
+snapshot-nya (jalanin pas build/deploy).
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+PATHS = ["/anime/samehadaku/home", "/anime/samehadaku/schedule"]
+
+async def worker(base_url: str):
+    started = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    import api.index as api
+
+    imported = time.perf_counter()
+    import httpx
+
+    api.BASE_URL = base_url
+    api.MIRRORS.mirrors = []
+    timings = {"import": imported - started}
+    async with api.lifespan(api.app):
+        timings["startup"] = time.perf_counter() - imported
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            t0 = time.perf_counter()
+            for path in PATHS:
+                resp = await client.get(path)
+                assert resp.status_code == 200, (path, resp.status_code)
+            timings["first"] = time.perf_counter() - t0
+            timings["bs4"] = "bs4" in sys.modules
+            # refresh SWR dari snapshot jangan sampe kepotong shutdown
+            await asyncio.gather(*api._refresh_tasks.values(), return_exceptions=True)
+    timings["total"] = time.perf_counter() - started
+    print(json.dumps(timings))
+
+async def save_snapshot(path: str):
+    sys.path.insert(0, ROOT)
+    import api.index as api
+
+    await api.load_page("home", api.BASE_URL, api.extract_home)
+    await api.load_page("schedule", f"{api.BASE_URL}/jadwal-rilis/", api.extract_schedule)
+    n = api.save_warm_snapshot(path)
+    await api.close_client()
+    print(f"{n} entry -> {path}")
+
+def run_worker(base_url: str, env):
+    out = subprocess.run(
+        [sys.executable, __file__, "--worker", base_url], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def import_breakdown(top: int):
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.index"], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cum_us), int(self_us), depth, name.strip()))
+    total = next(cum for cum, _, _, name in rows if name == "api.index")
+    print(f"\nimport api.index: {total / 1000:.1f} ms (cumulative, -X importtime)")
+    print(f"{'modul':<28} {'cum ms':>8} {'self ms':>8}")
+    for cum, self_us, depth, name in sorted((r for r in rows if r[2] <= 1), reverse=True)[:top]:
+        print(f"{name:<28} {cum / 1000:>8.1f} {self_us / 1000:>8.1f}")
+    parse_stack = [name for _, _, _, name in rows if name.split(".")[0] in ("bs4", "lxml")]
+    print(f"parse stack ke-import pas startup: {'ya' if parse_stack else 'nggak'}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--latency", type=int, default=150, help="latency upstream lokal (ms)")
+    ap.add_argument("--top", type=int, default=12)
+    ap.add_argument("--save-snapshot", metavar="PATH")
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        asyncio.run(worker(args.worker))
+        return 0
+    if args.save_snapshot:
+        asyncio.run(save_snapshot(args.save_snapshot))
+        return 0
+
+    sys.path.insert(0, HERE)
+    from mirrors import start_standin
+
+    import api.index as api
+
+    server = start_standin(args.latency / 1000)
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, "warm-snapshot.json")
+        api.BASE_URL = server.origin
+        api.MIRRORS.mirrors = []
+        asyncio.run(save_snapshot(snapshot))
+
+        base_env = {
+            **os.environ,
+            "CATALOG_DB": os.path.join(tmp, "catalog.sqlite3"),
+            "CATALOG_CRAWL_INTERVAL": "0",
+            "CATALOG_REFRESH_INTERVAL": "0",
+        }
+        scenarios = {
+            "scrape": {**base_env, "WARM_SNAPSHOT": ""},
+            "snapshot": {**base_env, "WARM_SNAPSHOT": snapshot},
+        }
+        print(f"\n{'skenario':<10} {'import ms':>10} {'startup ms':>11} {'first ms':>9} {'total ms':>9}  bs4")
+        for name, env in scenarios.items():
+            runs = [run_worker(server.origin, env) for _ in range(args.runs)]
+            med = {k: statistics.median(r[k] for r in runs) * 1000 for k in ("import", "startup", "first", "total")}
+            print(
+                f"{name:<10} {med['import']:>10.1f} {med['startup']:>11.1f} {med['first']:>9.1f} {med['total']:>9.1f}"
+                f"  {'ya' if runs[0]['bs4'] else 'nggak'}"
+            )
+    server.shutdown()
+    import_breakdown(args.top)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,41 @@
+"""
+Daftar fixture HTML (snapshot halaman Samehadaku) + extractor yang dipake
+buat halaman itu. Dipake bareng sama benchmark dan tests/test_parity.py.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT, "bench", "fixtures")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import api.index as api  # noqa: E402
+
+def pages_for(mod):
+    """nama -> (file, route, extract(soup)) buat modul api `mod` (bisa revisi lama, lihat run.py --against)."""
+    return {
+        "home": ("home.html", "home", mod.extract_home),
+        "genres": ("home.html", "genres", mod.extract_genres),
+        "latest": ("anime-terbaru.html", "latest", lambda soup: mod.extract_latest(soup, 2)),
+        "library": ("daftar-anime-2.html", "ongoing", lambda soup: mod.extract_library(soup, 1, "Ongoing")),
+        "genre": ("genre.html", "genre", lambda soup: mod.extract_library(soup, 3)),
+        "schedule": ("jadwal-rilis.html", "schedule", mod.extract_schedule),
+        "anime": ("anime-detail.html", "anime", mod.extract_anime_detail),
+        "anime-long": ("anime-detail-long.html", "anime", mod.extract_anime_detail),
+        "episode": ("episode.html", "episode", mod.extract_episode_detail),
+    }
+
+PAGES = pages_for(api)
+
+_html_cache = {}
+
+def load_html(filename: str) -> str:
+    if filename not in _html_cache:
+        with open(os.path.join(FIXTURE_DIR, filename), encoding="utf-8") as f:
+            _html_cache[filename] = f.read()
+    return _html_cache[filename]
+
+def available_backends():
+    return [name for name in api.PARSER_BACKENDS if api.resolve_parser_backend(name) == name]
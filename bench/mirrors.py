@@ -0,0 +1,110 @@
+"""
+Simulasi mirror pool pake server lokal (stand-in) yang ngelayanin fixture
+dengan latency yang disuntik. Ngecek mirror yang kepilih, failover pas
+mirror tercepat mati, dan semua samehadakuUrl tetep pake BASE_URL.
+
+    python bench/mirrors.py [--latency 300,30,120]
+
+Server pertama jadi BASE_URL (kanonik), sisanya UPSTREAM_MIRRORS.
+"""
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fixtures import api, load_html
+
+CANONICAL = "https://v1.samehadaku.how"
+
+# path -> fixture
+ROUTES = [
+    ("/jadwal-rilis/", "jadwal-rilis.html"),
+    ("/anime-terbaru/", "anime-terbaru.html"),
+    ("/daftar-anime-2/", "daftar-anime-2.html"),
+    ("/genre/", "genre.html"),
+    ("/anime/", "anime-detail.html"),
+    ("/", "home.html"),
+]
+
+def start_standin(latency: float):
+    """Server yang pura-pura jadi satu mirror: HTML-nya pake origin dia sendiri."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            filename = next(f for prefix, f in ROUTES if self.path.startswith(prefix))
+            body = load_html(filename).replace(CANONICAL, self.server.origin).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.origin = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def urls_in(obj):
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            if k == "samehadakuUrl" and isinstance(v, str):
+                yield v
+            else:
+                yield from urls_in(v)
+    elif isinstance(obj, list):
+        for v in obj:
+            yield from urls_in(v)
+
+async def fetch_pages(label):
+    api.RESPONSE_CACHE.clear()
+    started = time.perf_counter()
+    pages = [
+        await api.load_page("schedule", f"{api.BASE_URL}/jadwal-rilis/", api.extract_schedule),
+        await api.load_listing("latest", 1),
+        await api.load_page("anime", api.anime_detail_url("soul-land-2"), api.extract_anime_detail),
+    ]
+    elapsed = (time.perf_counter() - started) * 1000
+    urls = [u for p in pages for u in urls_in(p)]
+    foreign = [u for u in urls if u.startswith("http") and not u.startswith(api.BASE_URL)]
+    print(
+        f"{label:<22} aktif={api.MIRRORS.pick():<24} {elapsed:>7.0f} ms"
+        f"  samehadakuUrl={len(urls)}  bukan BASE_URL={len(foreign)}"
+    )
+    return not foreign and all(pages)
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency", default="300,30,120", help="latency (ms) per server, yang pertama = BASE_URL")
+    args = ap.parse_args()
+
+    servers = [start_standin(int(ms) / 1000) for ms in args.latency.split(",")]
+    api.BASE_URL = servers[0].origin
+    api.MIRRORS.mirrors = [s.origin for s in servers[1:]]
+    for s, ms in zip(servers, args.latency.split(",")):
+        print(f"{s.origin}  {ms} ms{'  (BASE_URL)' if s is servers[0] else ''}")
+
+    ok = await fetch_pages("sebelum probe")
+    await api.MIRRORS.probe_all()
+    for origin, st in api.MIRRORS.stats()["origins"].items():
+        print(f"  probe {origin}: {st}")
+    ok &= await fetch_pages("setelah probe")
+
+    # mirror tercepat mati: retry pindah mirror, probe berikutnya nandain gak sehat
+    fastest = api.MIRRORS.pick()
+    next(s for s in servers if s.origin == fastest).shutdown()
+    next(s for s in servers if s.origin == fastest).server_close()
+    ok &= await fetch_pages("mirror tercepat mati")
+    await api.MIRRORS.probe_all()
+    ok &= await fetch_pages("setelah probe ulang")
+
+    await api.close_client()
+    print("ok" if ok else "GAGAL")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
@@ -0,0 +1,271 @@
+"""
+Benchmark parser offline pake fixture di bench/fixtures (tanpa network).
+
+    python bench/run.py                    # jalanin + bandingin alokasi sama baseline
+    python bench/run.py --against HEAD~1   # plus A/B waktu lawan revisi lain, satu proses
+    python bench/run.py --update-baseline  # simpen alokasi sebagai baseline baru
+    python bench/run.py --json out.json    # simpen hasil mentah
+
+Yang diukur:
+- per parser (parse_latest_item, parse_library_item, parse_schedule_card,
+  build_day_target_map, get_pagination, parse_genre_list): throughput dan
+  peak alokasi, di atas soup yang udah jadi (murni biaya parser-nya)
+- per halaman: latency make_soup + extract (p50/p95/p99) dan peak alokasi
+
+baseline.json cuma nyimpen alokasi (peak KiB): angka waktu absolut beda
+tiap mesin dan di runner yang sama aja bisa goyang +-80% antar run, jadi
+gak bisa dijadiin gate. Waktu dibandingin relatif pake --against REV:
+api/index.py dari revisi itu di-import di proses yang sama, terus tiap
+kasus dijalanin gantian lama/baru biar noise mesin kena dua-duanya.
+Exit code 1 kalau alokasi lewat toleransi dari baseline, atau (pake
+--against) waktunya lebih lambat dari revisi itu lewat toleransi.
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from fixtures import PAGES, ROOT, api, load_html, pages_for
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+def peak_kib(fn):
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+def timed_rounds(fn, rounds):
+    fn()  # warmup
+    gc.collect()
+    out = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - t0)
+    return out
+
+def soup_of(filename, backend, mod=api):
+    return mod.make_soup(load_html(filename), backend)
+
+def parser_cases(backend, mod=api):
+    """nama parser -> (list input, fungsi per input)"""
+    latest_nodes = []
+    for f in ("home.html", "anime-terbaru.html"):
+        latest_nodes += soup_of(f, backend, mod).select(".post-show li")
+
+    library_nodes = []
+    for f in ("daftar-anime-2.html", "genre.html"):
+        library_nodes += soup_of(f, backend, mod).select(".animepost")
+
+    schedule = soup_of("jadwal-rilis.html", backend, mod)
+    content = schedule.find("div", class_="entry-content") or schedule
+    schedule_links = [a for a in content.find_all("a", href=True) if "/anime/" in a["href"]]
+    schedule_index = mod.ScheduleIndex(content)
+
+    paginated = [soup_of(f, backend, mod) for f in ("anime-terbaru.html", "daftar-anime-2.html", "genre.html")]
+    genre_nodes = [soup_of("anime-detail.html", backend, mod).find("div", class_="genre-info")] + library_nodes
+
+    return {
+        "parse_latest_item": (latest_nodes, mod.parse_latest_item),
+        "parse_library_item": (library_nodes, mod.parse_library_item),
+        "parse_schedule_card": (schedule_links, lambda a: mod.parse_schedule_card(a, schedule_index)),
+        "build_day_target_map": ([content], mod.build_day_target_map),
+        "get_pagination": (paginated, lambda s: mod.get_pagination(s, 1)),
+        "parse_genre_list": (genre_nodes, mod.parse_genre_list),
+    }
+
+def bench_parsers(backend, rounds):
+    res = {}
+    for name, (items, fn) in parser_cases(backend).items():
+        def run():
+            for it in items:
+                fn(it)
+        # min: paling tahan noise mesin buat dibandingin ke baseline
+        per_pass = min(timed_rounds(run, rounds))
+        res[name] = {
+            "items": len(items),
+            "us_per_item": round(per_pass / max(len(items), 1) * 1e6, 2),
+            "items_per_sec": round(len(items) / per_pass) if per_pass else 0,
+            "peak_kib": peak_kib(run),
+        }
+    return res
+
+def bench_pages(backend, rounds):
+    res = {}
+    for name, (filename, route, extract) in PAGES.items():
+        html = load_html(filename)
+
+        def run():
+            extract(api.make_soup(html, backend, route))
+
+        times = [t * 1000 for t in timed_rounds(run, rounds)]
+        res[name] = {
+            "bytes": len(html.encode()),
+            "min_ms": round(min(times), 3),
+            "p50_ms": round(percentile(times, 50), 3),
+            "p95_ms": round(percentile(times, 95), 3),
+            "p99_ms": round(percentile(times, 99), 3),
+            "peak_kib": peak_kib(run),
+        }
+    return res
+
+# yang disimpen di baseline.json dan dibandingin: alokasi doang (stabil antar mesin)
+BASELINE_KEYS = ("items", "bytes", "peak_kib")
+
+def baseline_of(result):
+    return {
+        "backend": result["backend"],
+        **{section: {name: {k: row[k] for k in BASELINE_KEYS if k in row} for name, row in result[section].items()}
+           for section in ("parsers", "pages")},
+    }
+
+def compare(result, baseline, mem_tol):
+    regressions = []
+    if baseline.get("backend") != result["backend"]:
+        print(f"! baseline pake backend {baseline.get('backend')}, sekarang {result['backend']}")
+    for section in ("parsers", "pages"):
+        for name, row in result[section].items():
+            base = (baseline.get(section, {}).get(name) or {}).get("peak_kib")
+            now = row.get("peak_kib")
+            if base and now is not None and now > base * (1 + mem_tol):
+                regressions.append(f"{section}.{name}.peak_kib: {base} -> {now} (+{now / base - 1:.0%})")
+    return regressions
+
+def load_api_at(rev: str):
+    """api/index.py dari revisi git `rev`, di-import sebagai modul terpisah di proses ini."""
+    src = subprocess.run(
+        ["git", "show", f"{rev}:api/index.py"], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "api_against.py")
+        with open(path, "w") as f:
+            f.write(src)
+        spec = importlib.util.spec_from_file_location("api_against", path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+    return mod
+
+def ab_min(fn_old, fn_new, rounds):
+    """Lama/baru gantian (urutannya dibalik tiap ronde); balikin (min lama, min baru)."""
+    fn_old()
+    fn_new()
+    gc.collect()
+    old, new = [], []
+    for i in range(rounds):
+        pair = [(fn_old, old), (fn_new, new)]
+        for fn, out in (pair if i % 2 == 0 else pair[::-1]):
+            t0 = time.perf_counter()
+            fn()
+            out.append(time.perf_counter() - t0)
+    return min(old), min(new)
+
+def compare_against(rev: str, backend: str, rounds: int, time_tol: float):
+    """A/B waktu per halaman (dan per parser kalau revisi itu punya semuanya) lawan revisi `rev`."""
+    old = load_api_at(rev)
+    cases = {}
+    old_pages = pages_for(old)
+    for name, (filename, route, extract) in PAGES.items():
+        html = load_html(filename)
+        _, _, old_extract = old_pages[name]
+        cases[f"page {name}"] = (
+            lambda e=old_extract, h=html, r=route: e(old.make_soup(h, backend, r)),
+            lambda e=extract, h=html, r=route: e(api.make_soup(h, backend, r)),
+        )
+    try:
+        old_parsers = parser_cases(backend, old)
+    except AttributeError as e:
+        print(f"! parser di {rev} gak lengkap ({e}), cuma halaman yang dibandingin")
+        old_parsers = {}
+    for name, (items, fn) in parser_cases(backend).items():
+        if name in old_parsers:
+            old_items, old_fn = old_parsers[name]
+            cases[name] = (
+                lambda xs=old_items, f=old_fn: [f(x) for x in xs],
+                lambda xs=items, f=fn: [f(x) for x in xs],
+            )
+
+    print(f"\nA/B lawan {rev} (min dari {rounds} ronde gantian, satu proses)")
+    print(f"{'kasus':<24} {rev + ' ms':>12} {'sekarang ms':>12} {'beda':>7}")
+    regressions = []
+    for name, (fn_old, fn_new) in cases.items():
+        t_old, t_new = ab_min(fn_old, fn_new, rounds)
+        ratio = t_new / t_old if t_old else 1.0
+        print(f"{name:<24} {t_old * 1000:>12.2f} {t_new * 1000:>12.2f} {ratio - 1:>+7.0%}")
+        if ratio > 1 + time_tol:
+            regressions.append(f"{name}: {t_old * 1000:.2f} -> {t_new * 1000:.2f} ms (+{ratio - 1:.0%} vs {rev})")
+    return regressions
+
+def print_report(result):
+    print(f"backend: {result['backend']}")
+    print(f"\n{'parser':<22} {'items':>6} {'us/item':>9} {'items/s':>10} {'peak KiB':>9}")
+    for name, r in result["parsers"].items():
+        print(f"{name:<22} {r['items']:>6} {r['us_per_item']:>9.2f} {r['items_per_sec']:>10} {r['peak_kib']:>9.1f}")
+    print(f"\n{'page':<12} {'KiB':>6} {'min ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KiB':>9}")
+    for name, r in result["pages"].items():
+        print(
+            f"{name:<12} {r['bytes'] / 1024:>6.0f} {r['min_ms']:>9.2f} {r['p50_ms']:>9.2f}"
+            f" {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['peak_kib']:>9.1f}"
+        )
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backend", default=api.ACTIVE_PARSER)
+    ap.add_argument("--rounds", type=int, default=20)
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--against", metavar="REV", help="A/B waktu lawan api/index.py di revisi git ini")
+    ap.add_argument("--time-tolerance", type=float, default=0.25)
+    ap.add_argument("--mem-tolerance", type=float, default=0.10)
+    ap.add_argument("--json", help="tulis hasil mentah ke file ini")
+    args = ap.parse_args()
+
+    result = {
+        "backend": args.backend,
+        "rounds": args.rounds,
+        "parsers": bench_parsers(args.backend, args.rounds),
+        "pages": bench_pages(args.backend, args.rounds),
+    }
+    print_report(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(baseline_of(result), f, indent=2)
+            f.write("\n")
+        print(f"\nbaseline disimpen ke {args.baseline}")
+        return
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions += compare(result, json.load(f), args.mem_tolerance)
+    else:
+        print("\nbelum ada baseline alokasi, jalanin pake --update-baseline dulu")
+    if args.against:
+        regressions += compare_against(args.against, args.backend, args.rounds, args.time_tolerance)
+    if regressions:
+        print("\nREGRESI:")
+        for r in regressions:
+            print(f"  {r}")
+        sys.exit(1)
+    print("\nok, gak ada regresi")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Latency lookup SEARCH_INDEX (autocomplete): index diisi dari fixture
+listing + detail, terus tiap judul dicari pake prefix, judul utuh, dan
+judul yang di-typo. Target p99 di bawah 1 ms.
+
+    python bench/search.py [--rounds 50]
+"""
+import argparse
+import statistics
+import time
+
+from fixtures import PAGES, api, load_html
+
+def queries(title: str):
+    t = title.lower()
+    yield "prefix", t[:4]
+    yield "full", t
+    # satu huruf ketuker di tengah judul
+    mid = len(t) // 2
+    yield "typo", t[:mid] + t[mid + 1:mid + 2] + t[mid] + t[mid + 2:]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=50)
+    args = ap.parse_args()
+
+    index = api.SEARCH_INDEX
+    for name, (filename, _route, extract) in PAGES.items():
+        payload = extract(api.make_soup(load_html(filename)))
+        if name.startswith("anime"):
+            api.index_anime_detail(name, payload)
+        else:
+            api.index_listing(payload)
+    print(index.summary())
+
+    times = {}
+    found = {}
+    for doc in list(index.docs.values()):
+        for kind, q in queries(doc["title"]):
+            for _ in range(args.rounds):
+                t0 = time.perf_counter()
+                results = index.lookup(q)
+                times.setdefault(kind, []).append(time.perf_counter() - t0)
+            hit = any(r["animeId"] == doc["animeId"] for r in results)
+            found[kind] = found.get(kind, 0) + hit
+
+    print(f"{'query':<8} {'p50 us':>8} {'p99 us':>8} {'found':>10}")
+    ok = True
+    for kind, ts in times.items():
+        ts.sort()
+        p99 = ts[int(len(ts) * 0.99)] * 1e6
+        ok &= p99 < 1000
+        print(f"{kind:<8} {statistics.median(ts) * 1e6:>8.1f} {p99:>8.1f} {found[kind]:>5}/{len(index.docs)}")
+    print("ok" if ok else "LAMBAT (p99 >= 1 ms)")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,48 @@
+"""
+Micro-benchmark serialize response: path lama (JSONResponse stdlib),
+render_json (orjson kalau ada), dan body yang udah di-serialize di
+CacheEntry (cache hit). Payload diambil dari fixture asli.
+
+    python bench/serialize.py [--rounds 200]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from fastapi.responses import JSONResponse as StdJSONResponse
+
+from fixtures import PAGES, api, load_html
+
+def timeit(fn, rounds):
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1e6
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=200)
+    args = ap.parse_args()
+
+    print(f"render_json: {'orjson' if api.USE_ORJSON else 'json (stdlib)'}")
+    print(f"{'page':<12} {'KiB':>7} {'stdlib us':>10} {'fast us':>9} {'speedup':>8} {'cached us':>10}  same")
+    for name, (filename, _route, extract) in PAGES.items():
+        payload = extract(api.make_soup(load_html(filename)))
+        entry = api.CacheEntry(name, payload)
+
+        std_us = timeit(lambda: StdJSONResponse(payload), args.rounds)
+        fast_us = timeit(lambda: api.JSONResponse(payload), args.rounds)
+        cached_us = timeit(lambda: api.Response(entry.body, media_type="application/json"), args.rounds)
+
+        std_body = StdJSONResponse(payload).body
+        same = "bytes" if std_body == entry.body else ("json" if json.loads(std_body) == json.loads(entry.body) else "DIFF")
+        print(
+            f"{name:<12} {len(entry.body) / 1024:>7.1f} {std_us:>10.1f} {fast_us:>9.1f}"
+            f" {std_us / fast_us:>7.1f}x {cached_us:>10.1f}  {same}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Simulasi beberapa worker (proses terpisah) yang pake `SHARED_CACHE_DB` yang
+sama, nembak server lokal yang ngelayanin fixture. Ngecek berapa request
+yang beneran sampe ke upstream (idealnya sekali per halaman, bukan sekali
+per worker) dan ETag-nya sama di semua worker.
+
+    python bench/shared_cache.py [--workers 4] [--latency 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+ROUTES = [
+    ("/jadwal-rilis/", "jadwal-rilis.html"),
+    ("/anime-terbaru/", "anime-terbaru.html"),
+    ("/anime/", "anime-detail.html"),
+]
+
+def start_upstream(latency: float):
+    from fixtures import load_html
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.server.hits += 1
+            time.sleep(latency)
+            filename = next(f for prefix, f in ROUTES if self.path.startswith(prefix))
+            body = load_html(filename).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.hits = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+async def worker(base_url: str):
+    from fixtures import api
+
+    api.BASE_URL = base_url
+    api.MIRRORS.mirrors = []
+    pages = {
+        "schedule": await api.load_entry("schedule", f"{base_url}/jadwal-rilis/", api.extract_schedule),
+        "latest": await api.load_listing_entry("latest", 1),
+        "anime": await api.load_entry("anime", api.anime_detail_url("soul-land-2"), api.extract_anime_detail),
+    }
+    await api.close_client()
+    print(json.dumps({
+        "etags": {name: entry.etag if entry else None for name, entry in pages.items()},
+        "stats": api.SHARED_CACHE.stats,
+    }))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--latency", type=int, default=200, help="latency upstream (ms)")
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        asyncio.run(worker(args.worker))
+        return 0
+
+    server = start_upstream(args.latency / 1000)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "SHARED_CACHE_DB": os.path.join(tmp, "shared.db"),
+            "CATALOG_CRAWL_INTERVAL": "0",
+            "CATALOG_REFRESH_INTERVAL": "0",
+        }
+        started = time.perf_counter()
+        procs = [
+            subprocess.Popen([sys.executable, __file__, "--worker", base_url], env=env, stdout=subprocess.PIPE, text=True)
+            for _ in range(args.workers)
+        ]
+        results = [json.loads(p.communicate()[0].strip().splitlines()[-1]) for p in procs]
+        elapsed = time.perf_counter() - started
+
+    for i, r in enumerate(results):
+        print(f"worker {i}: {r['stats']}")
+    etags = {json.dumps(r["etags"], sort_keys=True) for r in results}
+    print(f"{args.workers} worker x {len(ROUTES)} halaman -> {server.hits} request upstream ({elapsed:.1f} s)")
+    ok = len(etags) == 1 and None not in results[0]["etags"].values() and server.hits == len(ROUTES)
+    print("ETag sama di semua worker" if len(etags) == 1 else "ETag BEDA antar worker")
+    print("ok" if ok else "GAGAL")
+    server.shutdown()
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.path.insert(0, HERE)
+    raise SystemExit(main())
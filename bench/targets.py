@@ -0,0 +1,48 @@
+"""
+Bandingin parse full vs parse pake target per route (PARSE_TARGETS):
+waktu parse+extract (median) dan peak alokasi (tracemalloc) per halaman.
+
+    python bench/targets.py [--backend lxml] [--rounds 30]
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from fixtures import PAGES, api, load_html
+
+def measure(html, backend, route, extract, rounds):
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        extract(api.make_soup(html, backend, route))
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    soup = api.make_soup(html, backend, route)
+    extract(soup)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times) * 1000, peak / 1024
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backend", default=api.ACTIVE_PARSER)
+    ap.add_argument("--rounds", type=int, default=30)
+    args = ap.parse_args()
+
+    print(f"backend: {args.backend}")
+    print(f"{'page':<12} {'full ms':>9} {'target ms':>10} {'cpu':>7}   {'full KiB':>9} {'target KiB':>11} {'mem':>7}")
+    for name, (filename, route, extract) in PAGES.items():
+        if route not in api.PARSE_TARGETS:
+            continue
+        html = load_html(filename)
+        full_ms, full_kb = measure(html, args.backend, None, extract, args.rounds)
+        tgt_ms, tgt_kb = measure(html, args.backend, route, extract, args.rounds)
+        print(
+            f"{name:<12} {full_ms:>9.2f} {tgt_ms:>10.2f} {1 - tgt_ms / full_ms:>7.0%}"
+            f"   {full_kb:>9.0f} {tgt_kb:>11.0f} {1 - tgt_kb / full_kb:>7.0%}"
+        )
+
+if __name__ == "__main__":
+    main()
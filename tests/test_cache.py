@@ -0,0 +1,149 @@
+"""
+Response cache lewat app beneran (ASGITransport), upstream-nya
+httpx.MockTransport yang ngelayanin fixture dari bench/fixtures.
+
+    python -m pytest -q tests
+"""
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import api.index as api  # noqa: E402
+
+def load_html(filename: str) -> str:
+    with open(os.path.join(ROOT, "bench", "fixtures", filename), encoding="utf-8") as f:
+        return f.read()
+
+LATEST_HTML = load_html("anime-terbaru.html")
+SEARCH_HTML = load_html("daftar-anime-2.html")
+
+@pytest.fixture(autouse=True)
+def clean_cache(monkeypatch):
+    monkeypatch.setattr(api, "BASE_URL", "https://upstream.test")
+    monkeypatch.setattr(api, "SHARED_CACHE", None)
+    monkeypatch.setattr(api.MIRRORS, "mirrors", [])
+    monkeypatch.setattr(api.RESPONSE_CACHE, "stats", dict.fromkeys(api.RESPONSE_CACHE.stats, 0))
+    api.RESPONSE_CACHE.clear()
+    api._hosts.clear()
+    yield
+    api.RESPONSE_CACHE.clear()
+    api._hosts.clear()
+    api._client = None
+
+class Upstream:
+    """Handler MockTransport: fixture per path, plus nyatet path yang diminta."""
+
+    def __init__(self):
+        self.paths = []
+
+    def __call__(self, request):
+        self.paths.append(request.url.path)
+        html = SEARCH_HTML if request.url.params.get("s") else LATEST_HTML
+        return httpx.Response(200, text=html, headers={"Content-Type": "text/html; charset=utf-8"})
+
+def run(upstream, scenario):
+    """Jalanin scenario(client) ke app, fetch upstream-nya dilayanin `upstream`."""
+
+    async def main():
+        api._client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+        transport = httpx.ASGITransport(app=api.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await scenario(client)
+        finally:
+            await asyncio.gather(*api._refresh_tasks.values(), return_exceptions=True)
+            await api._client.aclose()
+
+    return asyncio.run(main())
+
+def test_cache_hit_skips_upstream_and_keeps_etag():
+    upstream = Upstream()
+
+    async def scenario(client):
+        first = await client.get("/anime/samehadaku/latest")
+        second = await client.get("/anime/samehadaku/latest")
+        revalidated = await client.get("/anime/samehadaku/latest", headers={"If-None-Match": first.headers["etag"]})
+        return first, second, revalidated
+
+    first, second, revalidated = run(upstream, scenario)
+    assert upstream.paths == ["/anime-terbaru/"]
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert first.headers["etag"] == second.headers["etag"]
+    assert revalidated.status_code == 304
+    assert api.RESPONSE_CACHE.stats["hits"] == 2
+
+def test_stale_entry_served_while_refreshing():
+    upstream = Upstream()
+
+    async def scenario(client):
+        fresh = await client.get("/anime/samehadaku/latest")
+        (key,) = api.RESPONSE_CACHE.entries
+        old = api.RESPONSE_CACHE.entries[key]
+        # lewat ttl tapi masih dalem stale window
+        old.expires = 0
+        stale = await client.get("/anime/samehadaku/latest")
+        paths_when_served = list(upstream.paths)
+        await asyncio.gather(*api._refresh_tasks.values())
+        return fresh, stale, paths_when_served, old, api.RESPONSE_CACHE.entries[key]
+
+    fresh, stale, paths_when_served, old, new = run(upstream, scenario)
+    assert stale.status_code == 200
+    assert stale.content == fresh.content
+    # dikirim dari entry lama, refresh-nya baru jalan di background
+    assert paths_when_served == ["/anime-terbaru/"]
+    assert upstream.paths == ["/anime-terbaru/", "/anime-terbaru/"]
+    assert new is not old and new.expires > old.expires
+    assert api.RESPONSE_CACHE.stats["stale"] == 1
+
+@pytest.mark.parametrize("path", ["/anime/samehadaku/latest", "/anime/samehadaku/search?query=soul"])
+def test_page_below_one_does_not_poison_page_one(path):
+    sep = "&" if "?" in path else "?"
+
+    async def scenario(client):
+        bad = await client.get(f"{path}{sep}page=0")
+        first = await client.get(f"{path}{sep}page=1")
+        default = await client.get(path)
+        return bad, first, default
+
+    bad, first, default = run(Upstream(), scenario)
+    assert bad.status_code == 422
+    for resp in (first, default):
+        pagination = resp.json()["pagination"]
+        assert pagination["currentPage"] == 1
+        assert pagination["prevPage"] != -1
+
+def test_stream_page_one_matches_listing_page_one():
+    async def scenario(client):
+        await client.get("/anime/samehadaku/latest?page=0")
+        stream = await client.get("/anime/samehadaku/latest/stream?pages=1")
+        return [json.loads(line) for line in stream.text.splitlines()]
+
+    lines = run(Upstream(), scenario)
+    assert [line["page"] for line in lines] == [1]
+    assert lines[0]["pagination"]["currentPage"] == 1
+
+def test_payload_walk_only_for_stored_entries(monkeypatch):
+    walked = []
+    size = api.payload_size
+    monkeypatch.setattr(api, "payload_size", lambda payload: walked.append(payload) or size(payload))
+    payload = api.success({"animeList": [{"title": "x" * 50, "animeId": "x"}] * 10})
+
+    async def scenario(client):
+        return await client.get("/anime/samehadaku/genre-index")
+
+    assert run(Upstream(), scenario).status_code == 200
+    assert walked == []
+
+    entry = api.RESPONSE_CACHE.set("k", "latest", payload)
+    assert walked == [payload]
+    assert entry.size > len(entry.body)
+    assert api.RESPONSE_CACHE.total_bytes == entry.size
@@ -0,0 +1,147 @@
+"""
+Refresh katalog incremental (CatalogRefresher) ke katalog SQLite sementara,
+upstream-nya httpx.MockTransport.
+
+    python -m pytest -q tests
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import time
+
+import httpx
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import api.index as api  # noqa: E402
+
+def load_html(filename: str) -> str:
+    with open(os.path.join(ROOT, "bench", "fixtures", filename), encoding="utf-8") as f:
+        return f.read()
+
+FEED_HTML = load_html("anime-terbaru.html")
+DETAIL_HTML = load_html("anime-detail.html")
+FEED_ETAG = '"feed-1"'
+
+@pytest.fixture(autouse=True)
+def upstream_env(monkeypatch):
+    monkeypatch.setattr(api, "BASE_URL", "https://upstream.test")
+    monkeypatch.setattr(api, "SHARED_CACHE", None)
+    monkeypatch.setattr(api, "CACHE_ENABLED", False)
+    monkeypatch.setattr(api, "UPSTREAM_RETRIES", 0)
+    monkeypatch.setattr(api, "BREAKER_FAILURES", 1000)
+    monkeypatch.setattr(api.MIRRORS, "mirrors", [])
+    api._hosts.clear()
+    yield
+    api._hosts.clear()
+    api._client = None
+
+@pytest.fixture
+def refresher(tmp_path):
+    catalog = api.Catalog(str(tmp_path / "catalog.sqlite3"))
+    yield api.CatalogRefresher(catalog)
+    catalog.close()
+
+class Upstream:
+    """Feed anime-terbaru (ETag tetap, 304 kalau cocok) + halaman detail yang bisa dibikin gagal."""
+
+    def __init__(self):
+        self.details_fail = False
+        self.detail_requests = 0
+
+    def __call__(self, request):
+        if request.url.path == "/anime-terbaru/":
+            if request.headers.get("if-none-match") == FEED_ETAG:
+                return httpx.Response(304, headers={"ETag": FEED_ETAG})
+            return httpx.Response(200, text=FEED_HTML, headers={"ETag": FEED_ETAG})
+        self.detail_requests += 1
+        if self.details_fail:
+            return httpx.Response(503)
+        return httpx.Response(200, text=DETAIL_HTML)
+
+def run(upstream, coro_fn):
+    async def main():
+        api._client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+        try:
+            return await coro_fn()
+        finally:
+            await api._client.aclose()
+
+    return asyncio.run(main())
+
+def test_failed_details_are_retried_even_if_feed_unchanged(refresher):
+    upstream = Upstream()
+    upstream.details_fail = True
+    first = run(upstream, refresher.run)
+    assert upstream.detail_requests == 20
+    assert first["pagesFailed"] == 20
+
+    upstream.details_fail = False
+    upstream.detail_requests = 0
+    run(upstream, refresher.run)
+    # feed-nya sama persis, tapi 20 anime tadi belum pernah ke-refresh
+    assert upstream.detail_requests == 20
+    assert refresher.catalog.count() == 20
+
+    upstream.detail_requests = 0
+    third = run(upstream, refresher.run)
+    assert upstream.detail_requests == 0
+    assert third["pagesSkipped"] >= 1
+
+def test_locked_catalog_does_not_block_event_loop(refresher):
+    catalog = refresher.catalog
+    catalog.set_meta("lastCrawl", {"pages": 0})
+    writer = sqlite3.connect(catalog.path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+
+    async def scenario():
+        # worker lain lagi pegang lock tulis; lepas setelah 0.3 s
+        asyncio.get_running_loop().call_later(0.3, writer.execute, "COMMIT")
+        write = asyncio.create_task(catalog.call(catalog.set_meta, "lastCrawl", {"pages": 1}))
+        gaps = []
+        while not write.done():
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.01)
+            gaps.append(time.perf_counter() - t0)
+        await write
+        return gaps
+
+    gaps = asyncio.run(scenario())
+    writer.close()
+    assert sum(gaps) >= 0.25
+    assert max(gaps) < 0.1
+    assert catalog.get_meta("lastCrawl") == {"pages": 1}
+
+def test_refresh_latest_returns_202_and_runs_in_background(refresher, monkeypatch):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(api, "CATALOG", refresher.catalog)
+    monkeypatch.setattr(api, "CATALOG_REFRESHER", refresher)
+    monkeypatch.setattr(api, "_refresh_run_task", None)
+    upstream = Upstream()
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            denied = await client.post("/anime/samehadaku/catalog/refresh-latest")
+            resp = await client.post("/anime/samehadaku/catalog/refresh-latest", headers={"X-Admin-Token": "secret"})
+            requests_when_answered = upstream.detail_requests
+            stats = await api._refresh_run_task
+        return denied, resp, requests_when_answered, stats
+
+    denied, resp, requests_when_answered, stats = run(upstream, scenario)
+    assert denied.status_code == 403
+    assert resp.status_code == 202
+    assert resp.json()["data"]["running"] is True
+    assert requests_when_answered < 20
+    assert stats["pagesReparsed"] == 20
+
+def test_seed_search_index_skips_missing_catalog(tmp_path, monkeypatch):
+    path = tmp_path / "never-crawled.sqlite3"
+    catalog = api.Catalog(str(path))
+    monkeypatch.setattr(api, "CATALOG", catalog)
+    asyncio.run(api.seed_search_index())
+    assert not path.exists()
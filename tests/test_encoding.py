@@ -0,0 +1,33 @@
+"""Pilihan Content-Encoding dari header Accept-Encoding (q-value)."""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import api.index as api  # noqa: E402
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        ("gzip, br;q=0", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("gzip;q=0", None),
+        ("*;q=0, gzip", "gzip"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_pick_encoding_honours_q_values(monkeypatch, accept, expected):
+    if api.brotli is None and expected == "br":
+        expected = "gzip"
+    assert api._pick_encoding(accept) == expected
+
+def test_pick_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(api, "brotli", None)
+    assert api._pick_encoding("br") is None
+    assert api._pick_encoding("br, gzip;q=0.1") == "gzip"
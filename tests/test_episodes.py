@@ -0,0 +1,84 @@
+"""
+Potongan episodeList: episode_window (page/limit dan from/to) plus
+EpisodeIndex.slice.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import api.index as api  # noqa: E402
+
+@pytest.fixture(autouse=True)
+def page_max(monkeypatch):
+    monkeypatch.setattr(api, "EPISODE_PAGE_MAX", 100)
+
+def test_page_limit_window():
+    lo, hi, pag = api.episode_window(120, 2, 50)
+    assert (lo, hi) == (50, 100)
+    assert pag["currentPage"] == 2 and pag["totalPages"] == 3
+    assert pag["prevPage"] == 1 and pag["nextPage"] == 3
+    assert (pag["from"], pag["to"], pag["totalEpisodes"]) == (50, 100, 120)
+
+    lo, hi, pag = api.episode_window(120, 3, 50)
+    assert (lo, hi) == (100, 120)
+    assert not pag["hasNextPage"] and pag["nextPage"] is None
+
+@pytest.mark.parametrize("page, limit, expected", [
+    (0, 50, (0, 50, 1)),      # page < 1 -> page 1
+    (-3, 50, (0, 50, 1)),
+    (1, 0, (0, 1, 1)),        # limit < 1 -> 1
+    (1, 10_000, (0, 100, 1)), # limit dipotong ke EPISODE_PAGE_MAX
+    (9, 50, (120, 120, 9)),   # lewat halaman terakhir -> kosong, bukan error
+])
+def test_page_limit_clamped(page, limit, expected):
+    lo, hi, pag = api.episode_window(120, page, limit)
+    assert (lo, hi, pag["currentPage"]) == expected
+
+def test_empty_list_has_one_page():
+    lo, hi, pag = api.episode_window(0, 1, 50)
+    assert (lo, hi) == (0, 0)
+    assert pag["totalPages"] == 1
+    assert not pag["hasPrevPage"] and not pag["hasNextPage"]
+
+@pytest.mark.parametrize("start, end, expected", [
+    (10, 20, (10, 20)),
+    (None, 5, (0, 5)),       # cuma `to`
+    (110, None, (110, 120)), # cuma `from` -> sampe habis
+    (-5, 3, (0, 3)),
+    (30, 10, (30, 30)),      # to < from -> kosong
+    (200, 300, (120, 120)),  # lewat total
+    (0, None, (0, 100)),     # dipotong ke EPISODE_PAGE_MAX
+])
+def test_from_to_window(start, end, expected):
+    lo, hi, pag = api.episode_window(120, 1, 50, start, end)
+    assert (lo, hi) == expected
+    assert (pag["from"], pag["to"]) == expected
+    assert pag["currentPage"] is None and pag["totalPages"] is None
+    assert pag["hasPrevPage"] == (lo > 0)
+    assert pag["hasNextPage"] == (hi < 120)
+
+def test_from_to_wins_over_page():
+    assert api.episode_window(120, 3, 10, 5, 8)[:2] == (5, 8)
+
+def test_slice_newest_and_oldest_first():
+    episodes = [
+        {"title": f"Episode {n}", "episodeId": f"ep-{n}", "samehadakuUrl": f"https://upstream.test/ep-{n}/"}
+        for n in range(120, 0, -1)
+    ]
+    index = api.EpisodeIndex('"etag"', episodes)
+    lo, hi, _ = api.episode_window(len(index), 1, 3)
+    assert [ep["episodeId"] for ep in index.slice(lo, hi)] == ["ep-120", "ep-119", "ep-118"]
+    assert [ep["episodeId"] for ep in index.slice(lo, hi, oldest_first=True)] == ["ep-1", "ep-2", "ep-3"]
+    assert index.slice(lo, lo + 1)[0] == {
+        "title": "Episode 120",
+        "episodeId": "ep-120",
+        "href": "/samehadaku/episode/ep-120",
+        "samehadakuUrl": "https://upstream.test/ep-120/",
+    }
@@ -0,0 +1,89 @@
+"""
+?fields=: parse_fields/wants/select_fields, plus extractor yang skip
+bagian gak diminta harus hasilnya sama kayak extract full lalu dipangkas.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH = os.path.join(ROOT, "bench")
+if BENCH not in sys.path:
+    sys.path.insert(0, BENCH)
+
+from fixtures import api, load_html  # noqa: E402
+
+@pytest.mark.parametrize("raw, expected", [
+    (None, None),
+    ("", None),
+    (" , ,", None),
+    ("title", frozenset({"title"})),
+    (" title, poster ,,animeId ", frozenset({"title", "poster", "animeId"})),
+])
+def test_parse_fields(raw, expected):
+    assert api.parse_fields(raw) == expected
+
+def test_wants():
+    assert api.wants(None, "poster")
+    assert api.wants(frozenset({"poster"}), "poster")
+    assert api.wants(frozenset({"releasedOn"}), "episodes", "releasedOn")
+    assert not api.wants(frozenset({"title"}), "episodes", "releasedOn")
+    assert not api.wants(frozenset(), "poster")
+
+LISTING = api.success(
+    {"animeList": [{"title": "A", "poster": "a.jpg", "animeId": "a"}, {"title": "B", "poster": "b.jpg", "animeId": "b"}]},
+    pagination={"currentPage": 1, "hasNextPage": True},
+)
+
+def test_select_fields_listing_trims_items_only():
+    out = api.select_fields(LISTING, frozenset({"animeId", "nope"}), "animeList")
+    assert out["data"]["animeList"] == [{"animeId": "a"}, {"animeId": "b"}]
+    # envelope gak disentuh, payload asli juga gak diubah
+    assert out["pagination"] == LISTING["pagination"] and out["status"] == LISTING["status"]
+    assert LISTING["data"]["animeList"][0]["poster"] == "a.jpg"
+
+def test_select_fields_detail_trims_data_keys():
+    payload = api.success({"title": "A", "poster": "a.jpg", "episodeList": [{"episodeId": "e1"}]})
+    out = api.select_fields(payload, frozenset({"title", "episodeList"}))
+    assert out["data"] == {"title": "A", "episodeList": [{"episodeId": "e1"}]}
+
+@pytest.mark.parametrize("payload", [None, {}, {"status": "failed"}, {"status": "success", "data": [1, 2]}])
+def test_select_fields_passthrough(payload):
+    assert api.select_fields(payload, frozenset({"title"})) is payload
+
+def test_select_fields_none_means_everything():
+    assert api.select_fields(LISTING, None, "animeList") is LISTING
+
+def test_select_fields_missing_list():
+    payload = api.success({"animeList": None})
+    assert api.select_fields(payload, frozenset({"title"}), "animeList")["data"]["animeList"] == []
+
+# extractor + fields: boleh skip kerja, tapi field yang diminta harus identik
+EXTRACTORS = {
+    "latest": ("anime-terbaru.html", lambda soup, f: api.extract_latest(soup, 2, fields=f), "animeList"),
+    "library": ("daftar-anime-2.html", lambda soup, f: api.extract_library(soup, 1, "Ongoing", fields=f), "animeList"),
+    "anime": ("anime-detail.html", lambda soup, f: api.extract_anime_detail(soup, f), None),
+    "anime-long": ("anime-detail-long.html", lambda soup, f: api.extract_anime_detail(soup, f), None),
+}
+
+FIELD_SETS = [
+    {"title", "animeId"},
+    {"poster"},
+    {"releasedOn"},
+    {"episodes", "status"},
+    {"synopsis", "genreList"},
+    {"episodeList", "trailer"},
+]
+
+@pytest.mark.parametrize("name", EXTRACTORS)
+@pytest.mark.parametrize("fields", FIELD_SETS, ids=lambda f: ",".join(sorted(f)))
+def test_narrow_extract_matches_trimmed_full(name, fields):
+    filename, extract, list_key = EXTRACTORS[name]
+    fields = frozenset(fields)
+    html = load_html(filename)
+    full = api.select_fields(extract(api.make_soup(html), None), fields, list_key)
+    narrow = api.select_fields(extract(api.make_soup(html), fields), fields, list_key)
+    assert narrow == full
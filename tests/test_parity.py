@@ -0,0 +1,41 @@
+"""
+Output JSON tiap extractor harus sama persis di semua parser backend, baik
+parse full maupun pake target parse per route (PARSE_TARGETS), dibandingin
+ke html.parser full. Fixture-nya dari bench/fixtures.
+
+    python -m pytest -q tests
+"""
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH = os.path.join(ROOT, "bench")
+if BENCH not in sys.path:
+    sys.path.insert(0, BENCH)
+
+from fixtures import PAGES, api, available_backends, load_html  # noqa: E402
+
+def render(payload) -> str:
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True)
+
+CASES = [
+    (name, backend, mode)
+    for name in PAGES
+    for backend in available_backends()
+    for mode in ("full", "target")
+    if not (backend == "html.parser" and mode == "full")
+]
+
+@pytest.mark.parametrize("name, backend, mode", CASES)
+def test_extractor_output_matches_html_parser(name, backend, mode):
+    filename, route, extract = PAGES[name]
+    html = load_html(filename)
+    expected = render(extract(api.make_soup(html, "html.parser")))
+    soup = api.make_soup(html, backend, route if mode == "target" else None)
+    assert render(extract(soup)) == expected
+
+def test_removed_backend_falls_back_to_auto():
+    assert api.resolve_parser_backend("selectolax") == api.resolve_parser_backend("auto")
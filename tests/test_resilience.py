@@ -0,0 +1,165 @@
+"""
+Circuit breaker per host dan deadline retry/hedge di resilient_get,
+pake httpx.MockTransport (gak ada network).
+
+    python -m pytest -q tests
+"""
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import api.index as api  # noqa: E402
+
+URL = "https://upstream.test/anime/foo/"
+
+@pytest.fixture(autouse=True)
+def upstream(monkeypatch):
+    monkeypatch.setattr(api, "BREAKER_FAILURES", 2)
+    monkeypatch.setattr(api, "BREAKER_COOLDOWN", 0.05)
+    monkeypatch.setattr(api, "UPSTREAM_BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(api.MIRRORS, "mirrors", [])
+    api._hosts.clear()
+    yield
+    api._hosts.clear()
+    api._client = None
+
+def run(handler, coro_fn):
+    """Jalanin coro_fn() dengan client upstream yang dilayanin handler."""
+
+    async def main():
+        api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await coro_fn()
+        finally:
+            await api._client.aclose()
+
+    return asyncio.run(main())
+
+def test_breaker_closed_open_half_open_closed():
+    health = api.HostHealth("upstream.test")
+    assert health.allow() and health.state == "closed"
+
+    health.failure()
+    assert health.state == "closed"
+    health.failure()
+    assert health.state == "open"
+    assert not health.allow()
+
+    time.sleep(0.06)
+    assert health.allow()
+    assert health.state == "half_open"
+    # cuma satu probe yang boleh lewat
+    assert not health.allow()
+
+    health.success(0.1)
+    assert health.state == "closed" and health.allow()
+
+def test_half_open_probe_failure_reopens():
+    health = api.HostHealth("upstream.test")
+    health.failure()
+    health.failure()
+    time.sleep(0.06)
+    assert health.allow()
+    health.failure()
+    assert health.state == "open" and not health.allow()
+
+def trip(health):
+    health.failure()
+    health.failure()
+    time.sleep(0.06)
+
+def test_probe_with_unexpected_error_does_not_stick():
+    calls = {"n": 0}
+
+    def handler(request):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise httpx.TooManyRedirects("redirect loop", request=request)
+        return httpx.Response(200, text="ok")
+
+    async def scenario():
+        health = api.host_health(URL)
+        trip(health)
+        with pytest.raises(httpx.TooManyRedirects):
+            await api.resilient_get(URL, "anime")
+        assert health.state == "open" and not health.probing
+        time.sleep(0.06)
+        resp = await api.resilient_get(URL, "anime")
+        return health, resp
+
+    health, resp = run(handler, scenario)
+    assert resp.status_code == 200
+    assert health.state == "closed"
+
+def test_cancelled_probe_releases_half_open():
+    async def handler(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    async def scenario():
+        health = api.host_health(URL)
+        trip(health)
+        task = asyncio.create_task(api.resilient_get(URL, "anime"))
+        await asyncio.sleep(0.05)
+        assert health.probing
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return health
+
+    health = run(handler, scenario)
+    assert not health.probing
+    assert health.allow()
+
+def test_hung_upstream_fails_within_deadline(monkeypatch):
+    monkeypatch.setattr(api, "UPSTREAM_ATTEMPT_TIMEOUT", 0.4)
+    monkeypatch.setattr(api, "UPSTREAM_DEADLINE", 0.9)
+    monkeypatch.setattr(api, "HEDGE_MAX_DELAY", 0.1)
+    monkeypatch.setattr(api, "BREAKER_FAILURES", 100)
+    calls = {"n": 0}
+
+    async def handler(request):
+        calls["n"] += 1
+        await asyncio.sleep(30)
+        return httpx.Response(200)
+
+    async def scenario():
+        started = time.monotonic()
+        with pytest.raises(httpx.TimeoutException):
+            await api.resilient_get(URL, "anime")
+        return time.monotonic() - started
+
+    elapsed = run(handler, scenario)
+    # hedge gak dapet timeout penuh sendiri: tiap attempt selesai di deadline-nya
+    assert elapsed < 0.9 + 0.15
+    # 2 attempt muat di deadline, masing-masing primary + hedge
+    assert calls["n"] <= 4
+
+def test_hedge_wins_when_primary_hangs(monkeypatch):
+    monkeypatch.setattr(api, "UPSTREAM_ATTEMPT_TIMEOUT", 2.0)
+    monkeypatch.setattr(api, "HEDGE_MAX_DELAY", 0.1)
+    calls = {"n": 0}
+
+    async def handler(request):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            await asyncio.sleep(30)
+        return httpx.Response(200, text="hedge")
+
+    async def scenario():
+        started = time.monotonic()
+        resp = await api.resilient_get(URL, "anime")
+        return resp, time.monotonic() - started
+
+    resp, elapsed = run(handler, scenario)
+    assert resp.text == "hedge"
+    assert 0.1 <= elapsed < 0.5
+    assert calls["n"] == 2
@@ -0,0 +1,191 @@
+"""
+Jadwal dari ScheduleIndex harus sama persis sama resolver lama (find()
+full-tree per hari, disalin di bawah sebagai referensi), di fixture
+jadwal-rilis dan layout tab buatan, di tiap parser backend.
+
+    python -m pytest -q tests
+"""
+import json
+import os
+import re
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH = os.path.join(ROOT, "bench")
+if BENCH not in sys.path:
+    sys.path.insert(0, BENCH)
+
+from fixtures import api, available_backends, load_html  # noqa: E402
+
+# ---- resolver lama (sebelum ScheduleIndex), disalin apa adanya ----
+
+def old_parse_schedule_card(a_tag):
+    try:
+        href = a_tag.get("href", "")
+        if not href or "/anime/" not in href:
+            return None
+        anime_id = api.extract_id(href)
+        card = a_tag
+        for _ in range(6):
+            if not card or not getattr(card, "parent", None):
+                break
+            if card.parent.find("img") and card.parent.find("a", href=re.compile(r"/anime/")):
+                card = card.parent
+                break
+            card = card.parent
+        raw = a_tag.get_text(" ", strip=True)
+        atype, score, title = "TV", "?", raw
+        m = re.match(r"^(?P<type>[A-Za-z]+)\s+(?P<score>\d+(?:\.\d+)?)\s+(?P<title>.+)$", raw)
+        if m:
+            atype = m.group("type").strip()
+            score = m.group("score").strip()
+            title = m.group("title").strip()
+        poster = api.extract_poster(card if hasattr(card, "find") else a_tag)
+        blob = card.get_text(" ", strip=True) if hasattr(card, "get_text") else raw
+        mt = api.TIME_RE.search(blob)
+        return {
+            "title": title,
+            "poster": poster,
+            "type": atype,
+            "score": score,
+            "animeId": anime_id,
+            "href": f"/samehadaku/anime/{anime_id}",
+            "samehadakuUrl": href,
+            "estimation": mt.group(1) if mt else "Update",
+            "genreList": [],
+        }
+    except Exception:
+        return None
+
+def old_build_day_target_map(content):
+    all_labels_norm = set(api._norm(x) for labs in api.DAY_LABELS.values() for x in labs)
+    mapping = {}
+    for el in content.find_all(["a", "button", "div", "span", "li"], limit=4000):
+        txt = api._norm(el.get_text(" ", strip=True))
+        if not txt or txt not in all_labels_norm:
+            continue
+        target = None
+        href = el.get("href", "")
+        if href and href.startswith("#") and len(href) > 1:
+            target = href[1:].strip()
+        for key in ["data-tab", "data-target", "data-id", "data-day", "aria-controls"]:
+            if not target and el.get(key):
+                target = el.get(key)
+        if target:
+            mapping[txt] = target
+    return mapping
+
+def old_find_container_by_target(content, target):
+    if not target:
+        return None
+    anime = re.compile(r"/anime/")
+    c = content.find(id=re.compile(rf"^{re.escape(target)}$", re.I))
+    if c and c.find("a", href=anime):
+        return c
+    c = content.find(id=re.compile(re.escape(target), re.I))
+    if c and c.find("a", href=anime):
+        return c
+    for k in ["data-tab-content", "data-content", "data-id", "data-day"]:
+        c = content.find(attrs={k: re.compile(re.escape(target), re.I)})
+        if c and c.find("a", href=anime):
+            return c
+    c = content.find(class_=re.compile(rf"\b{re.escape(target)}\b", re.I))
+    if c and c.find("a", href=anime):
+        return c
+    c = content.find(id=re.compile(rf"(tab|pane|content)[-_]*{re.escape(target)}", re.I))
+    if c and c.find("a", href=anime):
+        return c
+    return None
+
+def old_extract_schedule(soup):
+    content = soup.find("div", class_="entry-content") or soup.find("main") or soup
+    day_target = old_build_day_target_map(content)
+    days_res = []
+    for eng_day, labels in api.DAY_LABELS.items():
+        anime_list = []
+        targets = [day_target[api._norm(lab)] for lab in labels if api._norm(lab) in day_target] or labels[:]
+        for t in targets:
+            container = old_find_container_by_target(content, t)
+            if container:
+                for a in container.find_all("a", href=True):
+                    if "/anime/" in a["href"]:
+                        it = old_parse_schedule_card(a)
+                        if it:
+                            anime_list.append(it)
+        seen = set()
+        final = []
+        for x in anime_list:
+            if x["animeId"] not in seen:
+                seen.add(x["animeId"])
+                final.append(x)
+        days_res.append({"day": eng_day, "animeList": final})
+    return api.success({"days": days_res})
+
+# ---- layout tab buatan ----
+
+DAYS = ["senin", "selasa", "rabu", "kamis", "jumat", "sabtu", "minggu"]
+
+def card(day: str, n: int) -> str:
+    return (
+        f'<div class="card"><img src="https://img.test/{day}-{n}.jpg">'
+        f'<a href="https://upstream.test/anime/{day}-anime-{n}/">TV {n}.5 {day.title()} Anime {n}</a>'
+        f"<span>Jam {10 + n}:30</span></div>"
+    )
+
+def cards(day: str) -> str:
+    return "".join(card(day, n) for n in range(1, 3))
+
+LAYOUTS = {
+    # tombol data-tab, container data-tab-content
+    "data-attr": lambda: (
+        '<ul class="tabs">' + "".join(f'<li data-tab="{d}">{d.title()}</li>' for d in DAYS) + "</ul>"
+        + "".join(f'<div data-tab-content="{d}">{cards(d)}</div>' for d in DAYS)
+    ),
+    # href="#hari" ke container class="hari"
+    "class": lambda: (
+        "<nav>" + "".join(f'<a href="#{d}">{d.title()}</a>' for d in DAYS) + "</nav>"
+        + "".join(f'<div class="tab-pane {d}">{cards(d)}</div>' for d in DAYS)
+    ),
+    # label kepecah ke beberapa elemen, target-nya gak ada hubungannya sama nama hari
+    "split-label": lambda: (
+        "<div>" + "".join(f'<button data-target="hari{i}"><span>{d[:2].title()}</span><b>{d[2:]}</b></button>' for i, d in enumerate(DAYS)) + "</div>"
+        + "".join(f'<section id="hari{i}">{cards(d)}</section>' for i, d in enumerate(DAYS))
+    ),
+    # container id="pane-hari", ketemu lewat fallback target = label
+    "pane-id": lambda: (
+        "<div>" + "".join(f"<span>{d.title()}</span>" for d in DAYS) + "</div>"
+        + "".join(f'<section id="pane-{d}">{cards(d)}</section>' for d in DAYS)
+    ),
+    # aria-controls ke id persis
+    "aria-controls": lambda: (
+        '<div role="tablist">' + "".join(f'<button aria-controls="tab-{d}">{d.title()}</button>' for d in DAYS) + "</div>"
+        + "".join(f'<div id="tab-{d}" role="tabpanel">{cards(d)}</div>' for d in DAYS)
+    ),
+}
+
+def page(layout: str) -> str:
+    return f'<html><body><main><div class="entry-content">{LAYOUTS[layout]()}</div></main></body></html>'
+
+def render(payload) -> str:
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True)
+
+CASES = [("fixture", load_html("jadwal-rilis.html"))] + [(name, page(name)) for name in LAYOUTS]
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("name, html", CASES, ids=[c[0] for c in CASES])
+def test_schedule_index_matches_old_resolver(name, html, backend):
+    soup = api.make_soup(html, backend)
+    expected = old_extract_schedule(soup)
+    assert render(api.extract_schedule(soup)) == render(expected)
+    if name != "fixture":
+        # layout buatan: tiap hari kebagian card-nya sendiri
+        assert [len(d["animeList"]) for d in expected["data"]["days"]] == [2] * 7
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_day_target_map_matches_old_resolver(backend):
+    for name in LAYOUTS:
+        soup = api.make_soup(page(name), backend)
+        content = soup.find("div", class_="entry-content")
+        assert api.build_day_target_map(content) == old_build_day_target_map(content), name